@@ -0,0 +1,85 @@
+"""
+Response caching and ETags for read endpoints.
+
+Routers use CachedRoute as their route class, and GET endpoints opt in with
+@cached(...) under the @router.get(...) decorator. A cached endpoint's
+rendered JSON is stored under its path and normalized query, tagged so the
+write paths can drop it the moment the rows behind it change (see
+app.services.response_cache). Responses carry an ETag and Cache-Control:
+no-cache, and a request whose If-None-Match still matches gets a bodiless
+304, whether or not the body came from the cache.
+
+Only 200 responses are cached, and only endpoints whose responses set no
+headers of their own should opt in.
+"""
+
+import json
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.services.response_cache import CachedResponse, get_response_cache
+
+ETAG_HEADER = "ETag"
+
+
+def cached(*tags: str, entity: Optional[Callable[[Any], str]] = None):
+    """Mark an endpoint as cacheable under ``tags``, plus the tag ``entity`` derives from the response body"""
+    def mark(endpoint):
+        endpoint.cache_tags = (tags, entity)
+        return endpoint
+    return mark
+
+
+def cache_key(request: Request) -> str:
+    """Path plus query with parameters sorted, so ?a=1&b=2 and ?b=2&a=1 share an entry"""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _respond(request: Request, response: CachedResponse) -> Response:
+    headers = {ETAG_HEADER: response.etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, response.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=response.body, media_type=response.media_type, headers=headers)
+
+
+class CachedRoute(APIRoute):
+    """APIRoute serving the GET endpoints marked with @cached through the response cache"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        marker = getattr(self.endpoint, "cache_tags", None)
+        if marker is None or "GET" not in self.methods:
+            return handler
+        tags, entity = marker
+
+        async def cached_handler(request: Request) -> Response:
+            cache = get_response_cache()
+            key = cache_key(request)
+            entry = await cache.get(key)
+            if entry is None:
+                generation = await cache.generation()
+                response = await handler(request)
+                body = getattr(response, "body", None)
+                if response.status_code != 200 or body is None:
+                    return response
+
+                entry = CachedResponse(body=body, media_type=response.media_type)
+                entry_tags: Iterable[str] = tags
+                if entity is not None:
+                    entry_tags = (*tags, entity(json.loads(body)))
+                await cache.set(key, entry, entry_tags, generation)
+            return _respond(request, entry)
+
+        return cached_handler
@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from app.database import get_db_session
-from app.models import ContractEvent, Job, Worker
+from app.models import ContractEvent, Job, Worker, IndexerCheckpoint
+from app.config import get_settings
 from app.schemas.events import ContractEventResponse, EventSummary
+from app.api.pagination import Keyset, CURSOR_DESCRIPTION
+from app.api.caching import CachedRoute, cached
+from app.services.stats import read_stats, counters_by_suffix
+from app.services.response_cache import get_response_cache, EVENT_STATS
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+# Chain order; served by ix_contract_events_block_event in either direction
+EVENTS_NEWEST_FIRST = Keyset((ContractEvent.block_number, True), (ContractEvent.event_index, True), (ContractEvent.id, True))
+EVENTS_OLDEST_FIRST = Keyset((ContractEvent.block_number, False), (ContractEvent.event_index, False), (ContractEvent.id, False))
 
 @router.get("/", response_model=List[ContractEventResponse])
 async def get_contract_events(
-    skip: int = Query(0, ge=0, description="Number of events to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of events to skip (prefer cursor for deep pages)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of events to return"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     event_name: Optional[str] = Query(None, description="Filter by event name"),
     contract_address: Optional[str] = Query(None, description="Filter by contract address"),
     processed: Optional[bool] = Query(None, description="Filter by processed status"),
@@ -40,18 +51,20 @@ async def get_contract_events(
     if to_block is not None:
         query = query.where(ContractEvent.block_number <= to_block)
     
-    query = query.order_by(desc(ContractEvent.block_number), desc(ContractEvent.event_index))
-    query = query.offset(skip).limit(limit)
+    query = EVENTS_NEWEST_FIRST.page(query, cursor, limit, skip)
     
     result = await db.execute(query)
     events = result.scalars().all()
+    EVENTS_NEWEST_FIRST.set_next_cursor(response, events, limit)
     
     return events
 
 @router.get("/unprocessed", response_model=List[ContractEventResponse])
 async def get_unprocessed_events(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     event_name: Optional[str] = Query(None, description="Filter by event name"),
     db: AsyncSession = Depends(get_db_session)
 ):
@@ -61,11 +74,11 @@ async def get_unprocessed_events(
     if event_name:
         query = query.where(ContractEvent.event_name == event_name)
     
-    query = query.order_by(ContractEvent.block_number, ContractEvent.event_index)
-    query = query.offset(skip).limit(limit)
+    query = EVENTS_OLDEST_FIRST.page(query, cursor, limit, skip)
     
     result = await db.execute(query)
     events = result.scalars().all()
+    EVENTS_OLDEST_FIRST.set_next_cursor(response, events, limit)
     
     return events
 
@@ -101,59 +114,35 @@ async def mark_event_processed(
     event.processed_at = func.now()
     
     await db.commit()
+    await get_response_cache().invalidate(EVENT_STATS)
     
     logger.info(f"Event marked as processed: {event_id}")
     return {"message": "Event marked as processed"}
 
 @router.get("/summary/stats", response_model=EventSummary)
+@cached(EVENT_STATS)
 async def get_event_summary(
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Get event summary statistics"""
-    since = datetime.utcnow() - timedelta(hours=hours)
-    
-    # Total events in timeframe
-    total_query = select(func.count(ContractEvent.id)).where(
-        ContractEvent.timestamp >= since
-    )
-    total_result = await db.execute(total_query)
-    total_events = total_result.scalar()
-    
-    # Events by type
-    type_query = select(
-        ContractEvent.event_name, 
-        func.count(ContractEvent.id)
-    ).where(
-        ContractEvent.timestamp >= since
-    ).group_by(ContractEvent.event_name)
-    type_result = await db.execute(type_query)
-    events_by_type = dict(type_result.all())
-    
-    # Processed vs unprocessed
-    processed_query = select(func.count(ContractEvent.id)).where(
-        ContractEvent.timestamp >= since,
-        ContractEvent.processed == True
-    )
-    processed_result = await db.execute(processed_query)
-    processed_events = processed_result.scalar()
-    
-    unprocessed_query = select(func.count(ContractEvent.id)).where(
-        ContractEvent.processed == False
-    )
-    unprocessed_result = await db.execute(unprocessed_query)
-    unprocessed_events = unprocessed_result.scalar()
-    
-    # Latest block processed
-    latest_block_query = select(func.max(ContractEvent.block_number))
-    latest_block_result = await db.execute(latest_block_query)
-    latest_block = latest_block_result.scalar()
+    """Get event summary statistics (from stats_counters, to the hour)"""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    totals, recent = await read_stats(db, "events", since=since)
+    
+    # Latest block processed, including blocks without events
+    checkpoint = await db.get(IndexerCheckpoint, get_settings().contract_address)
+    if checkpoint:
+        latest_block = checkpoint.block_number
+    else:
+        latest_block_query = select(func.max(ContractEvent.block_number))
+        latest_block_result = await db.execute(latest_block_query)
+        latest_block = latest_block_result.scalar()
     
     return EventSummary(
-        total_events=total_events,
-        events_by_type=events_by_type,
-        processed_events=processed_events,
-        unprocessed_events=unprocessed_events,
+        total_events=int(recent.get("events", 0)),
+        events_by_type=counters_by_suffix(recent, "events.type."),
+        processed_events=int(recent.get("events.processed", 0)),
+        unprocessed_events=int(totals.get("events.unprocessed", 0)),
         latest_block_processed=latest_block,
         timeframe_hours=hours
     )
@@ -222,6 +211,7 @@ async def cleanup_old_events(
         await db.delete(event)
     
     await db.commit()
+    await get_response_cache().invalidate(EVENT_STATS)
     
     logger.info(f"Deleted {count} old events older than {days} days")
     return {
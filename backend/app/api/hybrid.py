@@ -2,15 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional, Dict, Any
 from app.config import get_settings
 from app.services.graph_client import get_graph_client
+from app.services.stats import get_global_stats as get_global_stats_db
+from app.services.stats import get_daily_stats as get_daily_stats_db
 from app.api.workers import get_workers as get_workers_db
 from app.api.jobs import get_jobs as get_jobs_db
 from app.database import get_db_session
+from app.api.caching import CachedRoute, cached
+from app.services.response_cache import worker_tag, JOB_LISTS, WORKER_LISTS, ALL_STATS
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 @router.get("/workers", response_model=List[Dict[str, Any]])
+@cached(WORKER_LISTS)
 async def get_workers_hybrid(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -54,12 +59,19 @@ async def get_workers_hybrid(
         except Exception as e:
             logger.error(f"Failed to fetch workers from The Graph: {e}")
             # Fallback to database
-            return await get_workers_db(skip, limit, verified_only, True, min_reputation, db)
+            return await get_workers_db(
+                response=None, skip=skip, limit=limit, cursor=None, verified_only=verified_only,
+                active_only=True, min_reputation=min_reputation, db=db
+            )
     else:
         # Use database directly
-        return await get_workers_db(skip, limit, verified_only, True, min_reputation, db)
+        return await get_workers_db(
+            response=None, skip=skip, limit=limit, cursor=None, verified_only=verified_only,
+            active_only=True, min_reputation=min_reputation, db=db
+        )
 
 @router.get("/jobs", response_model=List[Dict[str, Any]])
+@cached(JOB_LISTS)
 async def get_jobs_hybrid(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -104,12 +116,19 @@ async def get_jobs_hybrid(
         except Exception as e:
             logger.error(f"Failed to fetch jobs from The Graph: {e}")
             # Fallback to database
-            return await get_jobs_db(skip, limit, status, creator_address, None, None, None, db)
+            return await get_jobs_db(
+                response=None, skip=skip, limit=limit, cursor=None, status=status, creator_address=creator_address,
+                worker_address=None, min_reward=None, min_reputation_required=None, db=db
+            )
     else:
         # Use database directly
-        return await get_jobs_db(skip, limit, status, creator_address, None, None, None, db)
+        return await get_jobs_db(
+            response=None, skip=skip, limit=limit, cursor=None, status=status, creator_address=creator_address,
+            worker_address=None, min_reward=None, min_reputation_required=None, db=db
+        )
 
 @router.get("/worker/{worker_address}")
+@cached(entity=lambda body: worker_tag(body["worker"]["address"]))
 async def get_worker_hybrid(
     worker_address: str,
     db=Depends(get_db_session)
@@ -160,6 +179,8 @@ async def get_worker_hybrid(
         raise HTTPException(status_code=501, detail="Database-only mode not fully implemented for this endpoint")
 
 @router.get("/available-jobs")
+# Which jobs a worker may take depends on its reputation
+@cached(JOB_LISTS, WORKER_LISTS)
 async def get_available_jobs_hybrid(
     worker_address: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
@@ -197,14 +218,15 @@ async def get_available_jobs_hybrid(
             logger.error(f"Failed to fetch available jobs from The Graph: {e}")
             # Fallback to database
             from app.api.jobs import get_available_jobs as get_available_jobs_db
-            return await get_available_jobs_db(worker_address, skip, limit, db)
+            return await get_available_jobs_db(worker_address=worker_address, skip=skip, limit=limit, wait=0, db=db)
     else:
         # Use database directly
         from app.api.jobs import get_available_jobs as get_available_jobs_db
-        return await get_available_jobs_db(worker_address, skip, limit, db)
+        return await get_available_jobs_db(worker_address=worker_address, skip=skip, limit=limit, wait=0, db=db)
 
 @router.get("/stats/global")
-async def get_global_stats_hybrid():
+@cached(*ALL_STATS)
+async def get_global_stats_hybrid(db=Depends(get_db_session)):
     """Get global statistics using The Graph or database"""
     settings = get_settings()
     
@@ -232,16 +254,19 @@ async def get_global_stats_hybrid():
             
         except Exception as e:
             logger.error(f"Failed to fetch global stats from The Graph: {e}")
-            return {"error": "Failed to fetch statistics", "details": str(e)}
+            # Fallback to database
+            return await get_global_stats_db(db)
     else:
-        # Use database directly - would need to implement
-        return {"message": "Database-only global stats not implemented yet"}
+        # Use database directly
+        return await get_global_stats_db(db)
 
 @router.get("/stats/daily")
+@cached(*ALL_STATS)
 async def get_daily_stats_hybrid(
-    days: int = Query(7, ge=1, le=30)
+    days: int = Query(7, ge=1, le=30),
+    db=Depends(get_db_session)
 ):
-    """Get daily statistics using The Graph"""
+    """Get daily statistics using The Graph or database"""
     settings = get_settings()
     
     if settings.use_graph:
@@ -266,6 +291,8 @@ async def get_daily_stats_hybrid(
             
         except Exception as e:
             logger.error(f"Failed to fetch daily stats from The Graph: {e}")
-            return {"error": "Failed to fetch daily statistics", "details": str(e)}
+            # Fallback to database
+            return await get_daily_stats_db(db, days)
     else:
-        return {"message": "Daily stats only available with The Graph integration"}
+        # Use database directly
+        return await get_daily_stats_db(db, days)
@@ -1,28 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, and_, or_, update, case
+from sqlalchemy.orm import aliased
+from typing import Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import asyncio
+import json
 from app.database import get_db_session
-from app.models import Job, Worker, JobEvent
+from app.models import Job, Worker, JobEvent, JobChunk
+from app.api.pagination import Keyset, CURSOR_DESCRIPTION
+from app.api.caching import CachedRoute, cached
 from app.schemas.jobs import (
     JobResponse, 
     JobCreate, 
     JobUpdate, 
     JobAssignment,
     JobCompletion,
+    JobClaim,
+    JobChunkClaim,
+    JobChunkCompletion,
+    JobChunkResponse,
+    JobChunkAssignment,
     JobEventResponse
 )
 from app.services.starknet_client import get_starknet_client
+from app.services.job_chunks import build_job_chunks
+from app.services.job_notifier import get_job_notifier, job_opened_event
+from app.services.stats import read_stats, counters_by_suffix
+from app.services.response_cache import get_response_cache, job_tag, worker_tag, JOB_LISTS, JOB_STATS, WORKER_LISTS
+from app.config import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+# Newest first; served by ix_jobs_created_at and ix_jobs_worker_status_created_at
+JOBS_BY_NEWEST = Keyset((Job.created_at, True), (Job.id, True))
+JOB_EVENTS_BY_NEWEST = Keyset((JobEvent.timestamp, True), (JobEvent.id, True))
 
 @router.get("/", response_model=List[JobResponse])
 async def get_jobs(
-    skip: int = Query(0, ge=0, description="Number of jobs to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of jobs to skip (prefer cursor for deep pages)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of jobs to return"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     status: Optional[str] = Query(None, description="Filter by job status"),
     creator_address: Optional[str] = Query(None, description="Filter by creator address"),
     worker_address: Optional[str] = Query(None, description="Filter by assigned worker"),
@@ -49,10 +72,11 @@ async def get_jobs(
     if min_reputation_required is not None:
         query = query.where(Job.min_reputation >= min_reputation_required)
     
-    query = query.order_by(Job.created_at.desc()).offset(skip).limit(limit)
+    query = JOBS_BY_NEWEST.page(query, cursor, limit, skip)
     
     result = await db.execute(query)
     jobs = result.scalars().all()
+    JOBS_BY_NEWEST.set_next_cursor(response, jobs, limit)
     
     return jobs
 
@@ -61,18 +85,32 @@ async def get_available_jobs(
     worker_address: Optional[str] = Query(None, description="Check eligibility for specific worker"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    wait: int = Query(0, ge=0, le=60, description="Seconds to hold the request until a matching job opens"),
     db: AsyncSession = Depends(get_db_session)
 ):
-    """Get available jobs (open status, not yet assigned)"""
+    """Get available jobs (open status, with work left to claim).
+
+    With ``wait``, an empty result is held until a matching job opens or the
+    wait runs out, so idle workers get new work right away without polling.
+    """
+    chunk = aliased(JobChunk)
+    has_chunks = select(JobChunk.id).where(JobChunk.job_id == Job.id).exists()
+    has_claimable_chunk = select(chunk.id).where(
+        and_(chunk.job_id == Job.id, _claimable_chunk(chunk))
+    ).exists()
+    
     query = select(Job).where(
         and_(
             Job.status == "open",
             Job.worker_id.is_(None),
-            Job.deadline > func.now()
+            Job.deadline > func.now(),
+            # Jobs from before chunking get their chunks on first claim
+            or_(~has_chunks, has_claimable_chunk)
         )
     )
     
     # If worker address provided, filter by their eligibility
+    worker = None
     if worker_address:
         worker_query = select(Worker).where(Worker.address == worker_address)
         worker_result = await db.execute(worker_query)
@@ -89,12 +127,91 @@ async def get_available_jobs(
     
     query = query.order_by(Job.reward_amount.desc()).offset(skip).limit(limit)
     
-    result = await db.execute(query)
-    jobs = result.scalars().all()
+    if not wait:
+        result = await db.execute(query)
+        return result.scalars().all()
     
-    return jobs
+    # Subscribe before the first query so a job opening in between still wakes us
+    notifier = get_job_notifier()
+    queue = notifier.subscribe()
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            result = await db.execute(query)
+            jobs = result.scalars().all()
+            # Don't hold a pooled connection while waiting
+            await db.close()
+            if jobs:
+                return jobs
+            
+            # Wait for a job this worker could take
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return jobs
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    return jobs
+                if worker is None or event.get("min_reputation", 0) <= worker.reputation:
+                    break
+    finally:
+        notifier.unsubscribe(queue)
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stream")
+async def stream_jobs(
+    request: Request,
+    worker_address: str = Query(..., description="Worker to push eligible jobs to"),
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Push newly opened work to a worker as server-sent events.
+
+    Events are wake-up signals: the worker claims through POST /jobs/claim.
+    A ``ready`` event is sent on connect so work that opened before the
+    worker subscribed is picked up right away.
+    """
+    worker = await _get_eligible_worker(worker_address, db)
+    reputation = worker.reputation
+    # Don't hold a pooled connection for the lifetime of the stream
+    await db.close()
+    
+    notifier = get_job_notifier()
+    queue = notifier.subscribe()
+    keepalive = int(get_settings().job_stream_keepalive)
+    logger.info(f"Worker {worker_address} subscribed to job stream ({notifier.subscriber_count} connected)")
+    
+    async def event_stream():
+        try:
+            yield _sse("ready", {"worker_address": worker_address})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if event.get("min_reputation", 0) > reputation:
+                    continue
+                yield _sse(event["type"], event)
+        finally:
+            notifier.unsubscribe(queue)
+            logger.info(f"Worker {worker_address} left job stream")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{job_id}", response_model=JobResponse)
+@cached(entity=lambda job: job_tag(job["chain_job_id"]))
 async def get_job(
     job_id: str,
     db: AsyncSession = Depends(get_db_session)
@@ -144,8 +261,16 @@ async def create_job(
         reward_amount=job_data.reward_amount,
         deadline=job_data.deadline,
         min_reputation=job_data.min_reputation,
-        required_capabilities=job_data.required_capabilities
+        required_capabilities=job_data.required_capabilities,
+        frame_start=job_data.frame_start,
+        frame_end=job_data.frame_end,
+        frames_per_chunk=job_data.frames_per_chunk,
+        tiles_x=job_data.tiles_x,
+        tiles_y=job_data.tiles_y
     )
+    # Fan the frame range out into chunks that workers claim independently
+    job.chunks = build_job_chunks(job)
+    chunk_count = len(job.chunks)
     
     db.add(job)
     await db.commit()
@@ -156,12 +281,16 @@ async def create_job(
         job_id=job.id,
         event_type="created",
         actor_address=job_data.creator_address,
-        event_data=f'{{"chain_job_id": {job_data.chain_job_id}, "reward": {job_data.reward_amount}}}'
+        event_data=f'{{"chain_job_id": {job_data.chain_job_id}, "reward": {job_data.reward_amount}, "frames": [{job.frame_start}, {job.frame_end}], "chunks": {chunk_count}}}'
     )
     db.add(event)
     await db.commit()
+    await get_response_cache().invalidate(JOB_LISTS, JOB_STATS)
     
-    logger.info(f"Job created: {job.chain_job_id} by {job_data.creator_address}")
+    # Wake workers waiting for work
+    await get_job_notifier().publish(job_opened_event(job))
+    
+    logger.info(f"Job created: {job.chain_job_id} by {job_data.creator_address} (frames {job.frame_start}-{job.frame_end})")
     return job
 
 @router.post("/{job_id}/assign", response_model=JobResponse)
@@ -191,30 +320,37 @@ async def assign_job(
     if job.status != "open":
         raise HTTPException(status_code=400, detail="Job is not available for assignment")
     
-    # Get worker
-    worker_query = select(Worker).where(Worker.address == assignment.worker_address)
-    worker_result = await db.execute(worker_query)
-    worker = worker_result.scalar_one_or_none()
-    
-    if not worker:
-        raise HTTPException(status_code=404, detail="Worker not found")
-    
-    # Check worker eligibility
-    if not worker.verified or not worker.active:
-        raise HTTPException(status_code=400, detail="Worker is not eligible (not verified or active)")
+    worker = await _get_eligible_worker(assignment.worker_address, db)
     
     if worker.reputation < job.min_reputation:
         raise HTTPException(status_code=400, detail="Worker reputation too low for this job")
     
-    # Assign job
-    job.worker_id = worker.id
-    job.status = "assigned"
-    job.assigned_at = func.now()
+    # Claim the job in one statement; if another worker got there first, or
+    # some of its frame chunks are already claimed, no row matches
+    claimed_chunks = select(JobChunk.id).where(
+        and_(JobChunk.job_id == Job.id, JobChunk.status != "open")
+    ).exists()
+    assign_result = await db.execute(
+        update(Job)
+        .where(and_(Job.id == job.id, Job.status == "open", Job.worker_id.is_(None), ~claimed_chunks))
+        .values(worker_id=worker.id, status="assigned", assigned_at=func.now())
+        .returning(Job)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = assign_result.scalar_one_or_none()
     
-    await db.commit()
-    await db.refresh(job)
+    if not job:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Job is no longer available for assignment")
+    
+    # Whole-job assignment takes every frame chunk
+    await db.execute(
+        update(JobChunk)
+        .where(JobChunk.job_id == job.id)
+        .values(status="assigned", worker_id=worker.id, assigned_at=func.now())
+    )
     
-    # Create assignment event
+    # Create assignment event in the same transaction
     event = JobEvent(
         job_id=job.id,
         event_type="assigned",
@@ -223,6 +359,7 @@ async def assign_job(
     )
     db.add(event)
     await db.commit()
+    await get_response_cache().invalidate(job_tag(job.chain_job_id), JOB_LISTS, JOB_STATS)
     
     logger.info(f"Job {job.chain_job_id} assigned to worker {assignment.worker_address}")
     return job
@@ -251,8 +388,15 @@ async def complete_job(
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    if job.status != "assigned":
-        raise HTTPException(status_code=400, detail="Job is not in assigned status")
+    # A job split into several chunks is rendered by several workers and
+    # completes as its chunks do
+    chunk_count_query = select(func.count(JobChunk.id)).where(JobChunk.job_id == job.id)
+    chunk_count_result = await db.execute(chunk_count_query)
+    if chunk_count_result.scalar() > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Job has several chunks; complete them with POST /jobs/{job_id}/chunks/{chunk_index}/complete"
+        )
     
     # Combine result CID parts
     full_result_cid = None
@@ -261,26 +405,55 @@ async def complete_job(
         if completion.result_cid_part2:
             full_result_cid += completion.result_cid_part2
     
-    # Update job
-    job.result_cid_part1 = completion.result_cid_part1
-    job.result_cid_part2 = completion.result_cid_part2
-    job.full_result_cid = full_result_cid
-    job.quality_score = completion.quality_score
-    job.status = "completed"
-    job.completed_at = func.now()
+    # Complete the job in one statement; a concurrent or retried completion
+    # finds it no longer assigned and matches no row
+    complete_result = await db.execute(
+        update(Job)
+        .where(and_(Job.id == job.id, Job.status == "assigned"))
+        .values(
+            result_cid_part1=completion.result_cid_part1,
+            result_cid_part2=completion.result_cid_part2,
+            full_result_cid=full_result_cid,
+            quality_score=completion.quality_score,
+            status="completed",
+            completed_at=func.now()
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = complete_result.scalar_one_or_none()
+    
+    if not job:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Job is not in assigned status")
+    
+    await db.execute(
+        update(JobChunk)
+        .where(and_(JobChunk.job_id == job.id, JobChunk.status != "completed"))
+        .values(status="completed", completed_at=func.now(), result_cid=full_result_cid)
+    )
+    
+    stale = [job_tag(job.chain_job_id), JOB_LISTS, JOB_STATS]
     
     # Update worker stats
     if job.worker_id:
-        worker_query = select(Worker).where(Worker.id == job.worker_id)
-        worker_result = await db.execute(worker_query)
-        worker = worker_result.scalar_one_or_none()
-        
-        if worker:
-            worker.jobs_completed += 1
-            worker.total_earnings += job.reward_amount
-            worker.last_seen = func.now()
+        credit_result = await db.execute(
+            update(Worker)
+            .where(Worker.id == job.worker_id)
+            .values(
+                jobs_completed=Worker.jobs_completed + 1,
+                total_earnings=Worker.total_earnings + job.reward_amount,
+                last_seen=func.now()
+            )
+            .returning(Worker.address)
+            .execution_options(synchronize_session=False)
+        )
+        worker_address = credit_result.scalar_one_or_none()
+        if worker_address:
+            stale += [worker_tag(worker_address), WORKER_LISTS]
     
     await db.commit()
+    await get_response_cache().invalidate(*stale)
     await db.refresh(job)
     
     # Create completion event
@@ -296,11 +469,362 @@ async def complete_job(
     logger.info(f"Job {job.chain_job_id} completed with quality score {completion.quality_score}")
     return job
 
+async def _find_job(job_id: str, db: AsyncSession) -> Job:
+    """Look up a job by UUID or chain job ID, raising 400/404 like the other endpoints"""
+    try:
+        query = select(Job).where(Job.id == job_id)
+        result = await db.execute(query)
+        job = result.scalar_one_or_none()
+        
+        if not job:
+            chain_job_id = int(job_id)
+            query = select(Job).where(Job.chain_job_id == chain_job_id)
+            result = await db.execute(query)
+            job = result.scalar_one_or_none()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job ID format")
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
+
+@router.get("/{job_id}/chunks", response_model=List[JobChunkResponse])
+async def get_job_chunks(
+    job_id: str,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Get the frame chunks of a job and their progress"""
+    job = await _find_job(job_id, db)
+    
+    chunks_query = select(JobChunk).where(JobChunk.job_id == job.id).order_by(JobChunk.chunk_index)
+    chunks_result = await db.execute(chunks_query)
+    return chunks_result.scalars().all()
+
+async def _get_eligible_worker(worker_address: str, db: AsyncSession) -> Worker:
+    """Look up a worker that may take jobs, raising 404/400 otherwise"""
+    worker_query = select(Worker).where(Worker.address == worker_address)
+    worker_result = await db.execute(worker_query)
+    worker = worker_result.scalar_one_or_none()
+    
+    if not worker:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    
+    # Check worker eligibility
+    if not worker.verified or not worker.active:
+        raise HTTPException(status_code=400, detail="Worker is not eligible (not verified or active)")
+    
+    return worker
+
+def _claimable_chunk(chunk):
+    """Condition for an open chunk that can be handed out now.
+
+    A stitch chunk only qualifies once every region of its job has been
+    rendered.
+    """
+    region = aliased(JobChunk)
+    pending_regions = select(region.id).where(
+        and_(region.job_id == chunk.job_id, region.kind == "render", region.status != "completed")
+    ).exists()
+    return and_(chunk.status == "open", or_(chunk.kind == "render", ~pending_regions))
+
+async def _claim_chunks(
+    db: AsyncSession,
+    worker: Worker,
+    limit: int,
+    job_id: Optional[Any] = None
+) -> List[JobChunk]:
+    """Assign up to ``limit`` open chunks to a worker in a single UPDATE.
+
+    Candidates are picked and locked with FOR UPDATE SKIP LOCKED inside the
+    UPDATE itself, so concurrent claims never wait on each other for chunks
+    and never get the same chunk. A stitch chunk only qualifies once every
+    region of its job has been rendered. Jobs whose last open chunk was
+    claimed leave the open pool; claims on the same job queue briefly on the
+    job row for that check. The caller commits.
+    """
+    candidate = aliased(JobChunk)
+    
+    candidates = (
+        select(candidate.id)
+        .join(Job, Job.id == candidate.job_id)
+        .where(
+            and_(
+                _claimable_chunk(candidate),
+                Job.status == "open",
+                Job.deadline > func.now(),
+                Job.min_reputation <= worker.reputation
+            )
+        )
+        .order_by(Job.reward_amount.desc(), Job.created_at, candidate.chunk_index)
+        .limit(limit)
+        .with_for_update(of=candidate, skip_locked=True)
+    )
+    if job_id is not None:
+        candidates = candidates.where(candidate.job_id == job_id)
+    
+    claim_result = await db.execute(
+        update(JobChunk)
+        .where(JobChunk.id.in_(candidates))
+        .values(status="assigned", worker_id=worker.id, assigned_at=func.now())
+        .returning(JobChunk)
+        .execution_options(synchronize_session=False)
+    )
+    chunks = claim_result.scalars().all()
+    if not chunks:
+        return []
+    
+    # Lock the jobs, in a fixed order, before looking at their other chunks.
+    # When a job's last chunks are claimed at once, neither claim sees the
+    # other's uncommitted chunk as taken; the later one waits here until the
+    # earlier commits and then sees it, so one of them always closes the job.
+    job_ids = sorted({chunk.job_id for chunk in chunks})
+    await db.execute(select(Job.id).where(Job.id.in_(job_ids)).order_by(Job.id).with_for_update())
+    
+    # The job leaves the open pool once its last chunk is claimed; a
+    # single-chunk job belongs to the worker that claimed it
+    open_chunks = select(JobChunk.id).where(
+        and_(JobChunk.job_id == Job.id, JobChunk.status == "open")
+    ).exists()
+    chunk_count = select(func.count(JobChunk.id)).where(JobChunk.job_id == Job.id).scalar_subquery()
+    await db.execute(
+        update(Job)
+        .where(and_(Job.id.in_(job_ids), Job.status == "open", ~open_chunks))
+        .values(
+            status="assigned",
+            assigned_at=func.now(),
+            worker_id=case((chunk_count == 1, worker.id), else_=Job.worker_id)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    
+    # Chunk assignment events go out in the same transaction
+    db.add_all([
+        JobEvent(
+            job_id=chunk.job_id,
+            event_type="chunk_assigned",
+            actor_address=worker.address,
+            event_data=f'{{"worker_address": "{worker.address}", "chunk_index": {chunk.chunk_index}, "frames": [{chunk.frame_start}, {chunk.frame_end}]}}'
+        )
+        for chunk in chunks
+    ])
+    
+    return list(chunks)
+
+@router.post("/claim", response_model=List[JobChunkAssignment])
+async def claim_jobs(
+    claim: JobClaim,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Atomically hand a worker its next eligible chunks, best paid first.
+
+    Hundreds of workers can call this at once: each gets different chunks, and
+    claims only queue, briefly, when they take the last chunks of one job.
+    """
+    worker = await _get_eligible_worker(claim.worker_address, db)
+    
+    chunks = await _claim_chunks(db, worker, claim.limit)
+    
+    jobs = {}
+    if chunks:
+        jobs_query = select(Job).where(Job.id.in_({chunk.job_id for chunk in chunks}))
+        jobs_result = await db.execute(jobs_query)
+        jobs = {job.id: job for job in jobs_result.scalars().all()}
+    
+    await db.commit()
+    
+    if chunks:
+        await get_response_cache().invalidate(
+            *[job_tag(job.chain_job_id) for job in jobs.values()], JOB_LISTS, JOB_STATS
+        )
+        logger.info(f"Worker {claim.worker_address} claimed {len(chunks)} chunk(s)")
+    
+    return [
+        JobChunkAssignment(
+            **JobChunkResponse.model_validate(chunk).model_dump(),
+            chain_job_id=jobs[chunk.job_id].chain_job_id,
+            full_asset_cid=jobs[chunk.job_id].full_asset_cid,
+            reward_amount=jobs[chunk.job_id].reward_amount
+        )
+        for chunk in chunks
+    ]
+
+@router.post("/{job_id}/chunks/claim", response_model=JobChunkResponse)
+async def claim_job_chunk(
+    job_id: str,
+    claim: JobChunkClaim,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Claim the next open frame chunk of a job for a worker"""
+    job = await _find_job(job_id, db)
+    
+    if job.status != "open":
+        raise HTTPException(status_code=400, detail="Job is not available for assignment")
+    
+    worker = await _get_eligible_worker(claim.worker_address, db)
+    
+    if worker.reputation < job.min_reputation:
+        raise HTTPException(status_code=400, detail="Worker reputation too low for this job")
+    
+    chunks = await _claim_chunks(db, worker, 1, job_id=job.id)
+    
+    if not chunks:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="No open frame chunks left for this job")
+    
+    await db.commit()
+    await get_response_cache().invalidate(job_tag(job.chain_job_id), JOB_LISTS, JOB_STATS)
+    chunk = chunks[0]
+    
+    logger.info(f"Job {job.chain_job_id} frames {chunk.frame_start}-{chunk.frame_end} assigned to worker {claim.worker_address}")
+    return chunk
+
+async def _credit_chunk_workers(db: AsyncSession, job: Job, chunks: List[JobChunk]) -> List[str]:
+    """Pay out a completed job's reward across the workers of its chunks.
+
+    Every chunk, the stitch included, earns an equal share; the wei left
+    over from the division goes one each to the first chunks. Each worker
+    that rendered any chunk counts the job once. Returns their addresses.
+    """
+    share, remainder = divmod(job.reward_amount, len(chunks))
+    earnings = {}
+    for position, chunk in enumerate(chunks):
+        if chunk.worker_id:
+            earnings[chunk.worker_id] = earnings.get(chunk.worker_id, 0) + share + (position < remainder)
+    
+    addresses = []
+    for worker_id, amount in earnings.items():
+        credit_result = await db.execute(
+            update(Worker)
+            .where(Worker.id == worker_id)
+            .values(
+                jobs_completed=Worker.jobs_completed + 1,
+                total_earnings=Worker.total_earnings + amount
+            )
+            .returning(Worker.address)
+            .execution_options(synchronize_session=False)
+        )
+        addresses += credit_result.scalars().all()
+    return addresses
+
+@router.post("/{job_id}/chunks/{chunk_index}/complete", response_model=JobChunkResponse)
+async def complete_job_chunk(
+    job_id: str,
+    chunk_index: int,
+    completion: JobChunkCompletion,
+    db: AsyncSession = Depends(get_db_session)
+):
+    """Record the result of a frame chunk; completes the job once every chunk is done"""
+    job = await _find_job(job_id, db)
+    
+    chunk_query = select(JobChunk).where(
+        and_(JobChunk.job_id == job.id, JobChunk.chunk_index == chunk_index)
+    )
+    chunk_result = await db.execute(chunk_query)
+    chunk = chunk_result.scalar_one_or_none()
+    
+    if not chunk:
+        raise HTTPException(status_code=404, detail="Chunk not found")
+    
+    worker = None
+    if chunk.worker_id:
+        worker_query = select(Worker).where(Worker.id == chunk.worker_id)
+        worker_result = await db.execute(worker_query)
+        worker = worker_result.scalar_one_or_none()
+    
+    if completion.worker_address and worker and worker.address != completion.worker_address:
+        raise HTTPException(status_code=403, detail="Chunk is assigned to a different worker")
+    
+    # Complete the chunk in one statement; a concurrent or retried completion
+    # of the same chunk finds it no longer assigned and matches no row
+    complete_result = await db.execute(
+        update(JobChunk)
+        .where(and_(JobChunk.id == chunk.id, JobChunk.status == "assigned"))
+        .values(status="completed", completed_at=func.now(), result_cid=completion.result_cid)
+        .returning(JobChunk)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    chunk = complete_result.scalar_one_or_none()
+    
+    if not chunk:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Chunk is not in assigned status")
+    
+    if worker:
+        worker.last_seen = func.now()
+    
+    # Lock the job before looking at its other chunks. When its last chunks
+    # complete at once, the later completion waits here until the earlier one
+    # commits and then sees it, so one of them always finishes the job.
+    job_result = await db.execute(
+        select(Job).where(Job.id == job.id).with_for_update().execution_options(populate_existing=True)
+    )
+    job = job_result.scalar_one()
+    
+    remaining_query = select(JobChunk.kind, JobChunk.status).where(
+        and_(JobChunk.job_id == job.id, JobChunk.status != "completed")
+    )
+    remaining_result = await db.execute(remaining_query)
+    remaining = [tuple(row) for row in remaining_result.all()]
+    job_completed = not remaining
+    # The last region of a split-frame job makes its stitch chunk claimable
+    stitch_ready = remaining == [("stitch", "open")]
+    
+    stale = [job_tag(job.chain_job_id), JOB_LISTS, JOB_STATS]
+    if worker:
+        stale += [worker_tag(worker.address), WORKER_LISTS]
+    
+    if job_completed:
+        chunks_query = (
+            select(JobChunk)
+            .where(JobChunk.job_id == job.id)
+            .order_by(JobChunk.chunk_index)
+            .execution_options(populate_existing=True)
+        )
+        chunks = (await db.execute(chunks_query)).scalars().all()
+        if len(chunks) == 1 or chunk.kind == "stitch":
+            # A single chunk or the stitched frame is the job's result; record it on the job itself
+            job.result_cid_part1 = completion.result_cid[:31]
+            job.result_cid_part2 = completion.result_cid[31:] or None
+            job.full_result_cid = completion.result_cid
+        else:
+            # An animation's result is its chunks' frames, in order
+            job.result_cids = json.dumps([c.result_cid for c in chunks])
+        job.quality_score = completion.quality_score
+        # Several workers may share a chunked job; the one that finished it is recorded
+        job.worker_id = job.worker_id or chunk.worker_id
+        job.status = "completed"
+        job.completed_at = func.now()
+        credited = await _credit_chunk_workers(db, job, chunks)
+        stale += [worker_tag(address) for address in credited] + [WORKER_LISTS]
+    
+    await db.commit()
+    await get_response_cache().invalidate(*stale)
+    await db.refresh(chunk)
+    
+    # Create chunk completion event
+    event = JobEvent(
+        job_id=job.id,
+        event_type="completed" if job_completed else "chunk_completed",
+        actor_address=completion.worker_address,
+        event_data=f'{{"chunk_index": {chunk.chunk_index}, "frames": [{chunk.frame_start}, {chunk.frame_end}], "result_cid": "{completion.result_cid}"}}'
+    )
+    db.add(event)
+    await db.commit()
+    
+    if stitch_ready:
+        await get_job_notifier().publish(job_opened_event(job, reason="stitch_ready"))
+    
+    logger.info(f"Job {job.chain_job_id} frames {chunk.frame_start}-{chunk.frame_end} completed{' (job complete)' if job_completed else ''}")
+    return chunk
+
 @router.get("/{job_id}/events", response_model=List[JobEventResponse])
 async def get_job_events(
     job_id: str,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get events for a specific job"""
@@ -322,42 +846,28 @@ async def get_job_events(
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Get events
-    events_query = select(JobEvent).where(JobEvent.job_id == job.id).order_by(
-        JobEvent.timestamp.desc()
-    ).offset(skip).limit(limit)
+    events_query = JOB_EVENTS_BY_NEWEST.page(
+        select(JobEvent).where(JobEvent.job_id == job.id), cursor, limit, skip
+    )
     
     events_result = await db.execute(events_query)
     events = events_result.scalars().all()
+    JOB_EVENTS_BY_NEWEST.set_next_cursor(response, events, limit)
     
     return events
 
 @router.get("/stats/overview")
+@cached(JOB_STATS)
 async def get_jobs_stats(db: AsyncSession = Depends(get_db_session)):
-    """Get overall job statistics"""
-    # Total jobs
-    total_query = select(func.count(Job.id))
-    total_result = await db.execute(total_query)
-    total_jobs = total_result.scalar()
-    
-    # Jobs by status
-    status_query = select(Job.status, func.count(Job.id)).group_by(Job.status)
-    status_result = await db.execute(status_query)
-    status_counts = dict(status_result.all())
-    
-    # Average reward
-    avg_reward_query = select(func.avg(Job.reward_amount))
-    avg_reward_result = await db.execute(avg_reward_query)
-    avg_reward = avg_reward_result.scalar() or 0
-    
-    # Jobs in last 24 hours
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    recent_query = select(func.count(Job.id)).where(Job.created_at >= yesterday)
-    recent_result = await db.execute(recent_query)
-    recent_jobs = recent_result.scalar()
+    """Get overall job statistics (from stats_counters; the last 24h is to the hour)"""
+    totals, recent = await read_stats(db, "jobs.", since=datetime.now(timezone.utc) - timedelta(days=1))
+    
+    total_jobs = int(totals.get("jobs.created", 0))
+    avg_reward = totals.get("jobs.created_reward", Decimal(0)) / total_jobs if total_jobs else Decimal(0)
     
     return {
         "total_jobs": total_jobs,
-        "jobs_by_status": status_counts,
-        "average_reward": str(avg_reward),
-        "jobs_last_24h": recent_jobs
+        "jobs_by_status": counters_by_suffix(totals, "jobs.status."),
+        "average_reward": f"{avg_reward:f}",
+        "jobs_last_24h": int(recent.get("jobs.created", 0))
     }
@@ -0,0 +1,101 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read with a WHERE on the sort columns, starting just past the last
+row of the previous page, instead of OFFSET. Page N then costs the same as
+page 1 as long as an index covers the sort. The cursor is that last row's
+sort values, base64-encoded so clients treat it as opaque. It goes out in
+the X-Next-Cursor header, so list responses keep their shape and
+skip/limit clients keep working. A request sends either a cursor or a
+skip, not both.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, literal, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CURSOR_DESCRIPTION = f"{NEXT_CURSOR_HEADER} header of the previous page"
+
+
+class Keyset:
+    """Sort order of a list endpoint, as (column, descending) pairs.
+
+    The last column must be unique (the primary key) so every row has exactly
+    one position and pages never skip or repeat rows.
+    """
+
+    def __init__(self, *order: Tuple[Any, bool]):
+        self.order = order
+
+    def page(self, query, cursor: Optional[str], limit: int, skip: int = 0):
+        """Order ``query`` by the keyset and limit it to the page after ``cursor``, or after ``skip`` rows"""
+        if cursor:
+            if skip:
+                # The cursor already marks the position; skipping too would drop rows
+                raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+            query = query.where(self._after(self.decode(cursor)))
+        return query.order_by(*[
+            column.desc() if descending else column.asc()
+            for column, descending in self.order
+        ]).limit(limit).offset(skip)
+
+    def set_next_cursor(self, response: Optional[Response], rows: Sequence[Any], limit: int):
+        """Point the client at the next page; a short page is the last one"""
+        if response is not None and rows and len(rows) >= limit:
+            response.headers[NEXT_CURSOR_HEADER] = self.encode(rows[-1])
+
+    def encode(self, row: Any) -> str:
+        values = []
+        for column, _ in self.order:
+            value = getattr(row, column.key)
+            if isinstance(value, (datetime, UUID)):
+                value = str(value) if isinstance(value, UUID) else value.isoformat()
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.order):
+                raise ValueError("wrong number of values")
+            return [
+                self._parse(column, value)
+                for (column, _), value in zip(self.order, values)
+            ]
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    def _parse(column, value: Any) -> Any:
+        python_type = column.type.python_type
+        if value is None or isinstance(value, python_type):
+            return value
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is UUID:
+            return UUID(value)
+        raise ValueError(f"bad value for {column.key}")
+
+    def _after(self, values: List[Any]):
+        """Rows sorting after ``values``"""
+        columns = [column for column, _ in self.order]
+        directions = {descending for _, descending in self.order}
+        if len(directions) == 1:
+            # A row comparison, which Postgres matches against a composite index
+            bound = tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+            return tuple_(*columns) < bound if directions.pop() else tuple_(*columns) > bound
+
+        # Mixed directions: (a > x) OR (a = x AND b < y) OR ...
+        conditions = []
+        for position, (column, descending) in enumerate(self.order):
+            ties = [columns[i] == values[i] for i in range(position)]
+            step = column < values[position] if descending else column > values[position]
+            conditions.append(and_(*ties, step))
+        return or_(*conditions)
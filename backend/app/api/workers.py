@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 from app.database import get_db_session
 from app.models import Worker, Job, ReputationHistory
+from app.api.pagination import Keyset, CURSOR_DESCRIPTION
+from app.api.jobs import JOBS_BY_NEWEST
+from app.api.caching import CachedRoute, cached
 from app.schemas.workers import (
     WorkerResponse, 
     WorkerCreate, 
@@ -12,6 +15,8 @@ from app.schemas.workers import (
     ReputationHistoryResponse
 )
 from app.services.starknet_client import get_starknet_client
+from app.services.stats import read_stats
+from app.services.response_cache import get_response_cache, worker_tag, WORKER_LISTS, WORKER_STATS
 from app.auth.dependencies import (
     require_authenticated_worker, 
     require_admin_worker, 
@@ -20,12 +25,17 @@ from app.auth.dependencies import (
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
+
+WORKERS_BY_REPUTATION = Keyset((Worker.reputation, True), (Worker.id, True))
+REPUTATION_HISTORY_BY_NEWEST = Keyset((ReputationHistory.timestamp, True), (ReputationHistory.id, True))
 
 @router.get("/", response_model=List[WorkerResponse])
 async def get_workers(
-    skip: int = Query(0, ge=0, description="Number of workers to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of workers to skip (prefer cursor for deep pages)"),
     limit: int = Query(100, ge=1, le=1000, description="Number of workers to return"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     verified_only: bool = Query(False, description="Return only verified workers"),
     active_only: bool = Query(True, description="Return only active workers"),
     min_reputation: Optional[int] = Query(None, ge=0, le=1000, description="Minimum reputation score"),
@@ -43,14 +53,16 @@ async def get_workers(
     if min_reputation is not None:
         query = query.where(Worker.reputation >= min_reputation)
     
-    query = query.offset(skip).limit(limit).order_by(Worker.reputation.desc())
+    query = WORKERS_BY_REPUTATION.page(query, cursor, limit, skip)
     
     result = await db.execute(query)
     workers = result.scalars().all()
+    WORKERS_BY_REPUTATION.set_next_cursor(response, workers, limit)
     
     return workers
 
 @router.get("/{worker_address}", response_model=WorkerResponse)
+@cached(entity=lambda worker: worker_tag(worker["address"]))
 async def get_worker(
     worker_address: str,
     db: AsyncSession = Depends(get_db_session)
@@ -91,6 +103,7 @@ async def register_worker(
     
     db.add(worker)
     await db.commit()
+    await get_response_cache().invalidate(WORKER_LISTS, WORKER_STATS)
     await db.refresh(worker)
     
     logger.info(f"Worker registered: {worker.address}")
@@ -124,6 +137,7 @@ async def update_worker(
         setattr(worker, field, value)
     
     await db.commit()
+    await get_response_cache().invalidate(worker_tag(worker.address), WORKER_LISTS, WORKER_STATS)
     await db.refresh(worker)
     
     logger.info(f"Worker updated: {worker.address} by {current_worker.address}")
@@ -148,6 +162,7 @@ async def verify_worker(
     worker.verified_at = func.now()
     
     await db.commit()
+    await get_response_cache().invalidate(worker_tag(worker.address), WORKER_LISTS, WORKER_STATS)
     
     logger.info(f"Worker verified: {worker.address} by {admin_worker.address}")
     return {"message": "Worker verified successfully"}
@@ -155,8 +170,10 @@ async def verify_worker(
 @router.get("/{worker_address}/reputation-history", response_model=List[ReputationHistoryResponse])
 async def get_worker_reputation_history(
     worker_address: str,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get worker's reputation history"""
@@ -169,21 +186,24 @@ async def get_worker_reputation_history(
         raise HTTPException(status_code=404, detail="Worker not found")
     
     # Get reputation history
-    query = select(ReputationHistory).where(
-        ReputationHistory.worker_id == worker.id
-    ).order_by(ReputationHistory.timestamp.desc()).offset(skip).limit(limit)
+    query = REPUTATION_HISTORY_BY_NEWEST.page(
+        select(ReputationHistory).where(ReputationHistory.worker_id == worker.id), cursor, limit, skip
+    )
     
     result = await db.execute(query)
     history = result.scalars().all()
+    REPUTATION_HISTORY_BY_NEWEST.set_next_cursor(response, history, limit)
     
     return history
 
 @router.get("/{worker_address}/jobs", response_model=List[dict])
 async def get_worker_jobs(
     worker_address: str,
+    response: Response,
     status: Optional[str] = Query(None, description="Filter by job status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
     db: AsyncSession = Depends(get_db_session)
 ):
     """Get jobs assigned to a worker"""
@@ -201,39 +221,26 @@ async def get_worker_jobs(
     if status:
         query = query.where(Job.status == status)
     
-    query = query.order_by(Job.created_at.desc()).offset(skip).limit(limit)
+    query = JOBS_BY_NEWEST.page(query, cursor, limit, skip)
     
     result = await db.execute(query)
     jobs = result.scalars().all()
+    JOBS_BY_NEWEST.set_next_cursor(response, jobs, limit)
     
     return jobs
 
 @router.get("/stats/overview")
+@cached(WORKER_STATS)
 async def get_workers_stats(db: AsyncSession = Depends(get_db_session)):
-    """Get overall worker statistics"""
-    # Total workers
-    total_query = select(func.count(Worker.id))
-    total_result = await db.execute(total_query)
-    total_workers = total_result.scalar()
-    
-    # Verified workers
-    verified_query = select(func.count(Worker.id)).where(Worker.verified == True)
-    verified_result = await db.execute(verified_query)
-    verified_workers = verified_result.scalar()
-    
-    # Active workers
-    active_query = select(func.count(Worker.id)).where(Worker.active == True)
-    active_result = await db.execute(active_query)
-    active_workers = active_result.scalar()
-    
-    # Average reputation
-    avg_reputation_query = select(func.avg(Worker.reputation)).where(Worker.active == True)
-    avg_reputation_result = await db.execute(avg_reputation_query)
-    avg_reputation = avg_reputation_result.scalar() or 0
+    """Get overall worker statistics (from stats_counters)"""
+    totals, _ = await read_stats(db, "workers.")
+    
+    active_workers = int(totals.get("workers.active", 0))
+    avg_reputation = totals.get("workers.active_reputation", 0) / active_workers if active_workers else 0
     
     return {
-        "total_workers": total_workers,
-        "verified_workers": verified_workers,
+        "total_workers": int(totals.get("workers.registered", 0)),
+        "verified_workers": int(totals.get("workers.verified", 0)),
         "active_workers": active_workers,
         "average_reputation": round(float(avg_reputation), 2)
     }
@@ -20,6 +20,14 @@ class Settings(BaseSettings):
     
     # StarkNet settings
     starknet_rpc_url: str = os.getenv("STARKNET_RPC_URL") or "http://localhost:5050"
+    starknet_rpc_failover_urls: str = os.getenv("STARKNET_RPC_FAILOVER_URLS") or ""  # Comma-separated, tried in order when the main RPC URL fails
+    rpc_max_concurrency: int = os.getenv("RPC_MAX_CONCURRENCY") or 8  # Concurrent HTTP requests per RPC URL
+    rpc_rate_limit: float = os.getenv("RPC_RATE_LIMIT") or 0  # Calls per second per RPC URL, 0 for no limit
+    rpc_batch_window: float = os.getenv("RPC_BATCH_WINDOW") or 0.005  # Seconds to gather calls into one batch request, 0 to disable
+    rpc_max_batch_size: int = os.getenv("RPC_MAX_BATCH_SIZE") or 50
+    rpc_failover_cooldown: float = os.getenv("RPC_FAILOVER_COOLDOWN") or 30  # Seconds a failing RPC URL is skipped
+    view_cache_ttl: float = os.getenv("VIEW_CACHE_TTL") or 60  # Seconds contract view results are reused; the indexer drops them sooner on events
+    view_cache_max_size: int = os.getenv("VIEW_CACHE_MAX_SIZE") or 10000  # Cached view results, least recently used evicted first
     contract_address: str = os.getenv("JOB_REGISTRY_CONTRACT_ADDRESS") or "0x0315980c7693d042ed612f84cd513f1751688170cd29ed04f4eaa51ec1c26381"
     contract_abi_path: str = "./fluxframe_job_registry_JobRegistry.contract_class.json"
     # contract_abi_path: str = "./contracts/job_registry/target/dev/fluxframe_job_registry.contract_class.json"
@@ -30,6 +38,15 @@ class Settings(BaseSettings):
     enable_event_indexing: bool = os.getenv("ENABLE_EVENT_INDEXING") or True
     start_block: int = os.getenv("START_BLOCK") or 0
     indexer_poll_interval: int = os.getenv("INDEXER_POLL_INTERVAL") or 10
+    indexer_chunk_size: int = os.getenv("INDEXER_CHUNK_SIZE") or 100  # Initial blocks per range; adapts to event density
+    indexer_max_chunk_size: int = os.getenv("INDEXER_MAX_CHUNK_SIZE") or 5000
+    indexer_max_in_flight: int = os.getenv("INDEXER_MAX_IN_FLIGHT") or 4  # Block ranges fetched concurrently while catching up
+    indexer_target_latency: float = os.getenv("INDEXER_TARGET_LATENCY") or 2.0  # Seconds per range fetch to aim for
+    indexer_confirmation_depth: int = os.getenv("INDEXER_CONFIRMATION_DEPTH") or 3  # Blocks behind the head that are left unindexed
+
+    # Job dispatch settings
+    job_stream_keepalive: int = os.getenv("JOB_STREAM_KEEPALIVE") or 15  # Seconds between SSE keepalives
+    job_notify_backend: str = os.getenv("JOB_NOTIFY_BACKEND") or "local"  # "local" or "postgres" (LISTEN/NOTIFY across processes)
 
     # The Graph settings
     use_graph: bool = not enable_event_indexing or False  # Use The Graph instead of direct indexing
@@ -38,6 +55,11 @@ class Settings(BaseSettings):
     
     # Redis settings
     redis_url: str = os.getenv("REDIS_URL") or "redis://localhost:6379"
+
+    # Response cache settings
+    response_cache_backend: str = os.getenv("RESPONSE_CACHE_BACKEND") or "memory"  # "memory", "redis" (shared by API processes, at redis_url) or "off"
+    response_cache_ttl: float = os.getenv("RESPONSE_CACHE_TTL") or 30  # Seconds a cached response is served; writes drop it sooner
+    response_cache_max_size: int = os.getenv("RESPONSE_CACHE_MAX_SIZE") or 5000  # Cached responses per process (memory backend), least recently used evicted first
     
     # IPFS settings
     ipfs_url: str = os.getenv("IPFS_API_URL") or "http://localhost:5001"
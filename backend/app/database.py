@@ -1,11 +1,18 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
+import os
 
 settings = get_settings()
 
+# backend/, where alembic.ini and migrations/ live
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pg_advisory_xact_lock key serialising schema setup across processes
+SCHEMA_LOCK_KEY = 7245301
+
 # Async database engine
 async_engine = create_async_engine(
     settings.database_url,
@@ -37,6 +44,20 @@ get_db_session = get_db
 
 
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and apply pending migrations."""
     async with async_engine.begin() as conn:
+        # Several API processes may start at once; let one of them do this
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
         await conn.run_sync(Base.metadata.create_all)
+        # create_all leaves existing tables alone; migrations add keys and indexes introduced since
+        await conn.run_sync(_upgrade_schema)
+
+
+def _upgrade_schema(connection):
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
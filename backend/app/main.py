@@ -4,8 +4,13 @@ import uvicorn
 from app.config import get_settings
 from app.database import get_db_session
 from app.api import workers, jobs, events
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.api.caching import ETAG_HEADER
 from app.auth import routes as auth_routes
 from app.services.event_indexer import EventIndexer
+from app.services.job_notifier import get_job_notifier
+from app.services.rpc_transport import close_rpc_transport
+from app.services.response_cache import close_response_cache
 import asyncio
 import logging
 
@@ -30,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
 )
 
 # Include routers
@@ -55,6 +61,10 @@ async def startup_event():
     from app.database import init_db
     await init_db()
     
+    # Share job notifications between API processes
+    if settings.job_notify_backend == "postgres":
+        get_job_notifier().start_listener(settings.database_url.replace("+asyncpg", ""))
+    
     # Start event indexer
     if settings.enable_event_indexing:
         logger.info("Starting event indexer...")
@@ -72,6 +82,10 @@ async def shutdown_event():
     if event_indexer:
         await event_indexer.stop()
     
+    await get_job_notifier().stop_listener()
+    await close_rpc_transport()
+    await close_response_cache()
+    
     logger.info("FluxFrame Backend API stopped")
 
 @app.get("/")
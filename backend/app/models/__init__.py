@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, BigInteger, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, BigInteger, ForeignKey, UniqueConstraint, Float, Index, Numeric, SmallInteger, desc, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
@@ -63,7 +63,7 @@ class Worker(Base):
     verified_by = Column(String(66), nullable=True)  # Verifier address
     
     # Reputation and stats
-    reputation = Column(Integer, default=500)  # 0-1000 scale
+    reputation = Column(Integer, nullable=False, default=500, server_default="500")  # 0-1000 scale
     jobs_completed = Column(Integer, default=0)
     jobs_failed = Column(Integer, default=0)
     total_earnings = Column(BigInteger, default=0)  # In wei
@@ -78,6 +78,11 @@ class Worker(Base):
     is_admin = Column(Boolean, default=False)
     last_seen = Column(DateTime(timezone=True), nullable=True)
     
+    __table_args__ = (
+        # Workers by reputation, for listing
+        Index("ix_workers_reputation", desc("reputation"), desc("id")),
+    )
+    
     # Relationships
     jobs_assigned = relationship("Job", back_populates="worker")
     reputation_history = relationship("ReputationHistory", back_populates="worker")
@@ -97,6 +102,15 @@ class Job(Base):
     min_reputation = Column(Integer, default=400)
     required_capabilities = Column(Text, nullable=True)  # JSON string
     
+    # Frame range; animations are split into chunks that workers claim separately
+    frame_start = Column(Integer, nullable=False, default=1, server_default="1")
+    frame_end = Column(Integer, nullable=False, default=1, server_default="1")
+    frames_per_chunk = Column(Integer, nullable=True)  # None renders the whole range as one chunk
+    
+    # Split-frame mode: a still is divided into tiles_x * tiles_y border regions
+    tiles_x = Column(Integer, nullable=False, default=1, server_default="1")
+    tiles_y = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # Assignment and completion
     worker_id = Column(UUID(as_uuid=True), ForeignKey('workers.id'), nullable=True)
     assigned_at = Column(DateTime(timezone=True), nullable=True)
@@ -104,16 +118,64 @@ class Job(Base):
     result_cid_part1 = Column(String(255), nullable=True)
     result_cid_part2 = Column(String(255), nullable=True)
     full_result_cid = Column(String(510), nullable=True)  # Combined result CID
+    result_cids = Column(Text, nullable=True)  # JSON list of chunk result CIDs, in frame order, for animations rendered as several chunks
     quality_score = Column(Integer, nullable=True)  # 0-100
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String(20), default="open")  # open, assigned, completed, cancelled
     
+    # Indexes for the hot listing queries; see migrations/versions/0002 and 0003
+    __table_args__ = (
+        # Open jobs by reward: /jobs/available and chunk claims
+        Index("ix_jobs_open_by_reward", desc("reward_amount"), "created_at", postgresql_where=text("status = 'open'")),
+        # All jobs, newest first (id breaks ties for cursor pagination)
+        Index("ix_jobs_created_at", desc("created_at"), desc("id")),
+        # A worker's jobs, optionally by status, newest first
+        Index("ix_jobs_worker_status_created_at", "worker_id", "status", desc("created_at"), desc("id")),
+    )
+    
     # Relationships
     creator = relationship("User", back_populates="jobs_created")
     worker = relationship("Worker", back_populates="jobs_assigned")
     events = relationship("JobEvent", back_populates="job", cascade="all, delete-orphan")
+    chunks = relationship("JobChunk", back_populates="job", cascade="all, delete-orphan", order_by="JobChunk.chunk_index")
+
+
+class JobChunk(Base):
+    __tablename__ = "job_chunks"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    kind = Column(String(20), nullable=False, default="render", server_default="render")  # render, stitch
+    
+    # Inclusive frame range rendered by this chunk
+    frame_start = Column(Integer, nullable=False)
+    frame_end = Column(Integer, nullable=False)
+    
+    # Border region (0-1, Blender's origin is bottom left) for split-frame jobs
+    border_min_x = Column(Float, nullable=True)
+    border_max_x = Column(Float, nullable=True)
+    border_min_y = Column(Float, nullable=True)
+    border_max_y = Column(Float, nullable=True)
+    
+    # Assignment and completion
+    status = Column(String(20), default="open")  # open, assigned, completed
+    worker_id = Column(UUID(as_uuid=True), ForeignKey("workers.id"), nullable=True)
+    assigned_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    result_cid = Column(String(510), nullable=True)  # CID of the rendered frames
+    
+    __table_args__ = (
+        UniqueConstraint("job_id", "chunk_index", name="uq_job_chunks_job_chunk_index"),
+        # Claimable chunks per job
+        Index("ix_job_chunks_open", "job_id", "chunk_index", postgresql_where=text("status = 'open'")),
+    )
+    
+    # Relationships
+    job = relationship("Job", back_populates="chunks")
+    worker = relationship("Worker")
 
 
 class JobEvent(Base):
@@ -131,6 +193,11 @@ class JobEvent(Base):
     actor_address = Column(String(66), nullable=True)  # Who triggered the event
     event_data = Column(Text, nullable=True)  # JSON string with event details
     
+    __table_args__ = (
+        # A job's events, newest first
+        Index("ix_job_events_job_id_timestamp", "job_id", desc("timestamp"), desc("id")),
+    )
+    
     # Relationships
     job = relationship("Job", back_populates="events")
 
@@ -156,6 +223,11 @@ class ReputationHistory(Base):
     transaction_hash = Column(String(66), nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
+    __table_args__ = (
+        # A worker's reputation history, newest first
+        Index("ix_reputation_history_worker_id_timestamp", "worker_id", desc("timestamp"), desc("id")),
+    )
+    
     # Relationships
     worker = relationship("Worker", back_populates="reputation_history")
 
@@ -166,8 +238,8 @@ class ContractEvent(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Blockchain data
-    transaction_hash = Column(String(66), nullable=False, index=True)
-    block_number = Column(BigInteger, nullable=False, index=True)
+    transaction_hash = Column(String(66), nullable=False)  # Looked up through the unique key below
+    block_number = Column(BigInteger, nullable=False)  # Indexed with event_index below
     event_index = Column(Integer, nullable=False)
     contract_address = Column(String(66), nullable=False)
     
@@ -182,5 +254,44 @@ class ContractEvent(Base):
     
     # Unique constraint to prevent duplicate events
     __table_args__ = (
-        {"schema": None},
+        UniqueConstraint("transaction_hash", "event_index", name="uq_contract_events_tx_event_index"),
+        # Events in chain order
+        Index("ix_contract_events_block_event", "block_number", "event_index", "id"),
     )
+
+
+class StatsCounter(Base):
+    __tablename__ = "stats_counters"
+    
+    # Counters behind the /stats endpoints, kept up to date by triggers on jobs,
+    # workers, contract_events and reputation_history (migrations/versions/0004, 0005, 0010).
+    # A counter is the sum of its slots' values.
+    period = Column(String(10), primary_key=True)  # all, day, hour
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # UTC start of the day or hour; the epoch for "all"
+    name = Column(String(100), primary_key=True)  # e.g. jobs.created, jobs.status.open, events.type.JobCreated
+    slot = Column(SmallInteger, primary_key=True, default=0, server_default="0")  # Spreads concurrent writers over rows
+    value = Column(Numeric, nullable=False, default=0)  # Sums of rewards outgrow BIGINT
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class IndexerCheckpoint(Base):
+    __tablename__ = "indexer_checkpoints"
+    
+    # One row per indexed contract
+    contract_address = Column(String(66), primary_key=True)
+    
+    # Last fully indexed block, written in the same transaction as its events
+    block_number = Column(BigInteger, nullable=False)
+    block_hash = Column(String(66), nullable=True)
+    
+    # Metadata
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class IndexerBlockHash(Base):
+    __tablename__ = "indexer_block_hashes"
+    
+    # Hashes of recently indexed blocks, compared against the chain to detect reorgs
+    contract_address = Column(String(66), primary_key=True)
+    block_number = Column(BigInteger, primary_key=True)
+    block_hash = Column(String(66), nullable=False)
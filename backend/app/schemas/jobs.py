@@ -12,10 +12,26 @@ class JobBase(BaseModel):
     deadline: datetime = Field(..., description="Job deadline")
     min_reputation: int = Field(400, description="Minimum worker reputation required")
     required_capabilities: Optional[str] = Field(None, description="JSON string of required capabilities")
+    frame_start: int = Field(1, ge=0, description="First frame to render")
+    frame_end: int = Field(1, ge=0, description="Last frame to render (inclusive)")
+    frames_per_chunk: Optional[int] = Field(None, ge=1, description="Frames per worker chunk (whole range if not set)")
+    tiles_x: int = Field(1, ge=1, le=16, description="Columns of border regions in split-frame mode")
+    tiles_y: int = Field(1, ge=1, le=16, description="Rows of border regions in split-frame mode")
 
 class JobCreate(JobBase):
     """Schema for creating a job"""
-    pass
+
+    @validator('frame_end')
+    def validate_frame_range(cls, v, values):
+        if 'frame_start' in values and v < values['frame_start']:
+            raise ValueError('frame_end must not be before frame_start')
+        return v
+
+    @validator('tiles_y')
+    def validate_split_frame(cls, v, values):
+        if values.get('tiles_x', 1) * v > 1 and values.get('frame_start') != values.get('frame_end'):
+            raise ValueError('Split-frame rendering needs a single frame (frame_start == frame_end)')
+        return v
 
 class JobUpdate(BaseModel):
     """Schema for updating job information"""
@@ -46,11 +62,53 @@ class JobResponse(JobBase):
     result_cid_part1: Optional[str] = None
     result_cid_part2: Optional[str] = None
     full_result_cid: Optional[str] = None
+    result_cids: Optional[str] = Field(None, description="JSON list of chunk result CIDs, in frame order, for animations rendered as several chunks")
     quality_score: Optional[int] = None
     status: str = "open"
 
     model_config = {"from_attributes": True}
 
+class JobClaim(BaseModel):
+    """Schema for atomically claiming a worker's next eligible chunks"""
+    worker_address: str = Field(..., description="Address of the claiming worker")
+    limit: int = Field(1, ge=1, le=50, description="Maximum number of chunks to claim")
+
+class JobChunkClaim(BaseModel):
+    """Schema for claiming the next open frame chunk of a job"""
+    worker_address: str = Field(..., description="Address of the claiming worker")
+
+class JobChunkCompletion(BaseModel):
+    """Schema for completing a frame chunk"""
+    result_cid: str = Field(..., description="IPFS CID of the rendered frames")
+    quality_score: int = Field(100, ge=0, le=100, description="Quality score (0-100)")
+    worker_address: Optional[str] = Field(None, description="Worker who rendered the chunk")
+
+class JobChunkResponse(BaseModel):
+    """Schema for frame chunk responses"""
+    id: UUID
+    job_id: UUID
+    chunk_index: int
+    kind: str = "render"
+    frame_start: int
+    frame_end: int
+    border_min_x: Optional[float] = None
+    border_max_x: Optional[float] = None
+    border_min_y: Optional[float] = None
+    border_max_y: Optional[float] = None
+    status: str = "open"
+    worker_id: Optional[UUID] = None
+    assigned_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    result_cid: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+class JobChunkAssignment(JobChunkResponse):
+    """A claimed chunk together with what the worker needs to render it"""
+    chain_job_id: int
+    full_asset_cid: Optional[str] = None
+    reward_amount: int
+
 class JobEventResponse(BaseModel):
     """Schema for job event responses"""
     id: UUID
@@ -0,0 +1,124 @@
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from starknet_py.hash.selector import get_selector_from_name
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cairo types that decode from a single felt
+UINT_TYPES = {f"core::integer::{name}" for name in ("u8", "u16", "u32", "u64", "u128", "usize", "i8", "i16", "i32", "i64", "i128")}
+ADDRESS_TYPES = {"core::starknet::contract_address::ContractAddress", "core::starknet::class_hash::ClassHash"}
+
+
+def _felt(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def felt_to_short_string(value: int) -> str:
+    """Decode a Cairo short string; fall back to hex for felts that aren't one"""
+    if not value:
+        return ""
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    try:
+        text = raw.decode("ascii")
+    except UnicodeDecodeError:
+        return hex(value)
+    return text if text.isprintable() else hex(value)
+
+
+def _type_reader(cairo_type: str) -> Optional[Tuple[int, Callable[[Sequence[int]], Any]]]:
+    """Number of felts a Cairo type takes and how to turn them into a value"""
+    if cairo_type == "core::felt252" or cairo_type in UINT_TYPES:
+        return 1, lambda felts: felts[0]
+    if cairo_type in ADDRESS_TYPES:
+        return 1, lambda felts: hex(felts[0])
+    if cairo_type == "core::bool":
+        return 1, lambda felts: bool(felts[0])
+    if cairo_type == "core::integer::u256":
+        return 2, lambda felts: felts[0] + (felts[1] << 128)
+    return None
+
+
+class EventType:
+    """Typed decoder for one contract event"""
+
+    def __init__(self, name: str, members: List[Dict[str, str]]):
+        self.name = name
+        self.selector = get_selector_from_name(name)
+        self.record = namedtuple(name, [member["name"] for member in members])
+        self._key_readers = []
+        self._data_readers = []
+        for member in members:
+            reader = _type_reader(member["type"])
+            if reader is None:
+                raise ValueError(f"Unsupported type {member['type']} for {name}.{member['name']}")
+            target = self._key_readers if member["kind"] == "key" else self._data_readers
+            target.append((member["name"], *reader))
+
+    def decode(self, keys: Sequence[int], data: Sequence[int]) -> Tuple:
+        """Decode the keys after the selector and the data felts into a record"""
+        values = {}
+        for felts, readers in ((keys, self._key_readers), (data, self._data_readers)):
+            offset = 0
+            for name, size, read in readers:
+                if offset + size > len(felts):
+                    raise ValueError(f"{self.name} is missing {name}")
+                values[name] = read([_felt(felt) for felt in felts[offset:offset + size]])
+                offset += size
+        return self.record(**values)
+
+
+class EventDecoder:
+    """Selector-keyed table of typed event decoders, built once from a contract ABI.
+
+    Events are looked up by their first key, the selector of the variant name
+    in the contract's Event enum. Flattened component enums contribute their
+    own variants.
+    """
+
+    def __init__(self, abi: List[Dict[str, Any]]):
+        self.by_name: Dict[str, EventType] = {}
+        self.by_selector: Dict[int, EventType] = {}
+
+        events = {entry["name"]: entry for entry in abi if entry.get("type") == "event"}
+        roots = [entry for name, entry in events.items() if name.endswith("::Event") and entry.get("kind") == "enum"]
+        # The contract's own Event enum is the one no other enum refers to
+        nested = {variant["type"] for entry in roots for variant in entry.get("variants", [])}
+        for root in roots:
+            if root["name"] not in nested:
+                self._add_variants(root, events)
+
+    def _add_variants(self, enum: Dict[str, Any], events: Dict[str, Dict[str, Any]]):
+        for variant in enum.get("variants", []):
+            target = events.get(variant["type"])
+            if target is None:
+                continue
+            if target.get("kind") == "enum":
+                # Flat component events are keyed by their own variant names
+                if variant.get("kind") == "flat":
+                    self._add_variants(target, events)
+                continue
+            try:
+                event_type = EventType(variant["name"], target.get("members", []))
+            except ValueError as e:
+                logger.warning(f"Not decoding event {variant['name']}: {e}")
+                continue
+            self.by_name[event_type.name] = event_type
+            self.by_selector[event_type.selector] = event_type
+
+    def decode(self, keys: Sequence[Any], data: Sequence[Any]) -> Optional[Tuple[str, Tuple]]:
+        """Return (event name, record) for a raw event, or None if it isn't one of ours"""
+        if not keys:
+            return None
+        event_type = self.by_selector.get(_felt(keys[0]))
+        if event_type is None:
+            return None
+        return event_type.name, event_type.decode(keys[1:], data)
+
+    def record(self, name: str, values: Dict[str, Any]) -> Tuple:
+        """Rebuild a record from its stored fields"""
+        return self.by_name[name].record(**values)
+
+    def selectors(self, names: Sequence[str]) -> List[int]:
+        """Selectors of the named events, for RPC key filters"""
+        return [self.by_name[name].selector for name in names if name in self.by_name]
@@ -1,28 +1,97 @@
 import asyncio
 import logging
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from app.database import get_db_session
-from app.models import ContractEvent, Worker, Job, ReputationHistory
-from app.services.starknet_client import get_starknet_client
+from app.models import (
+    ContractEvent, Worker, Job, JobChunk, JobEvent, ReputationHistory,
+    IndexerCheckpoint, IndexerBlockHash
+)
+from app.services.job_chunks import build_job_chunks
+from app.services.job_notifier import get_job_notifier, job_opened_event
+from app.services.starknet_client import get_starknet_client, EVENTS_PAGE_SIZE
+from app.services.event_decoder import felt_to_short_string
+from app.services.view_cache import felt_key, get_view_cache
+from app.services.response_cache import (
+    get_response_cache, job_tag, worker_tag,
+    JOB_LISTS, WORKER_LISTS, JOB_STATS, WORKER_STATS, EVENT_STATS
+)
 from app.config import get_settings
 import json
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT, well below Postgres' bind parameter limit
+INSERT_BATCH_SIZE = 1000
+
+# Indexed block hashes kept for finding the fork point of a reorg
+BLOCK_HASH_HISTORY = 128
+
+# Cached contract views each event makes stale, as (view, record fields
+# giving its args); None stands for any value of that arg
+VIEW_INVALIDATIONS = {
+    "JobCreated": [("get_job_info", ("job_id",)), ("is_worker_eligible", (None, "job_id"))],
+    "ResultSubmitted": [("is_worker_eligible", (None, "job_id"))],
+    "JobFinalized": [("get_worker_info", ("worker",)), ("is_worker_eligible", ("worker", None))],
+    "WorkerRegistered": [("get_worker_info", ("worker",)), ("is_worker_eligible", ("worker", None))],
+    "WorkerVerified": [("get_worker_info", ("worker",)), ("is_worker_eligible", ("worker", None))],
+    "ReputationUpdated": [("get_worker_info", ("worker",)), ("is_worker_eligible", ("worker", None))],
+    "ReputationSlashed": [("get_worker_info", ("worker",)), ("is_worker_eligible", ("worker", None))],
+}
+
+# Cached API responses each event makes stale besides those of the job and
+# worker it names; every stored event changes the event stats
+RESPONSE_INVALIDATIONS = {
+    "JobCreated": (JOB_LISTS, JOB_STATS),
+    "ResultSubmitted": (JOB_LISTS, JOB_STATS),
+    "JobFinalized": (JOB_LISTS, JOB_STATS, WORKER_LISTS),
+    "WorkerRegistered": (WORKER_LISTS, WORKER_STATS),
+    "WorkerVerified": (WORKER_LISTS, WORKER_STATS),
+    "ReputationUpdated": (JOB_LISTS, JOB_STATS, WORKER_LISTS, WORKER_STATS),
+    "ReputationSlashed": (WORKER_LISTS, WORKER_STATS),
+}
+
 class EventIndexer:
     def __init__(self):
         self.settings = get_settings()
         self.running = False
         self.last_processed_block = 0
+        self.last_block_hash = None  # Hash of last_processed_block, from the checkpoint
         self.starknet_client = None
+        self.chunk_size = int(self.settings.indexer_chunk_size)  # Blocks per fetched range, adapted as we go
+        self.event_keys = None  # RPC keys filter for the events we handle
+        self.view_cache = get_view_cache()
+        
+        # Event name -> handler, and the handler that reverses it on a reorg
+        self._handlers = {
+            "JobCreated": self._process_job_created,
+            "ResultSubmitted": self._process_result_submitted,
+            "JobFinalized": self._process_job_finalized,
+            "WorkerRegistered": self._process_worker_registered,
+            "WorkerVerified": self._process_worker_verified,
+            "ReputationUpdated": self._process_reputation_updated,
+            "ReputationSlashed": self._process_reputation_slashed,
+        }
+        self._undo_handlers = {
+            "JobCreated": self._undo_job_created,
+            "ResultSubmitted": self._undo_result_submitted,
+            "JobFinalized": self._undo_job_finalized,
+            "WorkerRegistered": self._undo_worker_registered,
+            "WorkerVerified": self._undo_worker_verified,
+            "ReputationUpdated": self._undo_reputation_updated,
+            "ReputationSlashed": self._undo_reputation_change,
+        }
         
     async def start(self):
         """Start the event indexer"""
         self.running = True
         self.starknet_client = await get_starknet_client()
+        self.event_keys = self.starknet_client.event_keys(list(self._handlers))
         
         # Get last processed block from database
         await self._load_last_processed_block()
@@ -42,20 +111,26 @@ class EventIndexer:
         return self.running
     
     async def _load_last_processed_block(self):
-        """Load the last processed block number from database"""
+        """Load the resume point from the indexer checkpoint"""
         try:
             async for db in get_db_session():
-                query = select(ContractEvent.block_number).order_by(
-                    ContractEvent.block_number.desc()
-                ).limit(1)
-                result = await db.execute(query)
-                last_block = result.scalar_one_or_none()
+                checkpoint = await db.get(IndexerCheckpoint, self.settings.contract_address)
                 
-                if last_block:
-                    self.last_processed_block = last_block
+                if checkpoint:
+                    self.last_processed_block = checkpoint.block_number
+                    self.last_block_hash = checkpoint.block_hash
                 else:
-                    # Start from a reasonable block number or 0
-                    self.last_processed_block = self.settings.start_block
+                    # Databases indexed before checkpoints existed resume from their
+                    # newest event; that block is re-read and deduplicated on insert
+                    query = select(func.max(ContractEvent.block_number))
+                    result = await db.execute(query)
+                    last_block = result.scalar_one_or_none()
+                    
+                    if last_block:
+                        self.last_processed_block = last_block - 1
+                    else:
+                        # Start from a reasonable block number or 0
+                        self.last_processed_block = self.settings.start_block
                 break
                 
         except Exception as e:
@@ -79,282 +154,639 @@ class EventIndexer:
         try:
             # Get latest block
             latest_block = await self.starknet_client.get_latest_block_number()
-            if not latest_block or latest_block <= self.last_processed_block:
+            if not latest_block:
                 return
             
-            # Process blocks in chunks
-            chunk_size = 100  # Process 100 blocks at a time
-            from_block = self.last_processed_block + 1
+            await self._check_for_reorg()
             
-            while from_block <= latest_block:
-                to_block = min(from_block + chunk_size - 1, latest_block)
-                
-                # Get events for this chunk
-                events = await self.starknet_client.get_events(
-                    from_block=from_block,
-                    to_block=to_block
-                )
+            # Blocks near the head may still change; leave them for a later pass
+            safe_block = latest_block - int(self.settings.indexer_confirmation_depth)
+            if safe_block <= self.last_processed_block:
+                return
+            
+            await self._index_blocks(self.last_processed_block + 1, safe_block)
                 
-                if events:
-                    await self._store_and_process_events(events)
+        except Exception as e:
+            logger.error(f"Failed to process new events: {e}")
+    
+    async def _index_blocks(self, from_block: int, to_block: int):
+        """Index a block span, fetching several ranges at once while catching up.
+
+        Up to ``indexer_max_in_flight`` ranges are fetched concurrently. Their
+        results wait in a reorder buffer keyed by first block and are stored
+        strictly in block order, so last_processed_block only ever advances
+        over fully stored ranges. A failed range stops the pass; the next one
+        resumes right after the last stored range.
+        """
+        max_in_flight = max(1, int(self.settings.indexer_max_in_flight))
+        # Reorder buffer: first block -> (last block, fetch task)
+        pending: Dict[int, Tuple[int, asyncio.Task]] = {}
+        next_block = from_block
+        
+        try:
+            while next_block <= to_block or pending:
+                # Keep the pipeline full
+                while next_block <= to_block and len(pending) < max_in_flight:
+                    range_end = min(next_block + self.chunk_size - 1, to_block)
+                    pending[next_block] = (range_end, asyncio.create_task(self._fetch_range(next_block, range_end)))
+                    next_block = range_end + 1
                 
-                from_block = to_block + 1
-                self.last_processed_block = to_block
+                # Store the lowest range next, whatever finished first
+                range_start = self.last_processed_block + 1
+                range_end, task = pending.pop(range_start)
+                events, block_hash, elapsed = await task
+                self._adapt_chunk_size(range_end - range_start + 1, len(events), elapsed)
                 
-                logger.info(f"Processed blocks {from_block-chunk_size} to {to_block}")
+                # Empty ranges are checkpointed too, so they are never re-scanned
+                await self._store_and_process_events(events, range_end, block_hash)
                 
-        except Exception as e:
-            logger.error(f"Failed to process new events: {e}")
+                self.last_processed_block = range_end
+                self.last_block_hash = block_hash
+                logger.info(f"Processed blocks {range_start} to {range_end} ({len(events)} events, {elapsed:.2f}s)")
+        finally:
+            for range_end, task in pending.values():
+                task.cancel()
+            await asyncio.gather(*(task for range_end, task in pending.values()), return_exceptions=True)
+    
+    async def _check_for_reorg(self):
+        """Roll back to the fork point if the last indexed block is no longer canonical.
+
+        Block hashes chain, so an unchanged last block means nothing below
+        it changed either. Otherwise the stored hashes are walked back until
+        one still matches the chain.
+        """
+        if not self.last_block_hash:
+            return
+        
+        chain_hash = await self.starknet_client.fetch_block_hash(self.last_processed_block)
+        if chain_hash == self.last_block_hash:
+            return
+        
+        logger.warning(
+            f"Reorg detected: block {self.last_processed_block} is now {chain_hash}, "
+            f"indexed as {self.last_block_hash}"
+        )
+        
+        fork_block, fork_hash = None, None
+        async for db in get_db_session():
+            result = await db.execute(
+                select(IndexerBlockHash.block_number, IndexerBlockHash.block_hash)
+                .where(
+                    IndexerBlockHash.contract_address == self.settings.contract_address,
+                    IndexerBlockHash.block_number < self.last_processed_block
+                )
+                .order_by(IndexerBlockHash.block_number.desc())
+            )
+            history = result.all()
+            break
+        
+        for block_number, block_hash in history:
+            if await self.starknet_client.fetch_block_hash(block_number) == block_hash:
+                fork_block, fork_hash = block_number, block_hash
+                break
+        
+        if fork_block is None:
+            # Deeper than the hash history: drop everything it covers
+            fork_block = history[-1][0] - 1 if history else self.settings.start_block
+            logger.error(f"No indexed block hash matches the chain; rolling back to block {fork_block}")
+        
+        await self._rollback_to(fork_block, fork_hash)
     
-    async def _store_and_process_events(self, events: list):
-        """Store events in database and process them"""
+    async def _rollback_to(self, fork_block: int, fork_hash: Optional[str]):
+        """Undo everything indexed after ``fork_block`` so it is replayed from the chain.
+
+        Orphaned events are removed with one range DELETE. The state changes
+        they caused are undone in reverse order on rows loaded in one query per
+        table, and the checkpoint moves back to the fork point, all in one
+        transaction. The next pass re-indexes the canonical blocks.
+        """
         async for db in get_db_session():
             try:
-                for event_data in events:
-                    # Check if event already exists
-                    existing_query = select(ContractEvent).where(
-                        and_(
-                            ContractEvent.transaction_hash == event_data["transaction_hash"],
-                            ContractEvent.event_index == event_data["event_index"]
+                result = await db.execute(
+                    delete(ContractEvent)
+                    .where(ContractEvent.block_number > fork_block)
+                    .returning(
+                        ContractEvent.block_number,
+                        ContractEvent.event_index,
+                        ContractEvent.transaction_hash,
+                        ContractEvent.event_name,
+                        ContractEvent.event_data,
+                        ContractEvent.processed
+                    )
+                )
+                orphaned = sorted(result.all(), key=lambda row: (row.block_number, row.event_index), reverse=True)
+                
+                decoder = self.starknet_client.event_decoder
+                decoded_events = [
+                    {
+                        "event_name": row.event_name,
+                        "decoded_data": decoder.record(row.event_name, json.loads(row.event_data))
+                    }
+                    for row in orphaned
+                    if row.processed and row.event_name in self._undo_handlers
+                ]
+                batch = await self._load_batch(db, decoded_events)
+                
+                for decoded in decoded_events:
+                    try:
+                        self._undo_handlers[decoded["event_name"]](decoded["decoded_data"], batch)
+                    except Exception as e:
+                        logger.error(f"Failed to undo event {decoded['event_name']}: {e}")
+                
+                # Rows the orphaned events created go away with them
+                for job in batch.deleted_jobs:
+                    db.expunge(job)
+                deleted_job_ids = [job.id for job in batch.deleted_jobs]
+                if deleted_job_ids:
+                    await db.execute(delete(JobChunk).where(JobChunk.job_id.in_(deleted_job_ids)))
+                    await db.execute(delete(JobEvent).where(JobEvent.job_id.in_(deleted_job_ids)))
+                    await db.execute(delete(Job).where(Job.id.in_(deleted_job_ids)))
+                
+                orphaned_transactions = {row.transaction_hash for row in orphaned}
+                if orphaned_transactions:
+                    await db.execute(
+                        delete(ReputationHistory).where(ReputationHistory.transaction_hash.in_(orphaned_transactions))
+                    )
+                
+                # Workers registered in orphaned blocks, unless something already refers to them
+                for worker in batch.deleted_workers:
+                    db.expunge(worker)
+                deleted_worker_ids = [worker.id for worker in batch.deleted_workers]
+                if deleted_worker_ids:
+                    await db.execute(
+                        delete(Worker).where(
+                            Worker.id.in_(deleted_worker_ids),
+                            ~select(Job.id).where(Job.worker_id == Worker.id).exists(),
+                            ~select(JobChunk.id).where(JobChunk.worker_id == Worker.id).exists(),
+                            ~select(ReputationHistory.id).where(ReputationHistory.worker_id == Worker.id).exists()
                         )
                     )
-                    existing = await db.execute(existing_query)
-                    if existing.scalar_one_or_none():
-                        continue  # Skip if already processed
-                    
-                    # Decode event
-                    decoded = await self.starknet_client.decode_event(event_data)
-                    if not decoded:
-                        continue
-                    
-                    # Store event
-                    contract_event = ContractEvent(
-                        transaction_hash=event_data["transaction_hash"],
-                        block_number=event_data["block_number"],
-                        event_index=event_data["event_index"],
-                        contract_address=event_data["contract_address"],
-                        event_name=decoded["event_name"],
-                        event_data=json.dumps(decoded["decoded_data"])
+                
+                await db.execute(
+                    delete(IndexerBlockHash).where(
+                        IndexerBlockHash.contract_address == self.settings.contract_address,
+                        IndexerBlockHash.block_number > fork_block
                     )
-                    
-                    db.add(contract_event)
-                    await db.flush()  # Get the ID
-                    
-                    # Process the event
-                    await self._process_event(contract_event, decoded, db)
+                )
+                await self._save_checkpoint(db, fork_block, fork_hash)
+                await db.commit()
+                self._invalidate_views(decoded_events)
+                await self._invalidate_responses(decoded_events)
+                
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Failed to roll back to block {fork_block}: {e}")
+                raise
+            break
+        
+        logger.warning(f"Rolled back {len(orphaned)} events after block {fork_block}")
+        self.last_processed_block = fork_block
+        self.last_block_hash = fork_hash
+    
+    async def _fetch_range(self, from_block: int, to_block: int) -> Tuple[list, str, float]:
+        """Fetch one block range and the hash of its last block, and time it"""
+        started = time.monotonic()
+        events, block_hash = await asyncio.gather(
+            self.starknet_client.fetch_events(from_block, to_block, self.event_keys),
+            self.starknet_client.fetch_block_hash(to_block)
+        )
+        return events, block_hash, time.monotonic() - started
+    
+    def _adapt_chunk_size(self, blocks: int, event_count: int, elapsed: float):
+        """Size the next ranges from observed event density and RPC latency.
+
+        Aims for about one RPC page of events per range, fetched within the
+        target latency. Sparse, fast ranges grow and dense or slow ones shrink;
+        each sample moves the size halfway to its target to smooth out noise.
+        """
+        by_density = blocks * EVENTS_PAGE_SIZE / event_count if event_count else blocks * 2
+        by_latency = blocks * float(self.settings.indexer_target_latency) / max(elapsed, 0.01)
+        target = min(by_density, by_latency)
+        
+        size = (self.chunk_size + target) / 2
+        self.chunk_size = int(min(max(size, 1), int(self.settings.indexer_max_chunk_size)))
+    
+    async def _store_and_process_events(self, events: list, to_block: int, block_hash: str):
+        """Store the events of a block range and move the checkpoint past it.
+
+        The events, the state changes they cause and the checkpoint are
+        committed together, so after a crash indexing resumes exactly after
+        the last range that was fully stored.
+        """
+        async for db in get_db_session():
+            try:
+                batch = await self._apply_events(db, events)
+                
+                await self._save_checkpoint(db, to_block, block_hash)
+                await self._record_block_hash(db, to_block, block_hash)
                 
+                # Changes to the prefetched rows go out here, batched per column set
                 await db.commit()
+                self._invalidate_views(batch.events)
+                await self._invalidate_responses(batch.events)
+                
+                # Only announce jobs once they are visible to workers' claims
+                notifier = get_job_notifier()
+                for job in batch.opened_jobs:
+                    await notifier.publish(job_opened_event(job))
                 
             except Exception as e:
                 await db.rollback()
                 logger.error(f"Failed to store and process events: {e}")
+                # Stop here so the range is indexed again rather than skipped
+                raise
             break
     
-    async def _process_event(self, contract_event: ContractEvent, decoded: Dict[str, Any], db: AsyncSession):
-        """Process a specific event type"""
+    def _invalidate_views(self, decoded_events: List[Dict[str, Any]]):
+        """Drop cached contract views that these events changed"""
+        stale = set()
+        for decoded in decoded_events:
+            record = decoded["decoded_data"]
+            for view, fields in VIEW_INVALIDATIONS.get(decoded["event_name"], ()):
+                stale.add((view, tuple(felt_key(getattr(record, field)) if field else None for field in fields)))
+        for view, pattern in stale:
+            self.view_cache.invalidate(view, *pattern)
+    
+    async def _invalidate_responses(self, decoded_events: List[Dict[str, Any]]):
+        """Drop cached API responses showing rows these events changed.
+
+        The event stats include the last processed block, so they go even
+        when the range had no events.
+        """
+        stale = {EVENT_STATS}
+        for decoded in decoded_events:
+            record = decoded["decoded_data"]
+            stale.update(RESPONSE_INVALIDATIONS.get(decoded["event_name"], ()))
+            if getattr(record, "job_id", None) is not None:
+                stale.add(job_tag(record.job_id))
+            if getattr(record, "worker", None) is not None:
+                stale.add(worker_tag(record.worker))
+        await get_response_cache().invalidate(*stale)
+    
+    async def _save_checkpoint(self, db: AsyncSession, block_number: int, block_hash: Optional[str]):
+        checkpoint = pg_insert(IndexerCheckpoint).values(
+            contract_address=self.settings.contract_address,
+            block_number=block_number,
+            block_hash=block_hash
+        )
+        await db.execute(checkpoint.on_conflict_do_update(
+            index_elements=[IndexerCheckpoint.contract_address],
+            set_={
+                "block_number": checkpoint.excluded.block_number,
+                "block_hash": checkpoint.excluded.block_hash,
+                "updated_at": func.now()
+            }
+        ))
+    
+    async def _record_block_hash(self, db: AsyncSession, block_number: int, block_hash: str):
+        """Remember an indexed block's hash and forget all but the newest ones"""
+        contract_address = self.settings.contract_address
+        row = pg_insert(IndexerBlockHash).values(
+            contract_address=contract_address,
+            block_number=block_number,
+            block_hash=block_hash
+        )
+        await db.execute(row.on_conflict_do_update(
+            index_elements=[IndexerBlockHash.contract_address, IndexerBlockHash.block_number],
+            set_={"block_hash": row.excluded.block_hash}
+        ))
+        
+        oldest_kept = (
+            select(IndexerBlockHash.block_number)
+            .where(IndexerBlockHash.contract_address == contract_address)
+            .order_by(IndexerBlockHash.block_number.desc())
+            .offset(BLOCK_HASH_HISTORY - 1)
+            .limit(1)
+            .scalar_subquery()
+        )
+        await db.execute(
+            delete(IndexerBlockHash).where(
+                IndexerBlockHash.contract_address == contract_address,
+                IndexerBlockHash.block_number < oldest_kept
+            )
+        )
+    
+    async def _apply_events(self, db: AsyncSession, events: list) -> "EventBatch":
+        """Store a chunk of events and apply them as one batch.
+
+        Events are inserted in bulk with ON CONFLICT DO NOTHING, so duplicates
+        from an earlier run fall out without a lookup per event. The jobs and
+        workers the new events refer to are loaded with one query each and
+        state transitions are applied to those rows in memory; the caller
+        commits.
+        """
+        # Decode first; events we can't decode are not stored
+        decoded_events = []
+        for event_data in events:
+            decoded = await self.starknet_client.decode_event(event_data)
+            if decoded:
+                decoded_events.append((event_data, decoded))
+        
+        if not decoded_events:
+            return EventBatch(db)
+        
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "transaction_hash": _felt_hex(event_data["transaction_hash"]),
+                "block_number": event_data["block_number"],
+                "event_index": event_data["event_index"],
+                "contract_address": _felt_hex(event_data["contract_address"]),
+                "event_name": decoded["event_name"],
+                "event_data": json.dumps(decoded["decoded_data"]._asdict()),
+                "processed": False
+            }
+            for event_data, decoded in decoded_events
+        ]
+        
+        new_ids = set()
+        for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+            insert_result = await db.execute(
+                pg_insert(ContractEvent)
+                .values(rows[offset:offset + INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=["transaction_hash", "event_index"])
+                .returning(ContractEvent.id)
+            )
+            new_ids.update(insert_result.scalars().all())
+        
+        new_events = [
+            (row, decoded)
+            for row, (event_data, decoded) in zip(rows, decoded_events)
+            if row["id"] in new_ids
+        ]
+        if len(new_events) < len(rows):
+            logger.info(f"Skipped {len(rows) - len(new_events)} already indexed events")
+        
+        batch = await self._load_batch(db, [decoded for row, decoded in new_events])
+        
+        # JobCreated carries creator, reward and deadline; the asset CID and
+        # minimum reputation for every new job come from one batched request
+        new_job_ids = [
+            decoded["decoded_data"].job_id
+            for row, decoded in new_events
+            if decoded["event_name"] == "JobCreated" and decoded["decoded_data"].job_id not in batch.jobs
+        ]
+        if new_job_ids:
+            batch.job_info = await self.starknet_client.get_jobs_info(new_job_ids)
+        
+        batch.events = [decoded for row, decoded in new_events]
+        processed_ids = []
+        for row, decoded in new_events:
+            if await self._process_event(row, decoded, batch):
+                processed_ids.append(row["id"])
+        
+        if processed_ids:
+            await db.execute(
+                update(ContractEvent)
+                .where(ContractEvent.id.in_(processed_ids))
+                .values(processed=True, processed_at=func.now())
+            )
+        
+        return batch
+    
+    async def _load_batch(self, db: AsyncSession, decoded_events: List[Dict[str, Any]]) -> "EventBatch":
+        """Load every job and worker a batch of events refers to, one query per table"""
+        batch = EventBatch(db)
+        chain_job_ids = set()
+        worker_addresses = set()
+        
+        for decoded in decoded_events:
+            record = decoded["decoded_data"]
+            if getattr(record, "job_id", None) is not None:
+                chain_job_ids.add(record.job_id)
+            if getattr(record, "worker", None) is not None:
+                worker_addresses.add(record.worker)
+        
+        if chain_job_ids:
+            job_result = await db.execute(select(Job).where(Job.chain_job_id.in_(chain_job_ids)))
+            for job in job_result.scalars().all():
+                batch.jobs[job.chain_job_id] = job
+        
+        if worker_addresses:
+            worker_result = await db.execute(select(Worker).where(Worker.address.in_(worker_addresses)))
+            for worker in worker_result.scalars().all():
+                batch.add_worker(worker)
+        
+        return batch
+    
+    async def _process_event(self, contract_event: Dict[str, Any], decoded: Dict[str, Any], batch: "EventBatch") -> bool:
+        """Apply one event through the dispatch table. Returns True if the event counts as processed."""
+        handler = self._handlers.get(decoded["event_name"])
+        if handler is None:
+            return True
+        
         try:
-            event_name = decoded["event_name"]
-            event_data = decoded["decoded_data"]
-            
-            if event_name == "WorkerRegistered":
-                await self._process_worker_registered(event_data, db)
-            elif event_name == "WorkerVerified":
-                await self._process_worker_verified(event_data, db)
-            elif event_name == "JobCreated":
-                await self._process_job_created(event_data, contract_event, db)
-            elif event_name == "JobAssigned":
-                await self._process_job_assigned(event_data, db)
-            elif event_name == "JobCompleted":
-                await self._process_job_completed(event_data, db)
-            elif event_name == "ReputationUpdated":
-                await self._process_reputation_updated(event_data, contract_event, db)
-            
-            # Mark event as processed
-            contract_event.processed = True
-            contract_event.processed_at = datetime.utcnow()
-            
+            await handler(decoded["decoded_data"], contract_event, batch)
+            return True
         except Exception as e:
-            logger.error(f"Failed to process event {contract_event.event_name}: {e}")
+            logger.error(f"Failed to process event {contract_event['event_name']}: {e}")
+            return False
     
-    async def _process_worker_registered(self, event_data: list, db: AsyncSession):
+    async def _process_worker_registered(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
         """Process WorkerRegistered event"""
-        try:
-            worker_address = event_data[0]  # Assuming first element is worker address
-            info_cid_part1 = event_data[1] if len(event_data) > 1 else None
-            info_cid_part2 = event_data[2] if len(event_data) > 2 else None
-            
-            # Check if worker already exists
-            query = select(Worker).where(Worker.address == worker_address)
-            result = await db.execute(query)
-            existing_worker = result.scalar_one_or_none()
-            
-            if not existing_worker:
-                # Create new worker
-                full_info_cid = info_cid_part1
-                if info_cid_part2:
-                    full_info_cid += info_cid_part2
-                
-                worker = Worker(
-                    address=worker_address,
-                    info_cid=full_info_cid
-                )
-                db.add(worker)
-                logger.info(f"Worker registered: {worker_address}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process worker registration: {e}")
+        if event.worker in batch.workers:
+            return
+        
+        # Later events in the batch may update the worker before it is flushed
+        worker = Worker(
+            id=uuid.uuid4(),
+            address=event.worker,
+            info_cid=felt_to_short_string(event.info_cid) or None,
+            reputation=500,
+            jobs_completed=0,
+            total_earnings=0
+        )
+        batch.db.add(worker)
+        batch.add_worker(worker)
+        logger.info(f"Worker registered: {event.worker}")
     
-    async def _process_worker_verified(self, event_data: list, db: AsyncSession):
+    async def _process_worker_verified(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
         """Process WorkerVerified event"""
-        try:
-            worker_address = event_data[0]
-            verifier_address = event_data[1] if len(event_data) > 1 else None
-            
-            # Update worker verification status
-            query = select(Worker).where(Worker.address == worker_address)
-            result = await db.execute(query)
-            worker = result.scalar_one_or_none()
-            
-            if worker:
-                worker.verified = True
-                worker.verified_by = verifier_address
-                worker.verified_at = datetime.utcnow()
-                logger.info(f"Worker verified: {worker_address}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process worker verification: {e}")
+        worker = batch.workers.get(event.worker)
+        if worker:
+            worker.verified = event.verified
+            worker.verified_by = event.verifier if event.verified else None
+            worker.verified_at = datetime.utcnow() if event.verified else None
+            logger.info(f"Worker {'verified' if event.verified else 'unverified'}: {event.worker}")
     
-    async def _process_job_created(self, event_data: list, contract_event: ContractEvent, db: AsyncSession):
+    async def _process_job_created(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
         """Process JobCreated event"""
-        try:
-            job_id = int(event_data[0])
-            creator_address = event_data[1]
-            reward = int(event_data[2])
-            deadline = int(event_data[3])  # Timestamp
-            
-            # Check if job already exists
-            query = select(Job).where(Job.chain_job_id == job_id)
-            result = await db.execute(query)
-            existing_job = result.scalar_one_or_none()
-            
-            if not existing_job:
-                # Get full job details from contract
-                job_info = await self.starknet_client.get_job_info(job_id)
-                if job_info:
-                    full_asset_cid = job_info["asset_cid_part1"]
-                    if job_info["asset_cid_part2"]:
-                        full_asset_cid += job_info["asset_cid_part2"]
-                    
-                    job = Job(
-                        chain_job_id=job_id,
-                        creator_address=creator_address,
-                        asset_cid_part1=job_info["asset_cid_part1"],
-                        asset_cid_part2=job_info["asset_cid_part2"],
-                        full_asset_cid=full_asset_cid,
-                        reward_amount=reward,
-                        deadline=datetime.fromtimestamp(deadline),
-                        min_reputation=job_info["min_reputation"]
-                    )
-                    db.add(job)
-                    logger.info(f"Job created: {job_id}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process job creation: {e}")
+        if event.job_id in batch.jobs:
+            return
+        
+        job_info = batch.job_info.get(event.job_id)
+        if not job_info:
+            raise ValueError(f"No contract data for job {event.job_id}")
+        
+        full_asset_cid = job_info["asset_cid_part1"]
+        if job_info["asset_cid_part2"]:
+            full_asset_cid += job_info["asset_cid_part2"]
+        
+        job = Job(
+            id=uuid.uuid4(),
+            chain_job_id=event.job_id,
+            creator_address=event.creator,
+            asset_cid_part1=job_info["asset_cid_part1"],
+            asset_cid_part2=job_info["asset_cid_part2"],
+            full_asset_cid=full_asset_cid,
+            reward_amount=event.reward_amount,
+            deadline=datetime.fromtimestamp(event.deadline),
+            min_reputation=job_info["min_reputation"],
+            status="open"
+        )
+        job.chunks = build_job_chunks(job)
+        batch.db.add(job)
+        batch.jobs[event.job_id] = job
+        batch.opened_jobs.append(job)
+        logger.info(f"Job created: {event.job_id}")
     
-    async def _process_job_assigned(self, event_data: list, db: AsyncSession):
-        """Process JobAssigned event"""
-        try:
-            job_id = int(event_data[0])
-            worker_address = event_data[1]
-            
-            # Get job and worker
-            job_query = select(Job).where(Job.chain_job_id == job_id)
-            job_result = await db.execute(job_query)
-            job = job_result.scalar_one_or_none()
-            
-            worker_query = select(Worker).where(Worker.address == worker_address)
-            worker_result = await db.execute(worker_query)
-            worker = worker_result.scalar_one_or_none()
-            
-            if job and worker:
-                job.worker_id = worker.id
-                job.status = "assigned"
-                job.assigned_at = datetime.utcnow()
-                logger.info(f"Job {job_id} assigned to {worker_address}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process job assignment: {e}")
+    async def _process_result_submitted(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
+        """Process ResultSubmitted event: the submitting worker takes the job"""
+        job = batch.jobs.get(event.job_id)
+        worker = batch.workers.get(event.worker)
+        if not job or not worker:
+            return
+        
+        job.worker_id = worker.id
+        job.assigned_at = datetime.utcnow()
+        if job.status == "open":
+            job.status = "assigned"
+        
+        logger.info(f"Job {event.job_id} result submitted by {event.worker}")
     
-    async def _process_job_completed(self, event_data: list, db: AsyncSession):
-        """Process JobCompleted event"""
-        try:
-            job_id = int(event_data[0])
-            quality_score = int(event_data[1])
-            
-            # Update job
-            query = select(Job).where(Job.chain_job_id == job_id)
-            result = await db.execute(query)
-            job = result.scalar_one_or_none()
-            
-            if job:
-                # Get full job details from contract
-                job_info = await self.starknet_client.get_job_info(job_id)
-                if job_info:
-                    full_result_cid = job_info["result_cid_part1"]
-                    if job_info["result_cid_part2"]:
-                        full_result_cid += job_info["result_cid_part2"]
-                    
-                    job.result_cid_part1 = job_info["result_cid_part1"]
-                    job.result_cid_part2 = job_info["result_cid_part2"]
-                    job.full_result_cid = full_result_cid
-                    job.quality_score = quality_score
-                    job.status = "completed"
-                    job.completed_at = datetime.utcnow()
-                    
-                    # Update worker stats
-                    if job.worker_id:
-                        worker_query = select(Worker).where(Worker.id == job.worker_id)
-                        worker_result = await db.execute(worker_query)
-                        worker = worker_result.scalar_one_or_none()
-                        
-                        if worker:
-                            worker.jobs_completed += 1
-                            worker.total_earnings += job.reward_amount
-                            worker.last_seen = datetime.utcnow()
-                    
-                    logger.info(f"Job {job_id} completed with quality score {quality_score}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process job completion: {e}")
+    async def _process_job_finalized(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
+        """Process JobFinalized event"""
+        job = batch.jobs.get(event.job_id)
+        if not job:
+            return
+        
+        job.status = "completed"
+        job.completed_at = datetime.utcnow()
+        
+        # Update worker stats
+        worker = batch.workers.get(event.worker)
+        if worker:
+            job.worker_id = worker.id
+            worker.jobs_completed += 1
+            worker.total_earnings += event.reward_amount
+            worker.last_seen = datetime.utcnow()
+        
+        logger.info(f"Job {event.job_id} finalized, {event.reward_amount} paid to {event.worker}")
     
-    async def _process_reputation_updated(self, event_data: list, contract_event: ContractEvent, db: AsyncSession):
+    async def _process_reputation_updated(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
         """Process ReputationUpdated event"""
-        try:
-            worker_address = event_data[0]
-            old_reputation = int(event_data[1])
-            new_reputation = int(event_data[2])
-            reason = event_data[3] if len(event_data) > 3 else "unknown"
-            
-            # Update worker reputation
-            query = select(Worker).where(Worker.address == worker_address)
-            result = await db.execute(query)
-            worker = result.scalar_one_or_none()
-            
+        job = batch.jobs.get(event.job_id)
+        if job:
+            job.quality_score = event.quality_score
+        
+        self._record_reputation(
+            batch, event.worker, event.old_reputation, event.new_reputation,
+            f"Job {event.job_id} quality {event.quality_score}", contract_event
+        )
+    
+    async def _process_reputation_slashed(self, event, contract_event: Dict[str, Any], batch: "EventBatch"):
+        """Process ReputationSlashed event"""
+        self._record_reputation(
+            batch, event.worker, event.old_reputation, event.new_reputation,
+            f"Slashed: {felt_to_short_string(event.reason)}", contract_event
+        )
+    
+    def _record_reputation(
+        self,
+        batch: "EventBatch",
+        worker_address: str,
+        old_reputation: int,
+        new_reputation: int,
+        reason: str,
+        contract_event: Dict[str, Any]
+    ):
+        worker = batch.workers.get(worker_address)
+        if not worker:
+            return
+        
+        worker.reputation = new_reputation
+        
+        # Create reputation history entry
+        history = ReputationHistory(
+            worker_id=worker.id,
+            old_reputation=old_reputation,
+            new_reputation=new_reputation,
+            change_amount=new_reputation - old_reputation,
+            reason=reason,
+            transaction_hash=contract_event["transaction_hash"]
+        )
+        batch.db.add(history)
+        
+        logger.info(f"Worker {worker_address} reputation updated: {old_reputation} -> {new_reputation}")
+    
+    def _undo_worker_registered(self, event, batch: "EventBatch"):
+        worker = batch.workers.get(event.worker)
+        if worker:
+            batch.deleted_workers.append(worker)
+    
+    def _undo_worker_verified(self, event, batch: "EventBatch"):
+        worker = batch.workers.get(event.worker)
+        if worker:
+            worker.verified = not event.verified
+            worker.verified_by = None
+            worker.verified_at = None
+    
+    def _undo_job_created(self, event, batch: "EventBatch"):
+        job = batch.jobs.get(event.job_id)
+        if job:
+            batch.deleted_jobs.append(job)
+    
+    def _undo_result_submitted(self, event, batch: "EventBatch"):
+        job = batch.jobs.get(event.job_id)
+        if job and job.status == "assigned":
+            job.worker_id = None
+            job.status = "open"
+            job.assigned_at = None
+            job.result_cid_part1 = None
+            job.result_cid_part2 = None
+            job.full_result_cid = None
+    
+    def _undo_job_finalized(self, event, batch: "EventBatch"):
+        job = batch.jobs.get(event.job_id)
+        if job and job.status == "completed":
+            job.status = "assigned"
+            job.completed_at = None
+            worker = batch.workers.get(event.worker)
             if worker:
-                worker.reputation = new_reputation
-                
-                # Create reputation history entry
-                history = ReputationHistory(
-                    worker_id=worker.id,
-                    old_reputation=old_reputation,
-                    new_reputation=new_reputation,
-                    change_amount=new_reputation - old_reputation,
-                    reason=reason,
-                    transaction_hash=contract_event.transaction_hash
-                )
-                db.add(history)
-                
-                logger.info(f"Worker {worker_address} reputation updated: {old_reputation} -> {new_reputation}")
-            
-        except Exception as e:
-            logger.error(f"Failed to process reputation update: {e}")
+                worker.jobs_completed -= 1
+                worker.total_earnings -= event.reward_amount
+    
+    def _undo_reputation_updated(self, event, batch: "EventBatch"):
+        job = batch.jobs.get(event.job_id)
+        if job and job.quality_score == event.quality_score:
+            # This event is the only one that scores a job on chain
+            job.quality_score = None
+        self._undo_reputation_change(event, batch)
+    
+    def _undo_reputation_change(self, event, batch: "EventBatch"):
+        worker = batch.workers.get(event.worker)
+        if worker:
+            # Undone newest first, so the oldest orphaned value wins
+            worker.reputation = event.old_reputation
+
+
+class EventBatch:
+    """Jobs and workers touched by one batch of events, keyed for in-memory lookups"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.jobs: Dict[int, Job] = {}  # By chain job ID
+        self.workers: Dict[str, Worker] = {}  # By address
+        self.job_info: Dict[int, Dict[str, Any]] = {}  # Contract view data for jobs created in this batch
+        self.events: List[Dict[str, Any]] = []  # Newly stored events, decoded
+        self.opened_jobs: List[Job] = []  # Announced to workers after commit
+        self.deleted_jobs: List[Job] = []  # Created by orphaned events during a rollback
+        self.deleted_workers: List[Worker] = []
+    
+    def add_worker(self, worker: Worker):
+        self.workers[worker.address] = worker
+
+
+def _felt_hex(value: Any) -> str:
+    """Hashes and addresses come back from starknet.py as ints; store them as hex"""
+    return hex(value) if isinstance(value, int) else value
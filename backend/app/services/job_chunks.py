@@ -0,0 +1,103 @@
+from typing import Any, Dict, List, Optional, Tuple
+from app.models import Job, JobChunk
+
+
+def split_frame_range(
+    frame_start: int,
+    frame_end: int,
+    frames_per_chunk: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """Split an inclusive frame range into consecutive (start, end) chunks"""
+    if frame_end < frame_start:
+        raise ValueError("frame_end must not be before frame_start")
+
+    if not frames_per_chunk:
+        return [(frame_start, frame_end)]
+
+    return [
+        (start, min(start + frames_per_chunk - 1, frame_end))
+        for start in range(frame_start, frame_end + 1, frames_per_chunk)
+    ]
+
+
+def split_frame_regions(tiles_x: int, tiles_y: int) -> List[Tuple[float, float, float, float]]:
+    """Split a frame into (min_x, max_x, min_y, max_y) border regions, top row first"""
+    regions = []
+    for row in reversed(range(tiles_y)):
+        for column in range(tiles_x):
+            regions.append((
+                column / tiles_x,
+                (column + 1) / tiles_x,
+                row / tiles_y,
+                (row + 1) / tiles_y
+            ))
+    return regions
+
+
+def build_job_chunks(job: Job) -> List[JobChunk]:
+    """Create the chunks workers claim for a job.
+
+    Animations become one chunk per frame range. A split-frame still becomes
+    one chunk per border region plus a final stitch chunk, which opens up once
+    every region has been rendered. Column defaults are only applied on flush,
+    so unset fields on a new job fall back to a single still of frame 1.
+    """
+    frame_start = job.frame_start if job.frame_start is not None else 1
+    frame_end = job.frame_end if job.frame_end is not None else frame_start
+    tiles_x = job.tiles_x or 1
+    tiles_y = job.tiles_y or 1
+
+    if tiles_x * tiles_y == 1:
+        return [
+            JobChunk(chunk_index=index, kind="render", frame_start=start, frame_end=end, status="open")
+            for index, (start, end) in enumerate(split_frame_range(frame_start, frame_end, job.frames_per_chunk))
+        ]
+
+    if frame_end != frame_start:
+        raise ValueError("Split-frame rendering needs a single frame")
+
+    chunks = [
+        JobChunk(
+            chunk_index=index,
+            kind="render",
+            frame_start=frame_start,
+            frame_end=frame_end,
+            border_min_x=min_x,
+            border_max_x=max_x,
+            border_min_y=min_y,
+            border_max_y=max_y,
+            status="open"
+        )
+        for index, (min_x, max_x, min_y, max_y) in enumerate(split_frame_regions(tiles_x, tiles_y))
+    ]
+    chunks.append(JobChunk(
+        chunk_index=len(chunks),
+        kind="stitch",
+        frame_start=frame_start,
+        frame_end=frame_end,
+        status="open"
+    ))
+    return chunks
+
+
+def build_job_chunk_rows(job: Job) -> List[Dict[str, Any]]:
+    """Chunks of a job as plain rows, for bulk INSERTs outside the ORM unit of work.
+
+    Only reads the job's id and frame range and tiling fields, so any object
+    carrying those will do.
+    """
+    return [
+        {
+            "job_id": job.id,
+            "chunk_index": chunk.chunk_index,
+            "kind": chunk.kind,
+            "frame_start": chunk.frame_start,
+            "frame_end": chunk.frame_end,
+            "border_min_x": chunk.border_min_x,
+            "border_max_x": chunk.border_max_x,
+            "border_min_y": chunk.border_min_y,
+            "border_max_y": chunk.border_max_y,
+            "status": "open"
+        }
+        for chunk in build_job_chunks(job)
+    ]
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+import asyncpg
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel used to fan notifications out across API processes
+NOTIFY_CHANNEL = "fluxframe_jobs"
+
+
+class JobNotifier:
+    """In-process fan-out of "work is available" events to connected workers.
+
+    Every subscriber gets its own bounded queue. Events are wake-up hints, not
+    work items: workers still claim through POST /jobs/claim, so a subscriber
+    whose queue overflows loses a notification but never a job.
+
+    A single process delivers events in memory. When the API runs as several
+    processes, start_listener() bridges them through Postgres LISTEN/NOTIFY:
+    publish() sends a NOTIFY and every process, including the sender, delivers
+    it to its own subscribers when it comes back on the channel.
+    """
+
+    def __init__(self, queue_size: int = 100, health_check_interval: float = 30):
+        self.queue_size = queue_size
+        self.health_check_interval = health_check_interval
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listener: Optional[asyncpg.Connection] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        # asyncpg runs one query at a time per connection
+        self._listener_lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Announce an event to the subscribers of every API process"""
+        if self._listener is not None:
+            try:
+                async with self._listener_lock:
+                    await self._listener.execute("SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, json.dumps(event))
+                return
+            except Exception as e:
+                logger.warning(f"Job NOTIFY failed, delivering in this process only: {e}")
+        self._deliver(event)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        """Deliver an event to every local subscriber without waiting on any of them"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.debug("Dropping job notification for a slow subscriber")
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Ignoring malformed job notification: {payload[:100]}")
+            return
+        self._deliver(event)
+
+    def start_listener(self, dsn: str) -> None:
+        """Share notifications with other API processes through Postgres"""
+        if self._listener_task is None:
+            self._listener_task = asyncio.create_task(self._listen(dsn))
+
+    async def stop_listener(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+
+    async def _listen(self, dsn: str) -> None:
+        """Hold a LISTEN connection open, reconnecting when it drops"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notification)
+                self._listener = connection
+                logger.info(f"Listening for job notifications on Postgres channel {NOTIFY_CHANNEL}")
+                
+                # A dead socket only shows up on use, so ping it now and then
+                while True:
+                    await asyncio.sleep(self.health_check_interval)
+                    async with self._listener_lock:
+                        await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job notification listener failed, using in-process delivery: {e}")
+            finally:
+                self._listener = None
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            
+            await asyncio.sleep(5)
+
+
+def job_opened_event(job: Job, reason: str = "created") -> Dict[str, Any]:
+    """Notification payload for a job that has claimable work"""
+    return {
+        "type": "job_opened",
+        "reason": reason,
+        "job_id": str(job.id),
+        "chain_job_id": job.chain_job_id,
+        "reward_amount": job.reward_amount,
+        "min_reputation": job.min_reputation
+    }
+
+
+# Global notifier instance
+_job_notifier: Optional[JobNotifier] = None
+
+def get_job_notifier() -> JobNotifier:
+    """Get or create the process-wide job notifier"""
+    global _job_notifier
+    if _job_notifier is None:
+        _job_notifier = JobNotifier()
+    return _job_notifier
@@ -0,0 +1,236 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Tags of cached responses. Write paths invalidate the tags of what they
+# changed: the job or worker itself, lists that may show it, and the
+# counters behind the stats routes.
+JOB_LISTS = "jobs"
+WORKER_LISTS = "workers"
+JOB_STATS = "stats:jobs"
+WORKER_STATS = "stats:workers"
+EVENT_STATS = "stats:events"
+ALL_STATS = (JOB_STATS, WORKER_STATS, EVENT_STATS)
+
+
+def job_tag(chain_job_id: Any) -> str:
+    return f"job:{chain_job_id}"
+
+
+def worker_tag(address: str) -> str:
+    return f"worker:{address}"
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+
+    @property
+    def etag(self) -> str:
+        return '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+
+class ResponseCache:
+    """In-process TTL cache for serialized GET responses, bounded by LRU.
+
+    Every entry carries tags, and invalidate() drops the entries with any of
+    the given tags. A response rendered across an invalidation is not stored:
+    callers take generation() before reading the database and pass it to
+    set(), like ViewCache.set_if_current(). A max_size of 0 disables caching.
+
+    Invalidations only reach this process; RedisResponseCache shares entries
+    and invalidations between API processes.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse, Tuple[str, ...]]]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def set(self, key: str, response: CachedResponse, tags: Iterable[str], generation: int):
+        """Store a response rendered since ``generation`` unless an invalidation happened meanwhile"""
+        if self.max_size <= 0 or generation != self._generation:
+            return
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(set(tags))
+        self._entries[key] = (time.monotonic() + self.ttl, response, tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, *tags: str):
+        """Drop every response tagged with any of ``tags``"""
+        self._generation += 1
+        stale = set()
+        for tag in tags:
+            stale.update(self._keys_by_tag.get(tag, ()))
+        for key in stale:
+            self._remove(key)
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached responses")
+
+    async def close(self):
+        pass
+
+    def _remove(self, key: str):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+# KEYS: generation, entry, tag sets. ARGV: expected generation, entry, ttl.
+# Checking the generation and storing is one atomic step.
+REDIS_SET = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+for i = 3, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[2])
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return 1
+"""
+
+# KEYS: generation, tag sets
+REDIS_INVALIDATE = """
+redis.call('INCR', KEYS[1])
+local dropped = 0
+for i = 2, #KEYS do
+    local entries = redis.call('SMEMBERS', KEYS[i])
+    for start = 1, #entries, 1000 do
+        dropped = dropped + redis.call('DEL', unpack(entries, start, math.min(start + 999, #entries)))
+    end
+    redis.call('DEL', KEYS[i])
+end
+return dropped
+"""
+
+
+class RedisResponseCache(ResponseCache):
+    """ResponseCache kept in Redis, so every API process shares its entries and invalidations.
+
+    An entry is a string key expiring after the TTL, and each tag is a set of
+    entry keys. Redis errors are logged and treated as misses, so the API
+    keeps serving from the database while Redis is down.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "fluxframe:responses:"):
+        super().__init__(ttl=ttl, max_size=0)
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._set_script = self._redis.register_script(REDIS_SET)
+        self._invalidate_script = self._redis.register_script(REDIS_INVALIDATE)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            value = await self._redis.get(self.prefix + "entry:" + key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        media_type, _, body = value.partition(b"\n")
+        return CachedResponse(body=body, media_type=media_type.decode())
+
+    async def generation(self) -> int:
+        try:
+            return int(await self._redis.get(self.prefix + "generation") or 0)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            # Never matches, so nothing is stored until Redis is back
+            return -1
+
+    async def set(self, key: str, response: CachedResponse, tags: Iterable[str], generation: int):
+        if generation < 0:
+            return
+        try:
+            await self._set_script(
+                keys=[
+                    self.prefix + "generation",
+                    self.prefix + "entry:" + key,
+                    *[self.prefix + "tag:" + tag for tag in set(tags)]
+                ],
+                args=[generation, response.media_type.encode() + b"\n" + response.body, max(int(self.ttl), 1)]
+            )
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def invalidate(self, *tags: str):
+        try:
+            dropped = await self._invalidate_script(
+                keys=[self.prefix + "generation", *[self.prefix + "tag:" + tag for tag in tags]]
+            )
+            if dropped:
+                logger.debug(f"Invalidated {dropped} cached responses")
+        except Exception as e:
+            logger.error(f"Response cache invalidation failed, entries may be stale for up to {self.ttl}s: {e}")
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+# Shared instance
+_response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the response cache for the configured backend"""
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        backend = settings.response_cache_backend
+        ttl = float(settings.response_cache_ttl)
+        if backend == "redis":
+            _response_cache = RedisResponseCache(settings.redis_url, ttl=ttl)
+        else:
+            if backend not in ("memory", "off"):
+                logger.warning(f"Unknown response cache backend {backend!r}, using memory")
+            _response_cache = ResponseCache(
+                ttl=ttl,
+                max_size=0 if backend == "off" else int(settings.response_cache_max_size)
+            )
+    return _response_cache
+
+
+async def close_response_cache():
+    global _response_cache
+    if _response_cache is not None:
+        await _response_cache.close()
+        _response_cache = None
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import aiohttp
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Methods that change chain state are never coalesced
+WRITE_METHOD_PREFIXES = ("starknet_add",)
+
+# HTTP statuses that mean "try another endpoint"
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class RpcError(Exception):
+    """A JSON-RPC error returned by the node for one call"""
+
+    def __init__(self, code: Any, message: str, data: Any = None):
+        self.code = code
+        self.message = message
+        self.data = data
+        super().__init__(f"RPC error {code}: {message}")
+
+
+class EndpointUnavailable(Exception):
+    """An endpoint failed at the transport level; the next one should be tried"""
+
+
+class _TokenBucket:
+    """Paces calls to ``rate`` per second, allowing bursts of up to one second's worth"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, count: int = 1):
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve now and wait out any debt, so callers are served in order
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            await asyncio.sleep(wait)
+
+
+class RpcEndpoint:
+    """One node URL with its own concurrency and rate limits and health state"""
+
+    def __init__(self, url: str, max_concurrency: int, rate_limit: float):
+        self.url = url
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = _TokenBucket(rate_limit) if rate_limit > 0 else None
+        self.down_until = 0.0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class RpcTransport:
+    """Pooled JSON-RPC transport shared by everything that talks to StarkNet.
+
+    - One keep-alive aiohttp session for all requests.
+    - Calls made within ``batch_window`` seconds of each other are sent as
+      one JSON-RPC batch request (up to ``max_batch_size`` calls).
+    - Concurrent identical read calls share a single request (single-flight).
+    - Each endpoint has its own concurrency limit and calls-per-second limit.
+    - When an endpoint fails at the transport level (connection error,
+      timeout, 429 or 5xx) it is benched for ``failover_cooldown`` seconds
+      and the request moves on to the next configured URL.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        max_concurrency: int = 8,
+        rate_limit: float = 0,
+        batch_window: float = 0.005,
+        max_batch_size: int = 50,
+        failover_cooldown: float = 30,
+        timeout: float = 30
+    ):
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [RpcEndpoint(url, max_concurrency, rate_limit) for url in urls]
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.failover_cooldown = failover_cooldown
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._queue: List[Tuple[str, Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._next_id = 0
+
+    @property
+    def url(self) -> str:
+        """The endpoint requests currently go to first"""
+        return self._endpoints_in_order()[0].url
+
+    async def call(self, method: str, params: Any = None) -> Any:
+        """Make one JSON-RPC call and return its result. Raises RpcError on node errors."""
+        params = params if params is not None else []
+        if method.startswith(WRITE_METHOD_PREFIXES):
+            return await self._enqueue(method, params)
+
+        key = (method, json.dumps(params, sort_keys=True, default=str))
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._enqueue(method, params))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # One waiter giving up must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def batch(self, calls: Sequence[Tuple[str, Any]]) -> List[Any]:
+        """Make several calls in as few requests as possible.
+
+        Returns results in call order; a call the node rejected yields its
+        RpcError instead of a result. Transport failures are raised.
+        """
+        results: List[Any] = []
+        for offset in range(0, len(calls), self.max_batch_size):
+            results.extend(await self._send(list(calls[offset:offset + self.max_batch_size])))
+        return results
+
+    async def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _enqueue(self, method: str, params: Any) -> Any:
+        if self.batch_window <= 0:
+            result = (await self._send([(method, params)]))[0]
+            if isinstance(result, RpcError):
+                raise result
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((method, params, future))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        queued, self._queue = self._queue, []
+        if queued:
+            task = asyncio.ensure_future(self._dispatch(queued))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, queued: List[Tuple[str, Any, asyncio.Future]]):
+        try:
+            results = await self._send([(method, params) for method, params, future in queued])
+        except asyncio.CancelledError:
+            for method, params, future in queued:
+                future.cancel()
+            raise
+        except Exception as e:
+            for method, params, future in queued:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (method, params, future), result in zip(queued, results):
+            if future.done():
+                continue
+            if isinstance(result, RpcError):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _send(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """POST calls to the first endpoint that answers, as a batch if there are several"""
+        payload = []
+        for method, params in calls:
+            self._next_id += 1
+            payload.append({"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params})
+
+        last_error: Optional[Exception] = None
+        for endpoint in self._endpoints_in_order():
+            try:
+                replies = await self._post(endpoint, payload if len(payload) > 1 else payload[0], len(payload))
+            except EndpointUnavailable as e:
+                last_error = e
+                endpoint.failures += 1
+                endpoint.down_until = time.monotonic() + self.failover_cooldown
+                logger.warning(f"RPC endpoint {endpoint.url} unavailable ({e}), failing over")
+                continue
+
+            endpoint.failures = 0
+            return self._match_replies(payload, replies)
+
+        raise last_error
+
+    async def _post(self, endpoint: RpcEndpoint, body: Any, call_count: int) -> Any:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+        if endpoint.bucket:
+            await endpoint.bucket.acquire(call_count)
+        async with endpoint.semaphore:
+            try:
+                async with self._session.post(endpoint.url, json=body) as response:
+                    if response.status in RETRYABLE_STATUSES:
+                        raise EndpointUnavailable(f"HTTP {response.status}")
+                    if response.status >= 300:
+                        raise RpcError(str(response.status), await response.text())
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise EndpointUnavailable(str(e) or type(e).__name__) from e
+
+    @staticmethod
+    def _match_replies(payload: List[Dict[str, Any]], replies: Any) -> List[Any]:
+        if isinstance(replies, dict) and len(payload) > 1 and "id" not in replies:
+            # The node rejected the batch as a whole
+            error = replies.get("error") or {}
+            raise RpcError(error.get("code"), error.get("message", "Batch request failed"), error.get("data"))
+        if isinstance(replies, dict):
+            replies = [replies]
+
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        results = []
+        for request in payload:
+            reply = by_id.get(request["id"])
+            if reply is None:
+                results.append(RpcError(None, f"No reply to {request['method']}"))
+            elif "result" in reply:
+                results.append(reply["result"])
+            else:
+                error = reply.get("error") or {}
+                results.append(RpcError(error.get("code"), error.get("message", "RPC request failed"), error.get("data")))
+        return results
+
+    def _endpoints_in_order(self) -> List[RpcEndpoint]:
+        """Healthy endpoints in configured order, then benched ones soonest-back first"""
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        benched = sorted((endpoint for endpoint in self.endpoints if not endpoint.healthy), key=lambda e: e.down_until)
+        return healthy + benched
+
+
+# Shared instance
+_rpc_transport = None
+
+def get_rpc_transport() -> RpcTransport:
+    """Get or create the shared RPC transport"""
+    global _rpc_transport
+    if _rpc_transport is None:
+        settings = get_settings()
+        _rpc_transport = RpcTransport(
+            urls=[settings.starknet_rpc_url] + [url.strip() for url in settings.starknet_rpc_failover_urls.split(",") if url.strip()],
+            max_concurrency=int(settings.rpc_max_concurrency),
+            rate_limit=float(settings.rpc_rate_limit),
+            batch_window=float(settings.rpc_batch_window),
+            max_batch_size=int(settings.rpc_max_batch_size),
+            failover_cooldown=float(settings.rpc_failover_cooldown)
+        )
+    return _rpc_transport
+
+async def close_rpc_transport():
+    """Close the shared RPC transport's connections"""
+    global _rpc_transport
+    if _rpc_transport is not None:
+        await _rpc_transport.close()
+        _rpc_transport = None
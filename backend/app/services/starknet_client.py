@@ -1,29 +1,63 @@
 # from starknet_py.net.client import Client
 from starknet_py.net.full_node_client import FullNodeClient
+from starknet_py.net.http_client import RpcHttpClient
+from starknet_py.net.client_errors import ClientError
 
 from starknet_py.net.models import StarknetChainId
 from starknet_py.contract import Contract
 from starknet_py.net.account.account import Account
 from starknet_py.net.signer.stark_curve_signer import KeyPair
+from starknet_py.hash.selector import get_selector_from_name
 from app.config import get_settings
+from app.services.event_decoder import EventDecoder, felt_to_short_string
+from app.services.rpc_transport import RpcError, RpcTransport, get_rpc_transport
+from app.services.view_cache import MISSING, felt_key, get_view_cache
 import logging
 import json
 from typing import Optional, Dict, Any, List
 
 logger = logging.getLogger(__name__)
 
+# Events per starknet_getEvents page
+EVENTS_PAGE_SIZE = 1000
+
+# Contract views that fill in what JobCreated doesn't carry, and how to read their felts
+JOB_INFO_VIEWS = {
+    "asset_cid": "get_job_asset_cid",
+    "min_reputation": "get_minimum_reputation_for_job",
+}
+
+class TransportRpcHttpClient(RpcHttpClient):
+    """starknet.py's JSON-RPC client, sending its calls through the shared RpcTransport"""
+
+    def __init__(self, transport: RpcTransport):
+        super().__init__(url=transport.url)
+        self.transport = transport
+
+    async def call(self, method_name: str, params: Optional[dict] = None):
+        try:
+            return await self.transport.call(f"{self.method_prefix}_{method_name}", params or [])
+        except RpcError as e:
+            raise ClientError(message=e.message, code=e.code, data=e.data) from e
+
+
 class StarkNetClient:
     def __init__(self):
         self.settings = get_settings()
         self.client = None
         self.contract = None
         self.account = None
+        self.event_decoder = None
+        self.transport = None
+        self.view_cache = get_view_cache()
         
     async def initialize(self):
         """Initialize the StarkNet client and contract"""
         try:
-            # Create client
-            self.client = FullNodeClient(node_url=self.settings.starknet_rpc_url)
+            # Create client; every request it makes goes through the pooled transport
+            self.transport = get_rpc_transport()
+            self.client = FullNodeClient(node_url=self.transport.url)
+            self.client._client = TransportRpcHttpClient(self.transport)
             
             # Load contract ABI
             with open(self.settings.contract_abi_path, 'r') as f:
@@ -42,6 +76,10 @@ class StarkNetClient:
             
             logger.info(f"Filtered ABI from {len(contract_abi)} to {len(filtered_abi)} entries")
             
+            # Selector -> typed decoder table, built once
+            self.event_decoder = EventDecoder(filtered_abi)
+            logger.info(f"Decoding {len(self.event_decoder.by_selector)} event types")
+            
             # Create contract instance
             self.contract = Contract(
                 address=self.settings.contract_address,
@@ -56,7 +94,12 @@ class StarkNetClient:
             raise
 
     async def get_worker_info(self, worker_address: str) -> Optional[Dict[str, Any]]:
-        """Get worker information from the contract"""
+        """Get worker information from the contract, cached until the indexer sees it change"""
+        return await self.view_cache.get_or_load(
+            "get_worker_info", (felt_key(worker_address),), lambda: self._load_worker_info(worker_address)
+        )
+
+    async def _load_worker_info(self, worker_address: str) -> Optional[Dict[str, Any]]:
         try:
             if not self.contract:
                 await self.initialize()
@@ -78,34 +121,80 @@ class StarkNetClient:
             return None
 
     async def get_job_info(self, job_id: int) -> Optional[Dict[str, Any]]:
-        """Get job information from the contract"""
+        """Get the job fields the contract doesn't emit in JobCreated"""
+        return (await self.get_jobs_info([job_id])).get(job_id)
+
+    async def get_jobs_info(self, job_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get asset CID and minimum reputation for several jobs at once.
+
+        Cached jobs are answered from the view cache; the rest are read with
+        one JSON-RPC batch of starknet_call requests. Jobs whose calls fail
+        are left out of the result.
+        """
+        jobs_info = {}
+        missing = []
+        for job_id in dict.fromkeys(job_ids):
+            cached = self.view_cache.get("get_job_info", (felt_key(job_id),))
+            if cached is not MISSING:
+                jobs_info[job_id] = cached
+            else:
+                missing.append(job_id)
+        
+        if not missing:
+            return jobs_info
+        
+        if not self.transport:
+            await self.initialize()
+        
+        generation = self.view_cache.generation()
+        calls = [(job_id, field) for job_id in missing for field in JOB_INFO_VIEWS]
         try:
-            if not self.contract:
-                await self.initialize()
-            
-            # Call get_job function
-            result = await self.contract.functions["get_job"].call(job_id)
-            
-            return {
-                "creator": result.creator,
-                "asset_cid_part1": result.asset_cid_part1,
-                "asset_cid_part2": result.asset_cid_part2,
-                "reward": result.reward,
-                "deadline": result.deadline,
-                "min_reputation": result.min_reputation,
-                "worker": result.worker,
-                "completed": result.completed,
-                "result_cid_part1": result.result_cid_part1,
-                "result_cid_part2": result.result_cid_part2,
-                "quality_score": result.quality_score
-            }
-            
+            results = await self.transport.batch([
+                ("starknet_call", self._view_call(JOB_INFO_VIEWS[field], [job_id])) for job_id, field in calls
+            ])
         except Exception as e:
-            logger.error(f"Failed to get job info for {job_id}: {e}")
-            return None
+            logger.error(f"Failed to get job info for jobs {missing}: {e}")
+            return jobs_info
+        
+        fetched: Dict[int, Dict[str, Any]] = {job_id: {} for job_id in missing}
+        for (job_id, field), result in zip(calls, results):
+            if isinstance(result, RpcError):
+                logger.warning(f"{JOB_INFO_VIEWS[field]}({job_id}) failed: {result.message}")
+                fetched.pop(job_id, None)
+            elif job_id not in fetched:
+                continue
+            elif field == "asset_cid":
+                fetched[job_id]["asset_cid_part1"] = felt_to_short_string(int(result[0], 16))
+                fetched[job_id]["asset_cid_part2"] = felt_to_short_string(int(result[1], 16)) or None
+            else:
+                fetched[job_id]["min_reputation"] = int(result[0], 16)
+        
+        for job_id, info in fetched.items():
+            self.view_cache.set_if_current(generation, "get_job_info", (felt_key(job_id),), info)
+            jobs_info[job_id] = info
+        return jobs_info
+
+    def _view_call(self, function_name: str, calldata: List[int]) -> Dict[str, Any]:
+        """starknet_call params for a view function on the registry contract"""
+        return {
+            "request": {
+                "contract_address": self.settings.contract_address,
+                "entry_point_selector": hex(get_selector_from_name(function_name)),
+                "calldata": [hex(int(value)) for value in calldata]
+            },
+            "block_id": "latest"
+        }
 
     async def is_worker_eligible(self, worker_address: str, job_id: int) -> bool:
-        """Check if worker is eligible for a job"""
+        """Check if worker is eligible for a job, cached until the indexer sees it change"""
+        eligible = await self.view_cache.get_or_load(
+            "is_worker_eligible",
+            (felt_key(worker_address), felt_key(job_id)),
+            lambda: self._load_worker_eligible(worker_address, job_id)
+        )
+        return bool(eligible)
+
+    async def _load_worker_eligible(self, worker_address: str, job_id: int) -> Optional[bool]:
         try:
             if not self.contract:
                 await self.initialize()
@@ -115,7 +204,7 @@ class StarkNetClient:
             
         except Exception as e:
             logger.error(f"Failed to check worker eligibility for {worker_address}, job {job_id}: {e}")
-            return False
+            return None
 
     async def get_latest_block_number(self) -> Optional[int]:
         """Get the latest block number"""
@@ -130,22 +219,48 @@ class StarkNetClient:
             logger.error(f"Failed to get latest block number: {e}")
             return None
 
+    async def fetch_block_hash(self, block_number: int) -> str:
+        """Get a block's hash as hex. Raises on RPC errors."""
+        if not self.client:
+            await self.initialize()
+        
+        block = await self.client.get_block(block_number=block_number)
+        return hex(block.block_hash)
+
     async def get_events(
         self, 
         from_block: int = 0, 
         to_block: Optional[int] = None,
-        event_filter: Optional[List[str]] = None
+        event_filter: Optional[List[List[int]]] = None
     ) -> List[Dict[str, Any]]:
         """Get contract events"""
         try:
-            if not self.client:
-                await self.initialize()
-            
             if to_block is None:
                 to_block = await self.get_latest_block_number()
             
-            # Get events from the contract using the correct API
-            # The newer starknet.py uses different parameter names
+            return await self.fetch_events(from_block, to_block, event_filter)
+            
+        except Exception as e:
+            logger.error(f"Failed to get events from block {from_block} to {to_block}: {e}")
+            return []
+
+    async def fetch_events(
+        self,
+        from_block: int,
+        to_block: int,
+        event_filter: Optional[List[List[int]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get every contract event in a block range, following continuation tokens.
+
+        Unlike get_events, RPC errors are raised so the caller can retry the
+        range instead of skipping it.
+        """
+        if not self.client:
+            await self.initialize()
+        
+        processed_events = []
+        continuation_token = None
+        while True:
             try:
                 # Try the newer API first
                 events = await self.client.get_events(
@@ -153,7 +268,8 @@ class StarkNetClient:
                     from_block_number=from_block,
                     to_block_number=to_block,
                     keys=event_filter,
-                    chunk_size=1000
+                    continuation_token=continuation_token,
+                    chunk_size=EVENTS_PAGE_SIZE
                 )
             except TypeError:
                 # Fallback to older API if the above fails
@@ -164,7 +280,6 @@ class StarkNetClient:
                     keys=event_filter
                 )
             
-            processed_events = []
             for event in events.events:
                 processed_events.append({
                     "transaction_hash": event.transaction_hash,
@@ -175,41 +290,34 @@ class StarkNetClient:
                     "data": event.data
                 })
             
-            return processed_events
-            
-        except Exception as e:
-            logger.error(f"Failed to get events from block {from_block} to {to_block}: {e}")
-            return []
+            continuation_token = getattr(events, "continuation_token", None)
+            if not continuation_token:
+                return processed_events
 
     async def decode_event(self, event_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Decode a contract event"""
+        """Decode a contract event into its name and a typed record"""
         try:
-            if not self.contract:
+            if not self.event_decoder:
                 await self.initialize()
             
-            # Map event keys to event names
-            event_map = {
-                # Add event key mappings here based on your contract
-                # This would need to be populated with actual event selectors
-            }
-            
-            event_key = event_data.get("keys", [None])[0]
-            if event_key in event_map:
-                event_name = event_map[event_key]
-                
-                # Decode based on event type
-                # This would need specific decoding logic for each event type
-                return {
-                    "event_name": event_name,
-                    "decoded_data": event_data["data"]  # Simplified - would need proper decoding
-                }
+            decoded = self.event_decoder.decode(event_data.get("keys", []), event_data.get("data", []))
+            if decoded is None:
+                return None
             
-            return None
+            event_name, record = decoded
+            return {
+                "event_name": event_name,
+                "decoded_data": record
+            }
             
         except Exception as e:
             logger.error(f"Failed to decode event: {e}")
             return None
 
+    def event_keys(self, event_names: List[str]) -> List[List[int]]:
+        """RPC keys filter matching only the named events"""
+        return [self.event_decoder.selectors(event_names)]
+
 # Singleton instance
 _starknet_client = None
 
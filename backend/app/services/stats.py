@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, case, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import StatsCounter
+
+# Bucket holding the "all" period's totals
+TOTAL_BUCKET = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def bucket_start(period: str, at: datetime) -> datetime:
+    """Start of the UTC day or hour containing ``at``, matching stats_bucket() in the database"""
+    at = at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+    if period == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+async def read_stats(
+    db: AsyncSession,
+    prefix: str,
+    since: Optional[datetime] = None
+) -> Tuple[Dict[str, Decimal], Dict[str, Decimal]]:
+    """Totals of the counters whose names start with ``prefix``, and their sums over hourly buckets since ``since``.
+
+    Both come from one read of the stats_counters primary key, summing each
+    counter's slots. The hourly sums are to the hour: they include all of
+    the hour ``since`` falls in.
+    Counters that were never touched are missing from the dicts.
+    """
+    buckets = and_(StatsCounter.period == "all", StatsCounter.bucket == TOTAL_BUCKET)
+    if since is not None:
+        buckets = or_(
+            buckets,
+            and_(StatsCounter.period == "hour", StatsCounter.bucket >= bucket_start("hour", since))
+        )
+
+    result = await db.execute(
+        select(StatsCounter.period, StatsCounter.name, func.sum(StatsCounter.value))
+        .where(and_(StatsCounter.name.startswith(prefix, autoescape=True), buckets))
+        .group_by(StatsCounter.period, StatsCounter.name)
+    )
+
+    totals: Dict[str, Decimal] = {}
+    recent: Dict[str, Decimal] = {}
+    for period, name, value in result.all():
+        (totals if period == "all" else recent)[name] = value
+    return totals, recent
+
+
+def counters_by_suffix(counters: Dict[str, Decimal], prefix: str) -> Dict[str, int]:
+    """{"jobs.status.open": 3} -> {"open": 3} for a prefix of "jobs.status.", dropping zeros"""
+    return {
+        name[len(prefix):]: int(value)
+        for name, value in counters.items()
+        if name.startswith(prefix) and value
+    }
+
+
+def _ratio(total: Decimal, count: Decimal) -> float:
+    return float(total / count) if count else 0.0
+
+
+async def get_global_stats(db: AsyncSession) -> Dict[str, Any]:
+    """Platform totals in the shape /hybrid/stats/global returns from The Graph's GlobalStats"""
+    result = await db.execute(
+        select(
+            StatsCounter.name,
+            func.sum(StatsCounter.value).label("value"),
+            func.max(StatsCounter.updated_at).label("updated_at")
+        )
+        .where(and_(StatsCounter.period == "all", StatsCounter.bucket == TOTAL_BUCKET))
+        .group_by(StatsCounter.name)
+    )
+    rows = result.all()
+    totals = defaultdict(Decimal, {row.name: row.value for row in rows})
+    last_updated = max((row.updated_at for row in rows), default=None)
+
+    return {
+        "total_workers": int(totals["workers.registered"]),
+        "verified_workers": int(totals["workers.verified"]),
+        "total_jobs": int(totals["jobs.created"]),
+        "completed_jobs": int(totals["jobs.completed"]),
+        "total_rewards": str(int(totals["jobs.created_reward"])),
+        "average_reputation": _ratio(totals["workers.active_reputation"], totals["workers.active"]),
+        "average_quality_score": _ratio(totals["jobs.quality_sum"], totals["jobs.quality_count"]),
+        "open_jobs": int(totals["jobs.status.open"]),
+        "assigned_jobs": int(totals["jobs.status.assigned"]),
+        "active_workers": int(totals["workers.active"]),
+        "last_updated": str(int(last_updated.timestamp())) if last_updated else "0"
+    }
+
+
+async def get_daily_stats(db: AsyncSession, days: int) -> List[Dict[str, Any]]:
+    """The last ``days`` UTC days, newest first, in the shape /hybrid/stats/daily returns from The Graph's DailyStats.
+
+    A day's active workers are those who completed a job that day, and its
+    average reputation is the average reputation workers were moved to that
+    day; days without reputation changes report the current average over
+    active workers.
+    """
+    today = bucket_start("day", datetime.now(timezone.utc))
+    first_day = today - timedelta(days=days - 1)
+
+    counters = (
+        select(StatsCounter.period, StatsCounter.bucket, StatsCounter.name, func.sum(StatsCounter.value).label("value"))
+        .where(or_(
+            and_(StatsCounter.period == "day", StatsCounter.bucket >= first_day),
+            and_(
+                StatsCounter.period == "all",
+                StatsCounter.bucket == TOTAL_BUCKET,
+                StatsCounter.name.in_(["workers.active", "workers.active_reputation"])
+            )
+        ))
+        .group_by(StatsCounter.period, StatsCounter.bucket, StatsCounter.name)
+        .subquery()
+    )
+
+    # Each worker with completions that day has its own jobs.completed_by.<id> counter
+    is_activity = counters.c.name.startswith("jobs.completed_by.")
+    name = case((is_activity, literal("active_workers")), else_=counters.c.name)
+    value = case((is_activity, case((counters.c.value > 0, 1), else_=0)), else_=counters.c.value)
+
+    result = await db.execute(
+        select(counters.c.period, counters.c.bucket, name, func.sum(value))
+        .group_by(counters.c.period, counters.c.bucket, name)
+    )
+
+    totals: Dict[str, Decimal] = defaultdict(Decimal)
+    by_day: Dict[datetime, Dict[str, Decimal]] = defaultdict(lambda: defaultdict(Decimal))
+    for period, bucket, counter, total in result.all():
+        if period == "all":
+            totals[counter] = total
+        else:
+            by_day[bucket][counter] = total
+    current_reputation = _ratio(totals["workers.active_reputation"], totals["workers.active"])
+
+    stats = []
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        counters = by_day[day]
+        stats.append({
+            "date": str(int(day.timestamp())),
+            "jobs_created": int(counters["jobs.created"]),
+            "jobs_completed": int(counters["jobs.completed"]),
+            "total_reward": str(int(counters["jobs.created_reward"])),
+            "average_quality": _ratio(counters["jobs.quality_sum"], counters["jobs.quality_count"]),
+            "active_workers": int(counters["active_workers"]),
+            "new_workers": int(counters["workers.registered"]),
+            "workers_verified": int(counters["workers.verified"]),
+            "average_reputation": (
+                _ratio(counters["reputation.new_sum"], counters["reputation.updates"])
+                if counters["reputation.updates"] else current_reputation
+            )
+        })
+    return stats
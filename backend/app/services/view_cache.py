@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Returned by get() on a miss
+MISSING = object()
+
+
+def felt_key(value: Any) -> int:
+    """Normalise an address or ID to an int so hex strings and ints share entries"""
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class ViewCache:
+    """Async read-through TTL cache for contract view calls, bounded by LRU.
+
+    Entries are keyed by (function name, args). Concurrent misses on the same
+    key share one load. The indexer invalidates entries when it sees an event
+    that changes them; a load that was in flight across an invalidation is
+    returned to its callers but not stored, so stale chain reads never
+    outlive the event that made them stale.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, Tuple], Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Tuple[str, Tuple], asyncio.Future] = {}
+        # (function, arg position, arg value) -> keys, so invalidation doesn't scan the cache
+        self._index: Dict[Tuple[str, int, Hashable], Set[Tuple[str, Tuple]]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, function: str, args: Tuple) -> Any:
+        """Cached value, or MISSING"""
+        key = (function, args)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, function: str, args: Tuple, value: Any):
+        key = (function, args)
+        if key not in self._entries:
+            for index, arg in enumerate(args):
+                self._index.setdefault((function, index, arg), set()).add(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_load(self, function: str, args: Tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value or load it. None results are not cached."""
+        value = self.get(function, args)
+        if value is not MISSING:
+            return value
+
+        key = (function, args)
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(function, args, load))
+            self._loading[key] = future
+            future.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _load(self, function: str, args: Tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        value = await load()
+        if value is not None and generation == self._generation:
+            self.set(function, args, value)
+        return value
+
+    def generation(self) -> int:
+        """Token for callers that load several entries themselves; see set_if_current()"""
+        return self._generation
+
+    def set_if_current(self, generation: int, function: str, args: Tuple, value: Any):
+        """Store a value loaded since ``generation`` unless an invalidation happened meanwhile"""
+        if generation == self._generation:
+            self.set(function, args, value)
+
+    def invalidate(self, function: str, *pattern: Optional[Hashable]):
+        """Drop entries of ``function`` whose args match ``pattern``; None matches any value.
+
+        invalidate("is_worker_eligible", worker, None) drops every job's
+        eligibility entry for one worker.
+        """
+        self._generation += 1
+        fixed = [(index, expected) for index, expected in enumerate(pattern) if expected is not None]
+        if fixed:
+            candidates = self._index.get((function, *fixed[0]), set())
+        else:
+            candidates = [key for key in self._entries if key[0] == function]
+        stale = [
+            key for key in candidates
+            if all(index < len(key[1]) and key[1][index] == expected for index, expected in fixed)
+        ]
+        for key in stale:
+            self._remove(key)
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached {function} entries")
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+        self._index.clear()
+
+    def _remove(self, key: Tuple[str, Tuple]):
+        del self._entries[key]
+        function, args = key
+        for index, arg in enumerate(args):
+            keys = self._index.get((function, index, arg))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[(function, index, arg)]
+
+
+# Shared instance
+_view_cache = None
+
+def get_view_cache() -> ViewCache:
+    """Get or create the contract view cache"""
+    global _view_cache
+    if _view_cache is None:
+        settings = get_settings()
+        _view_cache = ViewCache(
+            ttl=float(settings.view_cache_ttl),
+            max_size=int(settings.view_cache_max_size)
+        )
+    return _view_cache
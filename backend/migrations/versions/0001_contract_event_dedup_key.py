@@ -0,0 +1,28 @@
+"""Unique (transaction_hash, event_index) key on contract_events
+
+The indexer inserts events with ON CONFLICT DO NOTHING on this key. Tables
+created before it was added to the model get it here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_contract_events_tx_event_index "
+        "ON contract_events (transaction_hash, event_index)"
+    )
+
+
+def downgrade() -> None:
+    # Databases created by create_all have it as a constraint rather than a bare index
+    op.execute("ALTER TABLE contract_events DROP CONSTRAINT IF EXISTS uq_contract_events_tx_event_index")
+    op.execute("DROP INDEX IF EXISTS uq_contract_events_tx_event_index")
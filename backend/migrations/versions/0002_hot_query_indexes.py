@@ -0,0 +1,59 @@
+"""Indexes for the hot job, event and history queries
+
+- ix_jobs_open_by_reward: partial index over open jobs in the order
+  /jobs/available and chunk claims read them (reward desc, then age).
+  deadline > now() is not immutable, so it stays a filter on top.
+- ix_jobs_created_at: GET /jobs, newest first.
+- ix_jobs_worker_status_created_at: GET /workers/{address}/jobs, by
+  worker_id and optionally status, newest first.
+- ix_job_chunks_open: claimable chunks of a job.
+- ix_job_events_job_id_timestamp: GET /jobs/{id}/events.
+- ix_reputation_history_worker_id_timestamp: a worker's reputation history.
+- ix_contract_events_block_event: events in chain order; replaces the
+  single-column block_number index. The single-column transaction_hash
+  index is dropped too, since the (transaction_hash, event_index) unique
+  key from 0001 serves the same lookups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_jobs_open_by_reward": "jobs (reward_amount DESC, created_at) WHERE status = 'open'",
+    "ix_jobs_created_at": "jobs (created_at DESC)",
+    "ix_jobs_worker_status_created_at": "jobs (worker_id, status, created_at DESC)",
+    "ix_job_chunks_open": "job_chunks (job_id, chunk_index) WHERE status = 'open'",
+    "ix_job_events_job_id_timestamp": "job_events (job_id, timestamp DESC)",
+    "ix_reputation_history_worker_id_timestamp": "reputation_history (worker_id, timestamp DESC)",
+    "ix_contract_events_block_event": "contract_events (block_number, event_index)",
+}
+
+# Single-column indexes the new ones make redundant, and how to rebuild them
+REPLACED_INDEXES = {
+    "ix_contract_events_block_number": "contract_events (block_number)",
+    "ix_contract_events_transaction_hash": "contract_events (transaction_hash)",
+}
+
+
+def upgrade() -> None:
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    for name in REPLACED_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # Fresh plans for the new indexes
+    for table in ("jobs", "job_chunks", "job_events", "reputation_history", "contract_events"):
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    for name, definition in REPLACED_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,59 @@
+"""Add id as a tie-breaker to the listing indexes for cursor pagination
+
+List endpoints page with WHERE (sort columns, id) < (cursor values), so each
+listing index needs id as its last column. Without it, Postgres could read
+the first page from the index but would re-sort every row sharing the
+cursor's sort value. The indexes keep their names and are rebuilt with id
+appended. ix_workers_reputation is new and backs GET /workers.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# name -> (definition with id, definition before this revision or None if new)
+INDEXES = {
+    "ix_jobs_created_at": (
+        "jobs (created_at DESC, id DESC)",
+        "jobs (created_at DESC)",
+    ),
+    "ix_jobs_worker_status_created_at": (
+        "jobs (worker_id, status, created_at DESC, id DESC)",
+        "jobs (worker_id, status, created_at DESC)",
+    ),
+    "ix_job_events_job_id_timestamp": (
+        "job_events (job_id, timestamp DESC, id DESC)",
+        "job_events (job_id, timestamp DESC)",
+    ),
+    "ix_reputation_history_worker_id_timestamp": (
+        "reputation_history (worker_id, timestamp DESC, id DESC)",
+        "reputation_history (worker_id, timestamp DESC)",
+    ),
+    "ix_contract_events_block_event": (
+        "contract_events (block_number, event_index, id)",
+        "contract_events (block_number, event_index)",
+    ),
+    "ix_workers_reputation": (
+        "workers (reputation DESC, id DESC)",
+        None,
+    ),
+}
+
+
+def upgrade() -> None:
+    for name, (definition, _) in INDEXES.items():
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        op.execute(f"CREATE INDEX {name} ON {definition}")
+
+
+def downgrade() -> None:
+    for name, (_, previous) in INDEXES.items():
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+        if previous is not None:
+            op.execute(f"CREATE INDEX {name} ON {previous}")
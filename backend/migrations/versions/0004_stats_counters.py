@@ -0,0 +1,160 @@
+"""Incrementally maintained counters behind the /stats endpoints
+
+stats_counters holds one row per (period, bucket, name): period "all" with
+the epoch as its bucket for totals, and "day" and "hour" buckets starting
+at UTC day and hour boundaries. A counter counts, or sums, the rows
+currently in some state, bucketed by when they entered it. jobs.created
+under "all" is the job total, and under "hour" it is the jobs created in
+that hour.
+
+Row triggers on jobs, workers and contract_events keep the counters up to
+date in the writing transaction. Each table has a contributions function
+that lists what one row adds to which counters. The trigger adds the new
+row's contributions and subtracts the old row's, so every write path is
+covered: API handlers, the indexer, reorg rollbacks and bulk
+UPDATE/DELETE statements. Updates that don't change a counter don't write
+at all. TRUNCATE is not covered.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+STATS_BUCKET = """
+CREATE OR REPLACE FUNCTION stats_bucket(period text, ts timestamptz) RETURNS timestamptz AS $$
+    SELECT CASE period
+        WHEN 'all' THEN 'epoch'::timestamptz
+        ELSE date_trunc(period, coalesce(ts, 'epoch'::timestamptz) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+    END
+$$ LANGUAGE sql IMMUTABLE
+"""
+
+# table -> body of its contributions function, selecting (period, bucket, name, value) for row r
+CONTRIBUTIONS = {
+    "jobs": """
+        SELECT p.period, stats_bucket(p.period, r.created_at), c.name, c.value
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period),
+             (VALUES ('jobs.created', 1::numeric), ('jobs.created_reward', r.reward_amount::numeric)) AS c(name, value)
+        UNION ALL
+        SELECT 'all', 'epoch'::timestamptz, 'jobs.status.' || r.status, 1
+        WHERE r.status IS NOT NULL
+        UNION ALL
+        SELECT p.period, stats_bucket(p.period, coalesce(r.completed_at, r.created_at)), c.name, c.value
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period),
+             (VALUES
+                ('jobs.completed', 1::numeric),
+                ('jobs.completed_reward', r.reward_amount::numeric),
+                ('jobs.quality_sum', coalesce(r.quality_score, 0)::numeric),
+                ('jobs.quality_count', (r.quality_score IS NOT NULL)::int::numeric)
+             ) AS c(name, value)
+        WHERE r.status = 'completed'
+    """,
+    "workers": """
+        SELECT p.period, stats_bucket(p.period, r.registered_at), 'workers.registered', 1::numeric
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period)
+        UNION ALL
+        SELECT p.period, stats_bucket(p.period, coalesce(r.verified_at, r.registered_at)), 'workers.verified', 1
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period)
+        WHERE r.verified
+        UNION ALL
+        SELECT 'all', 'epoch'::timestamptz, c.name, c.value
+        FROM (VALUES
+            ('workers.reputation', coalesce(r.reputation, 0)::numeric),
+            ('workers.active', 1),
+            ('workers.active_reputation', coalesce(r.reputation, 0)::numeric)
+        ) AS c(name, value)
+        WHERE c.name = 'workers.reputation' OR r.active
+    """,
+    "contract_events": """
+        SELECT p.period, stats_bucket(p.period, r.timestamp), c.name, 1::numeric
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period),
+             (VALUES ('events'), ('events.type.' || r.event_name)) AS c(name)
+        UNION ALL
+        SELECT p.period, stats_bucket(p.period, r.timestamp), 'events.processed', 1
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period)
+        WHERE r.processed
+        UNION ALL
+        SELECT 'all', 'epoch'::timestamptz, 'events.unprocessed', 1
+        WHERE NOT coalesce(r.processed, false)
+    """,
+}
+
+CONTRIBUTIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION stats_{table}_contributions(r {table})
+RETURNS TABLE (period text, bucket timestamptz, name text, value numeric) AS $$
+    {body}
+$$ LANGUAGE sql STABLE
+"""
+
+# OLD is NULL for inserts and NEW for deletes, and a NULL row contributes nothing
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION stats_{table}_trigger() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO stats_counters (period, bucket, name, value)
+    SELECT changes.period, changes.bucket, changes.name, sum(changes.value)
+    FROM (
+        SELECT * FROM stats_{table}_contributions(NEW) WHERE TG_OP <> 'DELETE'
+        UNION ALL
+        SELECT c.period, c.bucket, c.name, -c.value FROM stats_{table}_contributions(OLD) AS c WHERE TG_OP <> 'INSERT'
+    ) AS changes
+    GROUP BY changes.period, changes.bucket, changes.name
+    HAVING sum(changes.value) <> 0
+    -- A fixed lock order, so concurrent writers can't deadlock on counter rows.
+    -- The key is named, not listed, so this also fits the slotted key of 0010,
+    -- which create_all builds on new databases.
+    ORDER BY changes.period, changes.bucket, changes.name
+    ON CONFLICT ON CONSTRAINT stats_counters_pkey DO UPDATE SET value = stats_counters.value + excluded.value;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # create_all has made it already when run from init_db()
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            period VARCHAR(10) NOT NULL,
+            bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            value NUMERIC NOT NULL DEFAULT 0,
+            PRIMARY KEY (period, bucket, name)
+        )
+    """)
+    op.execute(STATS_BUCKET)
+    for table, body in CONTRIBUTIONS.items():
+        op.execute(CONTRIBUTIONS_FUNCTION.format(table=table, body=body))
+        op.execute(TRIGGER_FUNCTION.format(table=table))
+        # Creating the trigger blocks writes to the table until this
+        # transaction commits, so the backfill below can't miss any
+        op.execute(f"DROP TRIGGER IF EXISTS stats_counters ON {table}")
+        op.execute(
+            f"CREATE TRIGGER stats_counters AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION stats_{table}_trigger()"
+        )
+
+    op.execute("DELETE FROM stats_counters")
+    for table in CONTRIBUTIONS:
+        op.execute(f"""
+            INSERT INTO stats_counters (period, bucket, name, value)
+            SELECT c.period, c.bucket, c.name, sum(c.value)
+            FROM {table} AS r, LATERAL stats_{table}_contributions(r) AS c
+            GROUP BY c.period, c.bucket, c.name
+            HAVING sum(c.value) <> 0
+            ON CONFLICT ON CONSTRAINT stats_counters_pkey DO UPDATE SET value = stats_counters.value + excluded.value
+        """)
+
+
+def downgrade() -> None:
+    for table in CONTRIBUTIONS:
+        op.execute(f"DROP TRIGGER IF EXISTS stats_counters ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS stats_{table}_trigger()")
+        op.execute(f"DROP FUNCTION IF EXISTS stats_{table}_contributions({table})")
+    op.execute("DROP FUNCTION IF EXISTS stats_bucket(text, timestamptz)")
+    op.execute("DROP TABLE IF EXISTS stats_counters")
@@ -0,0 +1,99 @@
+"""Counters for the database-backed global and daily stats
+
+- stats_counters.updated_at: when a counter last changed, for the
+  last_updated field of /hybrid/stats/global.
+- jobs.completed_by.<worker_id>, per day only: jobs a worker completed that
+  day. The number of these rows with a positive value is the day's active
+  workers.
+- A trigger on reputation_history adding reputation.updates and
+  reputation.new_sum, so a day's average reputation is the average
+  reputation workers were moved to that day.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+"""
+from alembic import context, op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+JOBS_CONTRIBUTIONS = """
+        UNION ALL
+        SELECT 'day', stats_bucket('day', coalesce(r.completed_at, r.created_at)), 'jobs.completed_by.' || r.worker_id, 1
+        WHERE r.status = 'completed' AND r.worker_id IS NOT NULL
+"""
+
+REPUTATION_HISTORY_CONTRIBUTIONS = """
+        SELECT p.period, stats_bucket(p.period, r.timestamp), c.name, c.value
+        FROM (VALUES ('all'), ('day'), ('hour')) AS p(period),
+             (VALUES ('reputation.updates', 1::numeric), ('reputation.new_sum', r.new_reputation::numeric)) AS c(name, value)
+"""
+
+# Counter names each table's backfill adds
+BACKFILLED = {
+    "jobs": "jobs.completed_by.%",
+    "reputation_history": "reputation.%",
+}
+
+
+def _previous():
+    """Revision 0004's module, for its contributions function bodies and templates"""
+    return context.script.get_revision("0004").module
+
+
+def _create_trigger(table: str, trigger_function: str) -> None:
+    op.execute(trigger_function.format(table=table))
+    op.execute(f"DROP TRIGGER IF EXISTS stats_counters ON {table}")
+    op.execute(
+        f"CREATE TRIGGER stats_counters AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        f"FOR EACH ROW EXECUTE FUNCTION stats_{table}_trigger()"
+    )
+
+
+def upgrade() -> None:
+    previous = _previous()
+    contributions = {
+        "jobs": previous.CONTRIBUTIONS["jobs"] + JOBS_CONTRIBUTIONS,
+        "reputation_history": REPUTATION_HISTORY_CONTRIBUTIONS,
+    }
+    trigger_function = previous.TRIGGER_FUNCTION.replace(
+        "DO UPDATE SET value = stats_counters.value + excluded.value;",
+        "DO UPDATE SET value = stats_counters.value + excluded.value, updated_at = now();"
+    )
+
+    op.execute("ALTER TABLE stats_counters ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()")
+
+    for table, body in contributions.items():
+        op.execute(previous.CONTRIBUTIONS_FUNCTION.format(table=table, body=body))
+    for table in (*previous.CONTRIBUTIONS, "reputation_history"):
+        _create_trigger(table, trigger_function)
+
+    # The triggers hold off writers until commit, as in 0004
+    for table, names in BACKFILLED.items():
+        op.execute(f"DELETE FROM stats_counters WHERE name LIKE '{names}'")
+        op.execute(f"""
+            INSERT INTO stats_counters (period, bucket, name, value)
+            SELECT c.period, c.bucket, c.name, sum(c.value)
+            FROM {table} AS r, LATERAL stats_{table}_contributions(r) AS c
+            WHERE c.name LIKE '{names}'
+            GROUP BY c.period, c.bucket, c.name
+            HAVING sum(c.value) <> 0
+        """)
+
+
+def downgrade() -> None:
+    previous = _previous()
+
+    op.execute("DROP TRIGGER IF EXISTS stats_counters ON reputation_history")
+    op.execute("DROP FUNCTION IF EXISTS stats_reputation_history_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS stats_reputation_history_contributions(reputation_history)")
+    for names in BACKFILLED.values():
+        op.execute(f"DELETE FROM stats_counters WHERE name LIKE '{names}'")
+
+    op.execute(previous.CONTRIBUTIONS_FUNCTION.format(table="jobs", body=previous.CONTRIBUTIONS["jobs"]))
+    for table in previous.CONTRIBUTIONS:
+        _create_trigger(table, previous.TRIGGER_FUNCTION)
+    op.execute("ALTER TABLE stats_counters DROP COLUMN IF EXISTS updated_at")
@@ -0,0 +1,37 @@
+"""Frame range and tiling columns on jobs
+
+Jobs gained frame_start, frame_end and frames_per_chunk for splitting
+animations into frame chunks, and tiles_x and tiles_y for splitting a frame
+into regions. create_all makes them on new databases; older jobs tables get
+them here. Existing jobs default to one frame in one tile, so they stay a
+single chunk.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# name -> column definition
+COLUMNS = {
+    "frame_start": "INTEGER NOT NULL DEFAULT 1",
+    "frame_end": "INTEGER NOT NULL DEFAULT 1",
+    "frames_per_chunk": "INTEGER",
+    "tiles_x": "INTEGER NOT NULL DEFAULT 1",
+    "tiles_y": "INTEGER NOT NULL DEFAULT 1",
+}
+
+
+def upgrade() -> None:
+    for name, definition in COLUMNS.items():
+        op.execute(f"ALTER TABLE jobs ADD COLUMN IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    for name in COLUMNS:
+        op.execute(f"ALTER TABLE jobs DROP COLUMN IF EXISTS {name}")
@@ -0,0 +1,24 @@
+"""Chunk result CIDs on jobs
+
+An animation rendered as several frame chunks has no single result CID;
+jobs.result_cids holds the chunks' CIDs in frame order once the last one
+completes.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS result_cids TEXT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS result_cids")
@@ -0,0 +1,25 @@
+"""Non-null worker reputation
+
+GET /workers pages by (reputation, id) with a keyset cursor, and a cursor
+ending on a NULL reputation matched no further rows. Workers without a
+reputation get the default of 500, and the column rejects NULLs from now on.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE workers SET reputation = 500 WHERE reputation IS NULL")
+    op.execute("ALTER TABLE workers ALTER COLUMN reputation SET DEFAULT 500, ALTER COLUMN reputation SET NOT NULL")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE workers ALTER COLUMN reputation DROP NOT NULL, ALTER COLUMN reputation DROP DEFAULT")
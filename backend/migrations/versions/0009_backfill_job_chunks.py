@@ -0,0 +1,46 @@
+"""Chunks for open jobs stored before frame ranges existed
+
+Workers claim chunks, not jobs, so an open job without chunks can't be
+claimed. Jobs get their chunks when they are created; this gives them to the
+open jobs that predate that, once, instead of checking on every claim.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+import uuid
+from types import SimpleNamespace
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.services.job_chunks import build_job_chunk_rows
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+UNCHUNKED_OPEN_JOBS = """
+    SELECT id, frame_start, frame_end, frames_per_chunk, tiles_x, tiles_y
+    FROM jobs
+    WHERE status = 'open' AND NOT EXISTS (SELECT 1 FROM job_chunks WHERE job_chunks.job_id = jobs.id)
+"""
+
+
+def upgrade() -> None:
+    rows = []
+    for job in op.get_bind().execute(sa.text(UNCHUNKED_OPEN_JOBS)).mappings():
+        try:
+            rows += [{"id": uuid.uuid4(), **row} for row in build_job_chunk_rows(SimpleNamespace(**job))]
+        except ValueError as e:
+            print(f"Not chunking job {job['id']}: {e}")
+
+    if rows:
+        job_chunks = sa.table("job_chunks", *[sa.column(name) for name in rows[0]])
+        op.bulk_insert(job_chunks, rows)
+
+
+def downgrade() -> None:
+    # The chunks are valid under the older code too
+    pass
@@ -0,0 +1,82 @@
+"""Spread each stats counter over slot rows
+
+The counter triggers upserted the same few rows for every write, such as
+jobs.status.open under "all" or the current hour's jobs.created, and held
+their row locks until commit, so every job insert, claim and completion
+waited on the transaction before it. Each counter now has up to SLOTS rows:
+a transaction adds to the slot picked by its transaction id, so concurrent
+writers mostly land on different rows, and readers sum the slots.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import context, op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+SLOTS = 16
+
+TABLES = ("jobs", "workers", "contract_events", "reputation_history")
+
+# As in 0005, with each transaction writing to its own slot
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION stats_{table}_trigger() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO stats_counters (period, bucket, name, slot, value)
+    SELECT changes.period, changes.bucket, changes.name, txid_current() % {slots}, sum(changes.value)
+    FROM (
+        SELECT * FROM stats_{table}_contributions(NEW) WHERE TG_OP <> 'DELETE'
+        UNION ALL
+        SELECT c.period, c.bucket, c.name, -c.value FROM stats_{table}_contributions(OLD) AS c WHERE TG_OP <> 'INSERT'
+    ) AS changes
+    GROUP BY changes.period, changes.bucket, changes.name
+    HAVING sum(changes.value) <> 0
+    -- A fixed lock order, so concurrent writers can't deadlock on counter rows
+    ORDER BY changes.period, changes.bucket, changes.name
+    ON CONFLICT ON CONSTRAINT stats_counters_pkey DO UPDATE SET value = stats_counters.value + excluded.value, updated_at = now();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # create_all has added the slot already when run from init_db() on a new database
+    op.execute("ALTER TABLE stats_counters ADD COLUMN IF NOT EXISTS slot SMALLINT NOT NULL DEFAULT 0")
+    op.execute(
+        "ALTER TABLE stats_counters DROP CONSTRAINT IF EXISTS stats_counters_pkey, "
+        "ADD PRIMARY KEY (period, bucket, name, slot)"
+    )
+    for table in TABLES:
+        op.execute(TRIGGER_FUNCTION.format(table=table, slots=SLOTS))
+
+
+def downgrade() -> None:
+    # Fold every counter back into one row; the triggers block writers until commit
+    op.execute("LOCK TABLE stats_counters IN EXCLUSIVE MODE")
+    op.execute("""
+        INSERT INTO stats_counters (period, bucket, name, slot, value, updated_at)
+        SELECT period, bucket, name, 0, sum(value), max(updated_at)
+        FROM stats_counters
+        WHERE slot <> 0
+        GROUP BY period, bucket, name
+        ON CONFLICT ON CONSTRAINT stats_counters_pkey DO UPDATE
+        SET value = stats_counters.value + excluded.value,
+            updated_at = greatest(stats_counters.updated_at, excluded.updated_at)
+    """)
+    op.execute("DELETE FROM stats_counters WHERE slot <> 0")
+    op.execute(
+        "ALTER TABLE stats_counters DROP CONSTRAINT stats_counters_pkey, "
+        "DROP COLUMN slot, ADD PRIMARY KEY (period, bucket, name)"
+    )
+
+    trigger_function = context.script.get_revision("0004").module.TRIGGER_FUNCTION.replace(
+        "DO UPDATE SET value = stats_counters.value + excluded.value;",
+        "DO UPDATE SET value = stats_counters.value + excluded.value, updated_at = now();"
+    )
+    for table in TABLES:
+        op.execute(trigger_function.format(table=table))
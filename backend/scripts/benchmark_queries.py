@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot job queries with and without the indexes meant for them.
+
+Each query is timed with EXPLAIN ANALYZE as-is, then again with its indexes
+dropped inside a savepoint, and the plan's top scan node is printed for
+both. Everything, including any seeded rows, runs in one transaction that
+is rolled back, so the database is left as it was. Dropping an index locks
+its table until the rollback, so point this at a copy rather than a live
+database.
+
+Usage, from backend/:
+    python scripts/benchmark_queries.py --seed 100000 --runs 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, desc, func, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import async_engine
+from app.models import ContractEvent, Job, JobChunk, JobEvent, ReputationHistory
+
+# Seeded rows use these so they never collide with real ones
+SEED_CREATOR = "0xbe7c4"
+SEED_CHAIN_JOB_OFFSET = 1_000_000_000
+
+SEED_SQL = [
+    "INSERT INTO users (id, address) VALUES (md5('bench-user')::uuid, '{creator}') ON CONFLICT DO NOTHING",
+    # One worker per 100 jobs
+    """
+    INSERT INTO workers (id, address, reputation, verified, active)
+    SELECT md5('bench-worker' || i)::uuid, '{creator}' || lpad(to_hex(i), 8, '0'), 500, true, true
+    FROM generate_series(1, greatest({rows} / 100, 1)) AS i
+    """,
+    # 20% open, 10% assigned, the rest completed
+    """
+    INSERT INTO jobs (id, chain_job_id, creator_address, asset_cid_part1, reward_amount, deadline,
+                      min_reputation, worker_id, created_at, status)
+    SELECT md5('bench-job' || i)::uuid, {offset} + i, '{creator}', 'bafybench',
+           (random() * 1e18)::bigint, now() + (random() * 14 - 2) * interval '1 day',
+           (random() * 600)::int,
+           CASE WHEN i % 10 >= 2 THEN md5('bench-worker' || (1 + i % greatest({rows} / 100, 1)))::uuid END,
+           now() - i * interval '1 minute',
+           CASE WHEN i % 10 < 2 THEN 'open' WHEN i % 10 = 2 THEN 'assigned' ELSE 'completed' END
+    FROM generate_series(1, {rows}) AS i
+    """,
+    # Ten chunks per job, the first half of an open job's still open
+    """
+    INSERT INTO job_chunks (id, job_id, chunk_index, kind, frame_start, frame_end, status)
+    SELECT md5('bench-chunk' || i || '-' || c)::uuid, md5('bench-job' || i)::uuid, c, 'render', c + 1, c + 1,
+           CASE WHEN i % 10 < 2 AND c < 5 THEN 'open' ELSE 'completed' END
+    FROM generate_series(1, {rows}) AS i, generate_series(0, 9) AS c
+    """,
+    """
+    INSERT INTO job_events (id, job_id, event_type, timestamp)
+    SELECT md5('bench-job-event' || i || '-' || e)::uuid, md5('bench-job' || i)::uuid,
+           (ARRAY['created', 'assigned', 'completed'])[e], now() - (i * 3 - e) * interval '1 minute'
+    FROM generate_series(1, {rows}) AS i, generate_series(1, 3) AS e
+    """,
+    """
+    INSERT INTO reputation_history (id, worker_id, old_reputation, new_reputation, change_amount, reason, timestamp)
+    SELECT md5('bench-reputation' || i)::uuid, md5('bench-worker' || (1 + i % greatest({rows} / 100, 1)))::uuid,
+           500, 510, 10, 'job_completion', now() - i * interval '1 minute'
+    FROM generate_series(1, {rows}) AS i
+    """,
+    """
+    INSERT INTO contract_events (id, transaction_hash, block_number, event_index, contract_address,
+                                 event_name, event_data, processed)
+    SELECT md5('bench-contract-event' || i)::uuid, '0x' || md5('bench-tx' || (i / 4)), 1000000000 + i / 4, i % 4,
+           '{creator}', 'JobCreated', '{{}}', i % 100 <> 0
+    FROM generate_series(1, {rows}) AS i
+    """,
+]
+
+
+def bench_queries(worker_id: uuid.UUID, job_id: uuid.UUID):
+    """(name, statement, indexes it should use) for each hot query, as the API builds them"""
+    return [
+        (
+            "GET /jobs/available",
+            select(Job).where(and_(
+                Job.status == "open",
+                Job.worker_id.is_(None),
+                Job.deadline > func.now(),
+            )).order_by(Job.reward_amount.desc()).limit(50),
+            ["ix_jobs_open_by_reward"],
+        ),
+        (
+            "POST /jobs/claim candidates",
+            select(JobChunk.id).join(Job, Job.id == JobChunk.job_id).where(and_(
+                JobChunk.status == "open",
+                Job.status == "open",
+                Job.deadline > func.now(),
+                Job.min_reputation <= 500,
+            )).order_by(Job.reward_amount.desc(), Job.created_at, JobChunk.chunk_index).limit(10),
+            ["ix_jobs_open_by_reward", "ix_job_chunks_open"],
+        ),
+        (
+            "GET /jobs",
+            select(Job).order_by(Job.created_at.desc()).limit(50),
+            ["ix_jobs_created_at"],
+        ),
+        (
+            "GET /workers/{address}/jobs",
+            select(Job).where(Job.worker_id == worker_id).order_by(Job.created_at.desc()).limit(50),
+            ["ix_jobs_worker_status_created_at"],
+        ),
+        (
+            "GET /workers/{address}/jobs?status=completed",
+            select(Job).where(and_(Job.worker_id == worker_id, Job.status == "completed"))
+            .order_by(Job.created_at.desc()).limit(50),
+            ["ix_jobs_worker_status_created_at"],
+        ),
+        (
+            "GET /jobs/{id}/events",
+            select(JobEvent).where(JobEvent.job_id == job_id).order_by(JobEvent.timestamp.desc()).limit(50),
+            ["ix_job_events_job_id_timestamp"],
+        ),
+        (
+            "GET /workers/{address}/reputation-history",
+            select(ReputationHistory).where(ReputationHistory.worker_id == worker_id)
+            .order_by(ReputationHistory.timestamp.desc()).limit(50),
+            ["ix_reputation_history_worker_id_timestamp"],
+        ),
+        (
+            "GET /events",
+            select(ContractEvent).order_by(desc(ContractEvent.block_number), desc(ContractEvent.event_index)).limit(50),
+            ["ix_contract_events_block_event"],
+        ),
+    ]
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def top_scan(plan: dict) -> str:
+    """First scan node in the plan, e.g. 'Index Scan using ix_jobs_created_at'"""
+    if "Scan" in plan["Node Type"]:
+        index = plan.get("Index Name")
+        return f"{plan['Node Type']} using {index}" if index else f"{plan['Node Type']} on {plan.get('Relation Name')}"
+    for child in plan.get("Plans", []):
+        found = top_scan(child)
+        if found:
+            return found
+    return ""
+
+
+async def time_query(conn, sql: str, runs: int):
+    """Median execution time in ms over ``runs`` and the plan's top scan"""
+    timings = []
+    plan = None
+    for _ in range(runs):
+        result = await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))
+        explained = result.scalar()
+        if isinstance(explained, str):
+            explained = json.loads(explained)
+        timings.append(explained[0]["Execution Time"])
+        plan = explained[0]["Plan"]
+    return statistics.median(timings), top_scan(plan)
+
+
+async def benchmark(rows: int, runs: int):
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            if rows:
+                print(f"Seeding {rows} jobs...")
+                for statement in SEED_SQL:
+                    await conn.execute(text(statement.format(rows=rows, offset=SEED_CHAIN_JOB_OFFSET, creator=SEED_CREATOR)))
+                for table in ("jobs", "job_chunks", "job_events", "reputation_history", "contract_events"):
+                    await conn.execute(text(f"ANALYZE {table}"))
+                # A seeded worker with jobs and history, and one of its jobs
+                worker_id = (await conn.execute(text("SELECT md5('bench-worker1')::uuid"))).scalar()
+                job_id = (await conn.execute(text("SELECT md5('bench-job3')::uuid"))).scalar()
+            else:
+                worker_id = (await conn.execute(select(Job.worker_id).where(Job.worker_id.is_not(None)).limit(1))).scalar()
+                job_id = (await conn.execute(select(JobEvent.job_id).limit(1))).scalar()
+                worker_id = worker_id or uuid.uuid4()
+                job_id = job_id or uuid.uuid4()
+
+            print(f"{'query':<46} {'indexed ms':>11} {'without ms':>11}  plan")
+            for name, statement, indexes in bench_queries(worker_id, job_id):
+                sql = compile_sql(statement)
+
+                indexed_ms, indexed_plan = await time_query(conn, sql, runs)
+
+                savepoint = await conn.begin_nested()
+                for index in indexes:
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+                without_ms, without_plan = await time_query(conn, sql, runs)
+                await savepoint.rollback()
+
+                print(f"{name:<46} {indexed_ms:>11.3f} {without_ms:>11.3f}  {indexed_plan} / {without_plan}")
+        finally:
+            await transaction.rollback()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="synthetic jobs to insert first (rolled back afterwards)")
+    parser.add_argument("--runs", type=int, default=10, help="EXPLAIN ANALYZE runs per query; the median is reported")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.seed, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Single-pass asset extraction for the workers.
+
+IPFS returns an asset either as the raw file (gateways) or wrapped in a tar
+stream (/api/v0/get). Instead of saving the response, re-reading it with
+tarfile.is_tarfile / zipfile.is_zipfile, extracting it and walking the result,
+the format is sniffed from the first bytes and tar members are written to disk
+as they come off the socket. The .blend member is picked up during
+extraction, so no directory walk is needed afterwards.
+
+Zip archives keep their index at the end of the file, so they are spooled to
+disk once and extracted from there.
+"""
+
+import io
+import os
+import shutil
+import tarfile
+import zipfile
+import zlib
+from typing import BinaryIO, List, Optional
+
+# tar keeps its "ustar" magic at offset 257, so sniff a full header block
+SNIFF_SIZE = 512
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def sniff_format(header: bytes) -> str:
+    """Identify an asset from its first bytes"""
+    if header.startswith(b"BLENDER") or header.startswith(b"\x28\xb5\x2f\xfd"):
+        # Plain or zstd-compressed (Blender 3.0+) .blend
+        return "blender"
+    if header.startswith(b"PK\x03\x04") or header.startswith(b"PK\x05\x06"):
+        return "zip"
+    if header[257:262] == b"ustar":
+        return "tar"
+    if header.startswith(b"\x1f\x8b"):
+        # Either a .tar.gz or an old gzip-compressed .blend; look inside
+        try:
+            inner = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(header)
+        except zlib.error:
+            return "unknown"
+        if inner.startswith(b"BLENDER"):
+            return "blender"
+        return "tar"
+    if header.startswith(b"BZh") or header.startswith(b"\xfd7zXZ\x00"):
+        return "tar"
+    return "unknown"
+
+
+def _is_blend_file(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return sniff_format(f.read(SNIFF_SIZE)) == "blender"
+    except OSError:
+        return False
+
+
+def _ensure_blend_extension(path: str) -> str:
+    """Blender files downloaded by CID have no extension; give them one"""
+    if path.endswith(".blend"):
+        return path
+    blend_path = path + ".blend"
+    shutil.move(path, blend_path)
+    return blend_path
+
+
+def extract_tar_stream(fileobj: BinaryIO, target_dir: str) -> Optional[str]:
+    """Extract a (possibly compressed) tar stream member by member.
+
+    Returns the first .blend file found, or None. Files written before a
+    failure are removed so a retry starts clean.
+    """
+    extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+    extracted: List[str] = []
+    blend_path = None
+
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+            for member in tar:
+                tar.extract(member, target_dir, **extract_kwargs)
+                if not member.isfile():
+                    continue
+
+                member_path = os.path.join(target_dir, member.name)
+                extracted.append(member_path)
+                print(f"[Worker] Extracted {member.name} ({member.size} bytes)")
+
+                if blend_path is None and (member.name.endswith(".blend") or _is_blend_file(member_path)):
+                    blend_path = member_path
+    except Exception:
+        for path in extracted:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+
+    if blend_path:
+        blend_path = _ensure_blend_extension(blend_path)
+    return blend_path
+
+
+def extract_zip_file(zip_path: str, target_dir: str) -> Optional[str]:
+    """Extract a zip archive and return the first .blend member"""
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        names = zip_ref.namelist()
+        print(f"[Worker] Zip archive contains {len(names)} file(s)")
+        zip_ref.extractall(target_dir)
+
+    for name in names:
+        if name.endswith(".blend"):
+            return os.path.join(target_dir, name)
+    for name in names:
+        path = os.path.join(target_dir, name)
+        if os.path.isfile(path) and _is_blend_file(path):
+            return _ensure_blend_extension(path)
+    return None
+
+
+def extract_stream(stream: BinaryIO, target_dir: str, name: str) -> Optional[str]:
+    """Write an asset stream into ``target_dir`` and return the .blend path.
+
+    ``name`` is used for raw files and spooled zips (usually the CID).
+    Unknown formats are saved as-is and treated as a raw .blend file.
+    """
+    reader = stream if isinstance(stream, io.BufferedReader) else io.BufferedReader(stream, COPY_BUFFER_SIZE)
+    header = reader.peek(SNIFF_SIZE)[:SNIFF_SIZE]
+    kind = sniff_format(header)
+    print(f"[Worker] Detected asset format from stream: {kind}")
+
+    if kind == "tar":
+        return extract_tar_stream(reader, target_dir)
+
+    if kind == "zip":
+        zip_path = os.path.join(target_dir, name + ".zip")
+        with open(zip_path, "wb") as f:
+            shutil.copyfileobj(reader, f, COPY_BUFFER_SIZE)
+        blend_path = extract_zip_file(zip_path, target_dir)
+        os.remove(zip_path)
+        return blend_path
+
+    # Raw file: stream straight into place
+    blend_path = os.path.join(target_dir, name if name.endswith(".blend") else name + ".blend")
+    with open(blend_path, "wb") as f:
+        shutil.copyfileobj(reader, f, COPY_BUFFER_SIZE)
+    return blend_path
+
+
+def extract_file(file_path: str, target_dir: str) -> Optional[str]:
+    """Extract an already-downloaded asset in a single pass and return the .blend path.
+
+    Raw .blend files are renamed in place; archives are extracted into
+    ``target_dir`` and removed afterwards.
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(SNIFF_SIZE)
+    kind = sniff_format(header)
+    print(f"[Worker] Detected asset format: {kind}")
+
+    if kind == "tar":
+        # IPFS names the single tar member after the CID, which is also the
+        # download's file name; move the archive aside before extracting
+        archive_path = file_path + ".tar"
+        os.replace(file_path, archive_path)
+        with open(archive_path, "rb") as f:
+            blend_path = extract_tar_stream(f, target_dir)
+        os.remove(archive_path)
+        return blend_path
+
+    if kind == "zip":
+        archive_path = file_path + ".zip"
+        os.replace(file_path, archive_path)
+        blend_path = extract_zip_file(archive_path, target_dir)
+        os.remove(archive_path)
+        return blend_path
+
+    return _ensure_blend_extension(file_path)
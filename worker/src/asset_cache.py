@@ -0,0 +1,244 @@
+"""
+Content-addressed local cache for downloaded job assets.
+
+Assets are keyed by IPFS CID, so a cached entry never goes stale. Each entry
+is the extracted asset tree for one CID; jobs get their own copy of the tree
+through hardlinks (or reflinks / plain copies across filesystems), so a repeat
+CID costs no network I/O and almost no disk I/O. Those hardlinked job files are
+read-only like the cache itself. A freshly downloaded tree is stored by copy
+(a reflink where supported) instead, so the job that downloaded it keeps
+writable files. The cache is bounded in size and evicts least recently used
+entries.
+
+Layout:
+    <root>/index.json      {cid: {"size": ..., "last_used": ..., "blend": relpath}}
+    <root>/<cid>/...       extracted asset files (read-only)
+"""
+
+import asyncio
+import errno
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # Linux ioctl for reflink copies (btrfs, xfs)
+except ImportError:
+    fcntl = None
+    FICLONE = None
+
+
+def clone_file(src: str, dst: str, hardlink: bool = True) -> None:
+    """Give ``dst`` the content of ``src`` as cheaply as the filesystem allows.
+
+    With ``hardlink=False`` the two never share an inode, so changing the
+    permissions of one leaves the other alone.
+    """
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+
+    shutil.copy2(src, dst)
+
+
+def clone_tree(src_dir: str, dst_dir: str, skip: Optional[set] = None, hardlink: bool = True) -> int:
+    """Clone every file under ``src_dir`` into ``dst_dir``. Returns total bytes."""
+    total = 0
+    for root, dirs, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        target_root = os.path.join(dst_dir, rel_root) if rel_root != "." else dst_dir
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            src = os.path.join(root, name)
+            if skip and src in skip:
+                continue
+            dst = os.path.join(target_root, name)
+            if os.path.exists(dst):
+                os.remove(dst)
+            clone_file(src, dst, hardlink)
+            total += os.path.getsize(src)
+    return total
+
+
+class AssetCache:
+    """Size-bounded, CID-keyed on-disk cache with LRU eviction"""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.index_path = self.root / "index.json"
+        self._index: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # cid -> [lock, jobs holding or waiting for it]
+        self._cid_locks: Dict[str, list] = {}
+        # cid -> checkouts cloning it right now, which eviction leaves alone
+        self._checkouts: Dict[str, int] = {}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._index.values())
+
+    @asynccontextmanager
+    async def cid_lock(self, cid: str):
+        """Hold a CID's lock while it is being fetched, so concurrent jobs download it once.
+
+        The lock is dropped once no job holds or waits for it.
+        """
+        holder = self._cid_locks.setdefault(cid, [asyncio.Lock(), 0])
+        holder[1] += 1
+        try:
+            async with holder[0]:
+                yield
+        finally:
+            holder[1] -= 1
+            if not holder[1]:
+                del self._cid_locks[cid]
+
+    def _load_index(self) -> None:
+        """Load the index and reconcile it with what is actually on disk"""
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, "r") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[Worker] Asset cache index unreadable, starting empty: {e}")
+                self._index = {}
+
+        # Forget entries whose files are gone
+        for cid in list(self._index):
+            if not (self.root / cid / self._index[cid]["blend"]).exists():
+                del self._index[cid]
+
+        # Remove directories that never made it into the index (interrupted stores)
+        for path in self.root.iterdir():
+            if path.is_dir() and path.name not in self._index:
+                shutil.rmtree(path, ignore_errors=True)
+
+        self._save_index()
+        print(f"[Worker] Asset cache: {len(self._index)} entries, {self.total_bytes / 1024**2:.1f} MiB in {self.root}")
+
+    def _save_index(self) -> None:
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def checkout(self, cid: str, target_dir: str) -> Optional[str]:
+        """Clone a cached asset into a job directory.
+
+        Returns the path of the job's .blend file, or None on a cache miss.
+        The job's files are read-only hardlinks to the cache where possible.
+        """
+        with self._lock:
+            entry = self._index.get(cid)
+            if not entry:
+                return None
+            entry["last_used"] = time.time()
+            self._save_index()
+            self._checkouts[cid] = self._checkouts.get(cid, 0) + 1
+
+        # Clone outside the lock; the entry can't be evicted while checked out
+        try:
+            clone_tree(str(self.root / cid), target_dir)
+            broken = None
+        except OSError as e:
+            broken = e
+
+        with self._lock:
+            self._checkouts[cid] -= 1
+            if not self._checkouts[cid]:
+                del self._checkouts[cid]
+            if broken:
+                print(f"[Worker] Asset cache entry for {cid} is broken, dropping it: {broken}")
+                self._evict(cid)
+                self._save_index()
+                return None
+        return os.path.join(target_dir, entry["blend"])
+
+    def store(self, cid: str, source_dir: str, blend_path: str, skip: Optional[set] = None) -> None:
+        """Add the extracted asset tree of a freshly downloaded CID to the cache.
+
+        ``skip`` lists files under ``source_dir`` that should not be cached,
+        such as the raw archive once it has been extracted.
+        """
+        with self._lock:
+            if cid in self._index:
+                return
+
+        # Copy outside the lock, into a staging directory of this call's own.
+        # Copies, not hardlinks: the job's files must stay writable while the
+        # cached ones are made read-only.
+        staging_dir = tempfile.mkdtemp(prefix=f"{cid}.staging-", dir=self.root)
+        try:
+            size = clone_tree(source_dir, staging_dir, skip, hardlink=False)
+        except OSError as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            print(f"[Worker] Could not cache asset {cid}: {e}")
+            return
+
+        if size > self.max_bytes:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            print(f"[Worker] Asset {cid} ({size} bytes) is larger than the cache, not caching")
+            return
+
+        # Cached files are shared with later jobs through hardlinks; keep them read-only
+        for root, dirs, files in os.walk(staging_dir):
+            for name in files:
+                os.chmod(os.path.join(root, name), 0o444)
+
+        with self._lock:
+            if cid in self._index:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return
+
+            entry_dir = self.root / cid
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging_dir, entry_dir)
+            self._index[cid] = {
+                "size": size,
+                "last_used": time.time(),
+                "blend": os.path.relpath(blend_path, source_dir)
+            }
+            self._evict_to_fit(keep=cid)
+            self._save_index()
+            print(f"[Worker] Cached asset {cid} ({size} bytes)")
+
+    def _evict(self, cid: str) -> None:
+        self._index.pop(cid, None)
+        shutil.rmtree(self.root / cid, ignore_errors=True)
+
+    def _evict_to_fit(self, keep: str) -> None:
+        """Evict least recently used entries until the cache fits its size bound"""
+        by_age = sorted(self._index.items(), key=lambda item: item[1]["last_used"])
+        total = self.total_bytes
+        for cid, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if cid == keep or cid in self._checkouts:
+                continue
+            print(f"[Worker] Evicting cached asset {cid} ({entry['size']} bytes)")
+            total -= entry["size"]
+            self._evict(cid)
@@ -0,0 +1,115 @@
+"""
+Async Blender subprocess helper shared by both workers.
+
+Runs Blender with asyncio.create_subprocess_exec so the event loop keeps
+running (polling, heartbeats, downloads) while a render is in progress.
+"""
+
+import asyncio
+import subprocess
+from typing import Callable, List, Optional
+
+# Blender can print very long lines (e.g. Python tracebacks); raise the
+# StreamReader line limit well above the 64 KiB default.
+STREAM_LIMIT = 1024 * 1024
+
+# How long to wait for Blender to exit after a kill before giving up
+KILL_GRACE_PERIOD = 5
+
+
+class BlenderResult:
+    """Outcome of a finished Blender process (mirrors subprocess.CompletedProcess)"""
+
+    def __init__(self, args: List[str], returncode: int, stdout_lines: List[str], stderr_lines: List[str]):
+        self.args = args
+        self.returncode = returncode
+        self.stdout_lines = stdout_lines
+        self.stderr_lines = stderr_lines
+
+    @property
+    def stdout(self) -> str:
+        return "\n".join(self.stdout_lines)
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_lines)
+
+
+async def _pump_stream(
+    stream: asyncio.StreamReader,
+    lines: List[str],
+    on_line: Optional[Callable[[str], None]]
+) -> None:
+    """Read a process stream line by line as Blender writes it"""
+    async for raw in stream:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        lines.append(line)
+        if on_line:
+            on_line(line)
+
+
+async def _kill_process(process: asyncio.subprocess.Process) -> None:
+    """Kill Blender and reap it so no zombie is left behind"""
+    if process.returncode is not None:
+        return
+    try:
+        process.kill()
+    except ProcessLookupError:
+        return
+    try:
+        await asyncio.wait_for(process.wait(), timeout=KILL_GRACE_PERIOD)
+    except asyncio.TimeoutError:
+        print(f"[Worker] Warning: Blender process {process.pid} did not exit after kill")
+
+
+async def run_blender(
+    cmd: List[str],
+    timeout: float,
+    on_line: Optional[Callable[[str], None]] = None
+) -> BlenderResult:
+    """Run a Blender command without blocking the event loop.
+
+    stdout and stderr are streamed line by line; ``on_line`` is called for every
+    stdout line as it arrives. On timeout the process is killed and
+    ``subprocess.TimeoutExpired`` is raised, like ``subprocess.run`` would. If the
+    calling task is cancelled, the process is killed before re-raising.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LIMIT
+    )
+
+    stdout_lines: List[str] = []
+    stderr_lines: List[str] = []
+
+    streams = asyncio.gather(
+        _pump_stream(process.stdout, stdout_lines, on_line),
+        _pump_stream(process.stderr, stderr_lines, None),
+        process.wait()
+    )
+    # Mark the gather result as retrieved when wait_for cancels it
+    streams.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    try:
+        await asyncio.wait_for(streams, timeout=timeout)
+    except asyncio.TimeoutError:
+        await _kill_process(process)
+        raise subprocess.TimeoutExpired(
+            cmd,
+            timeout,
+            output="\n".join(stdout_lines),
+            stderr="\n".join(stderr_lines)
+        )
+    except asyncio.CancelledError:
+        await _kill_process(process)
+        raise
+
+    return BlenderResult(cmd, process.returncode, stdout_lines, stderr_lines)
+
+
+def print_blender_line(line: str) -> None:
+    """Default ``on_line`` callback: echo Blender progress output"""
+    if line.startswith("Fra:") or "Error" in line:
+        print(f"[Worker] [Blender] {line}")
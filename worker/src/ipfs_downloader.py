@@ -0,0 +1,450 @@
+"""
+Parallel, resumable IPFS gateway downloader for the API worker.
+
+Large assets are split into fixed-size byte ranges that are fetched with HTTP
+Range requests from several gateways at once. Finished ranges are recorded in
+a sidecar file next to the partial download, so an interrupted download picks
+up where it stopped instead of starting from zero. A range that fails on one
+gateway is retried on the next. The finished file is verified against its CID,
+where that is conclusive, before it is handed to the job.
+
+GatewayStream reads a CID front to back instead, for extracting archives
+while they arrive. It is a single sequential download that resumes at the
+current offset on the next gateway when one fails. Only raw-codec CIDs can be
+verified while streaming.
+"""
+
+import base64
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+CODEC_RAW = 0x55
+CODEC_DAG_PB = 0x70
+HASH_SHA2_256 = 0x12
+
+
+class DownloadError(Exception):
+    """The asset could not be downloaded from any gateway"""
+
+
+class CIDVerificationError(DownloadError):
+    """The downloaded bytes do not hash to the requested CID"""
+
+
+def _base58_decode(text: str) -> bytes:
+    value = 0
+    for char in text:
+        value = value * 58 + BASE58_ALPHABET.index(char)
+    decoded = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    leading_zeros = len(text) - len(text.lstrip("1"))
+    return b"\x00" * leading_zeros + decoded
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def parse_cid(cid: str) -> Optional[Dict[str, object]]:
+    """Decode a CIDv0 or base32 CIDv1 into version, codec and multihash.
+
+    Returns None for encodings this worker does not understand.
+    """
+    try:
+        if cid.startswith("Qm") and len(cid) == 46:
+            multihash = _base58_decode(cid)
+            version, codec = 0, CODEC_DAG_PB
+        elif cid.startswith("b"):
+            encoded = cid[1:].upper()
+            raw = base64.b32decode(encoded + "=" * (-len(encoded) % 8))
+            version, offset = _read_varint(raw, 0)
+            codec, offset = _read_varint(raw, offset)
+            multihash = raw[offset:]
+        else:
+            return None
+
+        hash_code, offset = _read_varint(multihash, 0)
+        digest_length, offset = _read_varint(multihash, offset)
+        return {
+            "version": version,
+            "codec": codec,
+            "hash_code": hash_code,
+            "digest": multihash[offset:offset + digest_length]
+        }
+    except (ValueError, IndexError):
+        return None
+
+
+def verify_cid(cid: str, file_path: str, ipfs_api_url: Optional[str] = None) -> Optional[bool]:
+    """Check that a downloaded file matches its CID.
+
+    Raw-codec CIDs are verified by hashing the file directly, so only they can
+    fail. UnixFS (dag-pb) CIDs are recomputed by the local IPFS node with
+    ``add --only-hash`` using the node's default chunking; a match confirms the
+    file, but a file uploaded with another chunker, leaf setting or tool hashes
+    differently, so a mismatch is inconclusive. Returns None when the CID
+    cannot be verified here.
+    """
+    parsed = parse_cid(cid)
+    if not parsed:
+        return None
+
+    if parsed["codec"] == CODEC_RAW and parsed["hash_code"] == HASH_SHA2_256:
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        return sha256.digest() == parsed["digest"]
+
+    if parsed["codec"] == CODEC_DAG_PB and ipfs_api_url:
+        try:
+            with open(file_path, "rb") as f:
+                response = requests.post(
+                    f"{ipfs_api_url}/api/v0/add",
+                    params={"only-hash": "true", "cid-version": parsed["version"], "pin": "false"},
+                    files={"file": f},
+                    timeout=600
+                )
+            response.raise_for_status()
+            computed = response.json()["Hash"]
+        except Exception as e:
+            print(f"[Worker] Could not recompute CID with local IPFS node: {e}")
+            return None
+        if computed != cid:
+            print(f"[Worker] Local IPFS node hashes {cid} as {computed}; it was probably added with other chunking")
+            return None
+        return True
+
+    return None
+
+
+class ChunkedDownloader:
+    """Downloads a CID with parallel Range requests spread over several gateways"""
+
+    def __init__(
+        self,
+        gateways: List[str],
+        chunk_size: int = 8 * 1024 * 1024,
+        buffer_size: int = 1024 * 1024,
+        max_parallel: int = 4,
+        timeout: float = 60,
+        max_attempts: int = 3,
+        ipfs_api_url: Optional[str] = None,
+        verify: bool = True
+    ):
+        self.gateways = [g.rstrip("/") for g in gateways if g]
+        self.chunk_size = chunk_size
+        self.buffer_size = buffer_size
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.ipfs_api_url = ipfs_api_url
+        self.verify = verify
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(max_parallel, 10))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def stream(self, cid: str) -> "GatewayStream":
+        """Open ``cid`` for sequential reading across the configured gateways"""
+        if not self.gateways:
+            raise DownloadError("No IPFS gateways configured")
+        return GatewayStream(self, cid)
+
+    def _probe(self, gateway: str, cid: str) -> Tuple[Optional[int], bool]:
+        """Return (size, supports_ranges) for a gateway, or (None, False) if unusable"""
+        try:
+            response = self.session.get(
+                f"{gateway}/{cid}",
+                headers={"Range": "bytes=0-0"},
+                stream=True,
+                timeout=self.timeout
+            )
+            try:
+                response.raise_for_status()
+                content_range = response.headers.get("Content-Range", "")
+                if response.status_code == 206 and "/" in content_range:
+                    total = content_range.rsplit("/", 1)[1]
+                    if total.isdigit():
+                        return int(total), True
+                length = response.headers.get("Content-Length")
+                return (int(length) if length and length.isdigit() else None), False
+            finally:
+                response.close()
+        except Exception as e:
+            print(f"[Worker] Gateway {gateway} unavailable for {cid}: {e}")
+            return None, False
+
+    def download(self, cid: str, dest_path: str) -> int:
+        """Download ``cid`` to ``dest_path``, resuming any earlier partial download.
+
+        Returns the file size. Raises DownloadError if every gateway fails and
+        CIDVerificationError if the result does not match the CID.
+        """
+        if not self.gateways:
+            raise DownloadError("No IPFS gateways configured")
+
+        with ThreadPoolExecutor(max_workers=len(self.gateways)) as pool:
+            probes = list(pool.map(lambda g: (g, self._probe(g, cid)), self.gateways))
+
+        ranged = [g for g, (size, ranges) in probes if ranges]
+        sizes = {size for g, (size, ranges) in probes if ranges}
+        if ranged and len(sizes) == 1:
+            size = sizes.pop()
+            print(f"[Worker] Downloading {cid} ({size} bytes) in parallel from {len(ranged)} gateway(s)")
+            self._download_ranges(cid, dest_path, size, ranged)
+        else:
+            reachable = [g for g, (size, ranges) in probes if size is not None] or self.gateways
+            print(f"[Worker] Gateways don't support ranges for {cid}, streaming from one at a time")
+            self._download_stream(cid, dest_path, reachable)
+
+        if self.verify:
+            verified = verify_cid(cid, dest_path, self.ipfs_api_url)
+            if verified is False:
+                os.remove(dest_path)
+                raise CIDVerificationError(f"Downloaded data does not match CID {cid}")
+            if verified is None:
+                print(f"[Worker] Warning: could not verify download against CID {cid}")
+            else:
+                print(f"[Worker] Verified download against CID {cid}")
+
+        return os.path.getsize(dest_path)
+
+    def _download_ranges(self, cid: str, dest_path: str, size: int, gateways: List[str]) -> None:
+        part_path = dest_path + ".part"
+        state_path = dest_path + ".part.json"
+        chunk_count = max(1, (size + self.chunk_size - 1) // self.chunk_size)
+
+        # Resume from a previous attempt if it used the same layout
+        done: set = set()
+        if os.path.exists(part_path) and os.path.exists(state_path):
+            try:
+                with open(state_path, "r") as f:
+                    state = json.load(f)
+                if state.get("size") == size and state.get("chunk_size") == self.chunk_size:
+                    done = set(state.get("done", []))
+                    print(f"[Worker] Resuming {cid}: {len(done)}/{chunk_count} chunks already downloaded")
+            except (OSError, ValueError):
+                done = set()
+
+        if not done:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+
+        state_lock = threading.Lock()
+        gateway_cycle = itertools.cycle(gateways)
+
+        def save_state() -> None:
+            with open(state_path, "w") as f:
+                json.dump({"size": size, "chunk_size": self.chunk_size, "done": sorted(done)}, f)
+
+        def fetch_chunk(index: int) -> None:
+            start = index * self.chunk_size
+            end = min(start + self.chunk_size, size) - 1
+            errors = []
+
+            for attempt in range(self.max_attempts * len(gateways)):
+                with state_lock:
+                    gateway = next(gateway_cycle)
+                try:
+                    self._fetch_range(f"{gateway}/{cid}", part_path, start, end)
+                    with state_lock:
+                        done.add(index)
+                        save_state()
+                    return
+                except Exception as e:
+                    errors.append(f"{gateway}: {e}")
+
+            raise DownloadError(f"Chunk {index} of {cid} failed on every gateway: {errors[-1]}")
+
+        pending = [i for i in range(chunk_count) if i not in done]
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            # list() re-raises the first chunk failure; the state file keeps the rest
+            list(pool.map(fetch_chunk, pending))
+
+        os.replace(part_path, dest_path)
+        os.remove(state_path)
+
+    def _fetch_range(self, url: str, part_path: str, start: int, end: int) -> None:
+        response = self.session.get(
+            url,
+            headers={"Range": f"bytes={start}-{end}"},
+            stream=True,
+            timeout=self.timeout
+        )
+        try:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise DownloadError(f"Gateway ignored range request (status {response.status_code})")
+
+            written = 0
+            with open(part_path, "r+b") as f:
+                f.seek(start)
+                for block in response.iter_content(chunk_size=self.buffer_size):
+                    if block:
+                        f.write(block)
+                        written += len(block)
+
+            expected = end - start + 1
+            if written != expected:
+                raise DownloadError(f"Short range read: {written} of {expected} bytes")
+        finally:
+            response.close()
+
+    def _download_stream(self, cid: str, dest_path: str, gateways: List[str]) -> None:
+        """Whole-file download with failover, for gateways without range support"""
+        part_path = dest_path + ".part"
+        errors = []
+
+        for gateway in gateways:
+            try:
+                response = self.session.get(f"{gateway}/{cid}", stream=True, timeout=self.timeout)
+                try:
+                    response.raise_for_status()
+                    with open(part_path, "wb") as f:
+                        for block in response.iter_content(chunk_size=self.buffer_size):
+                            if block:
+                                f.write(block)
+                finally:
+                    response.close()
+                os.replace(part_path, dest_path)
+                return
+            except Exception as e:
+                print(f"[Worker] Download of {cid} from {gateway} failed: {e}")
+                errors.append(f"{gateway}: {e}")
+
+        raise DownloadError(f"All gateways failed for {cid}: {'; '.join(errors)}")
+
+
+class GatewayStream(io.RawIOBase):
+    """Sequential read of a CID from the downloader's gateways.
+
+    A gateway that fails or ends early is replaced by the next one, asked for
+    the rest with a Range request, so an interrupted stream carries on from
+    where it stopped. Call finish() once the consumer is done to read any
+    trailing bytes and check the CID.
+    """
+
+    def __init__(self, downloader: ChunkedDownloader, cid: str):
+        super().__init__()
+        self.downloader = downloader
+        self.cid = cid
+        self.offset = 0
+        self.size: Optional[int] = None
+        self._gateways = itertools.cycle(downloader.gateways)
+        self._failures = 0
+        self._response = None
+        self._eof = False
+
+        parsed = parse_cid(cid)
+        self._sha256 = None
+        if downloader.verify and parsed and parsed["codec"] == CODEC_RAW and parsed["hash_code"] == HASH_SHA2_256:
+            self._sha256 = hashlib.sha256()
+            self._digest = parsed["digest"]
+
+    def readable(self) -> bool:
+        return True
+
+    def _open(self) -> None:
+        gateway = next(self._gateways)
+        # Offsets count the file's own bytes, so ask for no transfer encoding
+        headers = {"Accept-Encoding": "identity"}
+        if self.offset:
+            headers["Range"] = f"bytes={self.offset}-"
+        response = self.downloader.session.get(
+            f"{gateway}/{self.cid}",
+            headers=headers,
+            stream=True,
+            timeout=self.downloader.timeout
+        )
+        try:
+            response.raise_for_status()
+            if response.headers.get("Content-Type", "").startswith("text/html"):
+                # Gateways list directories as HTML; there is no file to stream
+                raise IsADirectoryError(f"{self.cid} is a directory on {gateway}")
+            if self.offset and response.status_code != 206:
+                raise DownloadError(f"Gateway {gateway} ignored range request (status {response.status_code})")
+            content_range = response.headers.get("Content-Range", "")
+            length = response.headers.get("Content-Length")
+            if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                self.size = int(content_range.rsplit("/", 1)[1])
+            elif not self.offset and length and length.isdigit():
+                self.size = int(length)
+        except Exception:
+            response.close()
+            raise
+        self._response = response
+        if self.offset:
+            print(f"[Worker] Resuming stream of {self.cid} at byte {self.offset} from {gateway}")
+
+    def _fail(self, error: Exception) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+        self._failures += 1
+        if self._failures >= self.downloader.max_attempts * len(self.downloader.gateways):
+            raise DownloadError(f"Streaming {self.cid} failed on every gateway: {error}")
+        print(f"[Worker] Stream of {self.cid} interrupted at byte {self.offset}: {error}")
+
+    def readinto(self, buffer) -> int:
+        while not self._eof:
+            try:
+                if self._response is None:
+                    self._open()
+                read = self._response.raw.readinto(buffer)
+            except IsADirectoryError:
+                raise
+            except Exception as e:
+                self._fail(e)
+                continue
+
+            if read:
+                if self._sha256 is not None:
+                    self._sha256.update(memoryview(buffer)[:read])
+                self.offset += read
+                return read
+
+            if self.size is not None and self.offset < self.size:
+                self._fail(DownloadError(f"Gateway ended the stream at {self.offset} of {self.size} bytes"))
+                continue
+            self._eof = True
+        return 0
+
+    def finish(self) -> Optional[bool]:
+        """Read whatever the consumer left and check the CID.
+
+        Returns True if verified and None if the CID cannot be verified while
+        streaming. Raises CIDVerificationError on a mismatch.
+        """
+        buffer = bytearray(self.downloader.buffer_size)
+        while self.readinto(buffer):
+            pass
+        if self._sha256 is None:
+            return None
+        if self._sha256.digest() != self._digest:
+            raise CIDVerificationError(f"Streamed data does not match CID {self.cid}")
+        return True
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+        super().close()
@@ -0,0 +1,141 @@
+"""
+Batched on-chain job discovery for the legacy worker.
+
+Checking a job one view call at a time costs five or six sequential RPCs
+per job ID, and the worker used to repeat that from job 1 every cycle.
+JobScanner instead:
+
+- reads get_job_counter once per cycle and only looks at job IDs above the
+  highest one it has already seen,
+- fetches every view it needs for those jobs in one JSON-RPC batch request,
+- remembers the fixed fields of each job (creator, reward, asset CID,
+  minimum reputation) and afterwards only re-checks the worker assignment
+  and eligibility of jobs that are still unassigned,
+- forgets jobs once a worker has been assigned, since that never reverts.
+
+StarkNet has no standard multicall contract for views, so batching is done
+at the JSON-RPC level: a cycle is one request for the counter plus one batch
+per max_batch_size calls, rather than a round trip per view.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from starknet_py.hash.selector import get_selector_from_name
+
+# Views read once per job; their values never change after creation
+JOB_STATIC_VIEWS = ("get_job_creator", "get_job_reward", "get_job_asset_cid", "get_minimum_reputation_for_job")
+
+
+class JobScanner:
+    """Finds open jobs for one worker with batched view calls"""
+
+    def __init__(self, rpc_url: str, contract_address: int, worker_address: int, max_batch_size: int = 200):
+        self.rpc_url = rpc_url
+        self.contract_address = contract_address
+        self.worker_address = worker_address
+        self.max_batch_size = max_batch_size
+        self.highest_job_id = 0
+        # Jobs seen without a worker, with their fixed fields
+        self.open_jobs: Dict[int, Dict[str, Any]] = {}
+        self._session = requests.Session()  # Keep-alive between cycles
+        self._selectors: Dict[str, str] = {}
+
+    async def scan(self, skip_job_ids: Sequence[int] = ()) -> List[Dict[str, Any]]:
+        """Return jobs this worker could take, oldest first.
+
+        Each job is a dict with job_id, creator, reward, asset_cid_parts and
+        min_reputation. Jobs in ``skip_job_ids`` are not reported.
+        """
+        job_counter = (await self._batch([("get_job_counter", [])]))[0]
+        if job_counter is None:
+            raise RuntimeError("get_job_counter failed")
+        job_counter = job_counter[0]
+
+        new_job_ids = list(range(self.highest_job_id + 1, job_counter + 1))
+        if new_job_ids:
+            print(f"[Worker] Discovered jobs {new_job_ids[0]}-{new_job_ids[-1]}")
+
+        calls: List[Tuple[int, str, List[int]]] = []
+        for job_id in new_job_ids:
+            for view in JOB_STATIC_VIEWS:
+                calls.append((job_id, view, [job_id]))
+        for job_id in list(self.open_jobs) + new_job_ids:
+            calls.append((job_id, "get_job_worker", [job_id]))
+            calls.append((job_id, "is_worker_eligible", [self.worker_address, job_id]))
+
+        results: Dict[Tuple[int, str], Optional[List[int]]] = {}
+        for offset in range(0, len(calls), self.max_batch_size):
+            chunk = calls[offset:offset + self.max_batch_size]
+            replies = await self._batch([(view, calldata) for job_id, view, calldata in chunk])
+            for (job_id, view, calldata), reply in zip(chunk, replies):
+                results[(job_id, view)] = reply
+
+        for job_id in new_job_ids:
+            fields = [results.get((job_id, view)) for view in JOB_STATIC_VIEWS]
+            if None in fields:
+                break  # Picked up again from this job on the next cycle
+            self.highest_job_id = job_id
+            creator, reward, asset_cid, min_reputation = fields
+            if creator[0] != 0:
+                self.open_jobs[job_id] = {
+                    "job_id": job_id,
+                    "creator": creator[0],
+                    "reward": reward[0] + (reward[1] << 128),
+                    "asset_cid_parts": (asset_cid[0], asset_cid[1]),
+                    "min_reputation": min_reputation[0],
+                }
+
+        available = []
+        for job_id in sorted(self.open_jobs):
+            worker = results.get((job_id, "get_job_worker"))
+            if worker is None:
+                continue
+            if worker[0] != 0:
+                # Assignment is permanent; stop tracking the job
+                del self.open_jobs[job_id]
+                continue
+            eligible = results.get((job_id, "is_worker_eligible"))
+            if job_id in skip_job_ids or not eligible or not eligible[0]:
+                continue
+            available.append(self.open_jobs[job_id])
+
+        return available
+
+    async def _batch(self, calls: Sequence[Tuple[str, List[int]]]) -> List[Optional[List[int]]]:
+        """Run view calls as one JSON-RPC batch; a failed call yields None"""
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": index,
+                "method": "starknet_call",
+                "params": {
+                    "request": {
+                        "contract_address": hex(self.contract_address),
+                        "entry_point_selector": self._selector(view),
+                        "calldata": [hex(value) for value in calldata],
+                    },
+                    "block_id": "latest",
+                },
+            }
+            for index, (view, calldata) in enumerate(calls)
+        ]
+        response = await asyncio.to_thread(self._session.post, self.rpc_url, json=payload, timeout=30)
+        response.raise_for_status()
+        replies = response.json()
+        if isinstance(replies, dict):
+            raise RuntimeError(f"Batch request rejected: {replies.get('error', replies)}")
+
+        results: List[Optional[List[int]]] = [None] * len(calls)
+        for reply in replies:
+            if "result" in reply:
+                results[reply["id"]] = [int(felt, 16) for felt in reply["result"]]
+            else:
+                print(f"[Worker] {calls[reply['id']][0]} failed: {reply.get('error')}")
+        return results
+
+    def _selector(self, view: str) -> str:
+        if view not in self._selectors:
+            self._selectors[view] = hex(get_selector_from_name(view))
+        return self._selectors[view]
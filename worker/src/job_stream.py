@@ -0,0 +1,107 @@
+"""
+Push-based job dispatch for the API worker.
+
+Subscribes to the backend's /jobs/stream server-sent events and raises a flag
+whenever claimable work may have appeared, so the worker claims within
+milliseconds of a job opening instead of on its next poll. The stream only
+carries wake-ups; chunks are still claimed through POST /jobs/claim. While the
+stream is down the worker falls back to polling, and it reconnects with
+exponential backoff.
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+
+# Events that mean "try claiming now"
+WAKE_EVENTS = ("ready", "job_opened")
+
+
+class JobStream:
+    """A reconnecting SSE subscription to the backend's job stream"""
+
+    def __init__(
+        self,
+        url: str,
+        worker_address: str,
+        get_headers: Callable[[], Awaitable[Dict[str, str]]],
+        read_timeout: float = 60,
+        max_backoff: float = 60
+    ):
+        self.url = url
+        self.worker_address = worker_address
+        self.get_headers = get_headers
+        # The server sends keepalives well within this, so silence means a dead connection
+        self.read_timeout = read_timeout
+        self.max_backoff = max_backoff
+        self.work_available = asyncio.Event()
+        self.connected = False
+        self._backoff = 1.0
+
+    async def wait_for_work(self) -> None:
+        await self.work_available.wait()
+
+    async def run(self) -> None:
+        """Stay subscribed until cancelled"""
+        while True:
+            try:
+                await self._listen()
+                print("[Worker] Job stream closed by the backend, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Worker] Job stream unavailable ({e}), polling until it reconnects in {self._backoff:.0f}s")
+            finally:
+                self.connected = False
+
+            # Work may have opened while we were not listening
+            self.work_available.set()
+            await asyncio.sleep(self._backoff)
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    async def _listen(self) -> None:
+        headers = dict(await self.get_headers())
+        headers["Accept"] = "text/event-stream"
+        timeout = aiohttp.ClientTimeout(total=None, connect=10, sock_read=self.read_timeout)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(
+                self.url,
+                params={"worker_address": self.worker_address},
+                headers=headers
+            ) as response:
+                response.raise_for_status()
+                self.connected = True
+                self._backoff = 1.0
+                print(f"[Worker] Subscribed to job stream at {self.url}")
+
+                event_name: Optional[str] = None
+                data_lines: List[str] = []
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+                    if not line:
+                        # Blank line ends an event
+                        if event_name:
+                            self._dispatch(event_name, "\n".join(data_lines))
+                        event_name, data_lines = None, []
+                    elif line.startswith(":"):
+                        continue  # keepalive comment
+                    elif line.startswith("event:"):
+                        event_name = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data_lines.append(line[len("data:"):].strip())
+
+    def _dispatch(self, event_name: str, data: str) -> None:
+        if event_name not in WAKE_EVENTS:
+            return
+
+        if event_name == "job_opened":
+            try:
+                payload = json.loads(data) if data else {}
+            except ValueError:
+                payload = {}
+            print(f"[Worker] Pushed: job {payload.get('chain_job_id', '?')} has open work ({payload.get('reason', 'created')})")
+
+        self.work_available.set()
@@ -7,11 +7,14 @@ import shutil
 import requests
 import json
 import hashlib
-import tarfile
-import zipfile
 
 from dotenv import load_dotenv
 
+from blender_process import run_blender, print_blender_line
+from render_pool import RenderServerPool, RenderServerError
+from archive_stream import sniff_format, extract_stream, extract_tar_stream, extract_zip_file, SNIFF_SIZE
+from view_cache import ViewCache, MISSING
+
 # Load environment variables from .env file
 load_dotenv()
 print(os.getenv("STARKNET_RPC"))
@@ -19,6 +22,7 @@ print(os.getenv("STARKNET_RPC"))
 try:
     from starknet_py.net.full_node_client import FullNodeClient
     from starknet_py.contract import Contract
+    from job_discovery import JobScanner
     STARKNET_AVAILABLE = True
 except ImportError as e:
     print(f"[Worker] Failed to import starknet_py: {e}")
@@ -49,6 +53,18 @@ IPFS_GATEWAY = os.getenv("IPFS_GATEWAY", "http://127.0.0.1:8080/ipfs")
 # IPFS_GATEWAY = "http://127.0.0.1:8080/ipfs"
 # JOB_REGISTRY_ADDRESS = int("0x0000f133b188900619b3df297bb72e46cc82b246a030acd14c132c12a32beafa", 16)
 BLENDER_PATH = os.getenv("BLENDER_PATH", "blender")  # Path to Blender executable
+IPFS_STREAM_EXTRACT = os.getenv("IPFS_STREAM_EXTRACT", "true").lower() in ("true", "1", "yes")  # Extract while downloading
+USE_RENDER_SERVER = os.getenv("USE_RENDER_SERVER", "true").lower() in ("true", "1", "yes")  # Keep Blender warm between jobs
+RENDER_SERVER_MAX_JOBS = int(os.getenv("RENDER_SERVER_MAX_JOBS", "20"))
+JOB_DISCOVERY_MODE = os.getenv("JOB_DISCOVERY_MODE", "batch").lower()  # "batch" (JSON-RPC batches from the job counter) or "sequential"
+JOB_DISCOVERY_BATCH_SIZE = int(os.getenv("JOB_DISCOVERY_BATCH_SIZE", "200"))  # View calls per batch request
+VIEW_CACHE_TTL = float(os.getenv("VIEW_CACHE_TTL", "30"))  # Seconds worker status and eligibility are reused (0 = no caching)
+
+# Warm Blender process, started in main() when USE_RENDER_SERVER is enabled
+render_pool = None
+
+# Worker status and job eligibility, reused between polls
+view_cache = ViewCache(ttl=VIEW_CACHE_TTL)
 
 # Load the contract ABI with proper type definitions
 CONTRACT_ABI = [
@@ -196,6 +212,19 @@ async def download_blend_file(ipfs, cid, temp_dir):
         
         print(f"[Worker] Downloading .blend file from IPFS CID: {cid}")
         
+        # Stream the node's tar response straight into the extract directory
+        if IPFS_STREAM_EXTRACT:
+            try:
+                blend_file = await asyncio.to_thread(ipfs.stream_blend, cid, extract_dir)
+                if blend_file:
+                    shutil.move(blend_file, blend_path)
+                    print(f"[Worker] Streamed and extracted .blend file to: {blend_path}")
+                    await validate_blend_file(blend_path)
+                    return blend_path
+                print(f"[Worker] No .blend file in streamed content, retrying as a download")
+            except Exception as e:
+                print(f"[Worker] Streaming download failed: {e}, falling back to regular download")
+        
         # Download file from IPFS
         ipfs.get(cid, target=temp_dir)
         
@@ -274,89 +303,31 @@ async def extract_and_find_blend_file(file_path, extract_dir):
     try:
         print(f"[Worker] Attempting to extract archive: {file_path}")
         
-        # Check if it's a TAR file
-        if tarfile.is_tarfile(file_path):
+        # Sniff the format once instead of probing with is_tarfile/is_zipfile
+        with open(file_path, 'rb') as f:
+            file_type = sniff_format(f.read(SNIFF_SIZE))
+        
+        if file_type == "tar":
             print(f"[Worker] File is a TAR archive")
-            with tarfile.open(file_path, 'r:*') as tar:
-                # List contents before extracting
-                members = tar.getnames()
-                print(f"[Worker] TAR archive contents: {members}")
-                tar.extractall(path=extract_dir)
-                print(f"[Worker] Extracted TAR archive to: {extract_dir}")
+            # The .blend member is found while extracting, no directory walk needed
+            with open(file_path, 'rb') as f:
+                blend_file = extract_tar_stream(f, extract_dir)
+            print(f"[Worker] Extracted TAR archive to: {extract_dir}")
         
-        # Check if it's a ZIP file
-        elif zipfile.is_zipfile(file_path):
+        elif file_type == "zip":
             print(f"[Worker] File is a ZIP archive")
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                # List contents before extracting
-                members = zip_ref.namelist()
-                print(f"[Worker] ZIP archive contents: {members}")
-                zip_ref.extractall(extract_dir)
-                print(f"[Worker] Extracted ZIP archive to: {extract_dir}")
+            blend_file = extract_zip_file(file_path, extract_dir)
+            print(f"[Worker] Extracted ZIP archive to: {extract_dir}")
         
         else:
             print(f"[Worker] File is not a recognized archive format")
             return None
         
-        # List all files in the extracted directory for debugging
-        print(f"[Worker] Files in extract directory after extraction:")
-        for root, dirs, files in os.walk(extract_dir):
-            for file in files:
-                file_path_full = os.path.join(root, file)
-                file_size = os.path.getsize(file_path_full)
-                print(f"[Worker]   {file_path_full} ({file_size} bytes)")
-        
-        # Search for .blend files in the extracted directory
-        blend_files = []
-        all_files = []
-        for root, dirs, files in os.walk(extract_dir):
-            for file in files:
-                file_path_full = os.path.join(root, file)
-                all_files.append(file_path_full)
-                
-                if file.endswith('.blend'):
-                    blend_files.append(file_path_full)
-                    print(f"[Worker] Found .blend file: {file_path_full}")
-                # Also check for files that might be blend files without extension
-                elif file.lower() in ['copper', 'scene', 'default'] or 'blend' in file.lower():
-                    print(f"[Worker] Found potential blend file: {file_path_full}")
-                    # Check if it's actually a blend file by header
-                    try:
-                        with open(file_path_full, 'rb') as f:
-                            header = f.read(16)
-                            if header.startswith(b'BLENDER'):
-                                print(f"[Worker] Confirmed {file_path_full} is a blend file")
-                                blend_files.append(file_path_full)
-                    except:
-                        pass
-        
-        if blend_files:
-            # Return the first .blend file found
-            selected_blend = blend_files[0]
-            print(f"[Worker] Using .blend file: {selected_blend}")
-            return selected_blend
+        if blend_file:
+            print(f"[Worker] Using .blend file: {blend_file}")
         else:
             print(f"[Worker] No .blend files found in extracted archive")
-            print(f"[Worker] All extracted files: {all_files}")
-            
-            # If no .blend files found, try to use the largest file as it might be the blend file
-            if all_files:
-                largest_file = max(all_files, key=lambda f: os.path.getsize(f))
-                largest_size = os.path.getsize(largest_file)
-                print(f"[Worker] Trying largest file as potential blend file: {largest_file} ({largest_size} bytes)")
-                
-                # Check if it might be a blend file
-                try:
-                    with open(largest_file, 'rb') as f:
-                        header = f.read(16)
-                        print(f"[Worker] Largest file header: {header}")
-                        if header.startswith(b'BLENDER'):
-                            print(f"[Worker] Largest file is actually a blend file!")
-                            return largest_file
-                except:
-                    pass
-                    
-            return None
+        return blend_file
             
     except Exception as e:
         print(f"[Worker] Error extracting archive: {e}")
@@ -376,22 +347,16 @@ async def validate_downloaded_file(file_path, cid):
             print(f"[Worker] File header (hex): {header.hex()}")
             print(f"[Worker] File header (ascii): {header.decode('ascii', errors='ignore')}")
             
-        # Check if it's a valid Blender file (should start with "BLENDER")
-        if header.startswith(b'BLENDER'):
+        # Identify the format from the header alone, without re-reading the file
+        with open(file_path, 'rb') as f:
+            file_type = sniff_format(f.read(SNIFF_SIZE))
+        
+        if file_type == "blender":
             print(f"[Worker] File appears to be a valid Blender file")
             return "blender"
-        # Check if it's a TAR archive (common IPFS format)
-        elif tarfile.is_tarfile(file_path):
-            print(f"[Worker] File appears to be a TAR archive")
-            return "tar"
-        # Check if it's a ZIP archive
-        elif zipfile.is_zipfile(file_path):
-            print(f"[Worker] File appears to be a ZIP archive")
-            return "zip"
-        # Check for other common archive signatures
-        elif header.startswith(b'PK'):
-            print(f"[Worker] File appears to be a ZIP archive (PK signature)")
-            return "zip"
+        elif file_type in ("tar", "zip"):
+            print(f"[Worker] File appears to be a {file_type.upper()} archive")
+            return file_type
         else:
             print(f"[Worker] WARNING: File format not recognized!")
             print(f"[Worker] Header: {header}")
@@ -450,6 +415,29 @@ async def render_blend_file(blend_path, output_dir):
         file_size = os.path.getsize(blend_path)
         print(f"[Worker] Blend file size: {file_size} bytes")
         
+        # Render in the warm render server if one is running
+        if render_pool:
+            try:
+                response = await render_pool.render(
+                    blend_path,
+                    output_path,
+                    settings={
+                        "engine": "BLENDER_EEVEE",
+                        "resolution_x": 1920,
+                        "resolution_y": 1080,
+                        "resolution_percentage": 50,
+                        "file_format": "PNG",
+                    },
+                    timeout=300
+                )
+                if response.get("ok"):
+                    output_size = os.path.getsize(output_path)
+                    print(f"[Worker] Successfully rendered to: {output_path} (size: {output_size} bytes)")
+                    return output_path
+                print(f"[Worker] Render server {response.get('stage')} failed: {response.get('error')}, launching Blender directly")
+            except RenderServerError as e:
+                print(f"[Worker] Render server unavailable ({e}), launching Blender directly")
+        
         # Create a Python script to configure rendering settings
         python_script = f"""
 import bpy
@@ -490,21 +478,15 @@ bpy.ops.render.render(write_still=True)
         
         print(f"[Worker] Running Blender command: {' '.join(cmd)}")
         
-        # Run Blender
-        result = subprocess.run(
+        # Run Blender, streaming its output as it renders
+        result = await run_blender(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            timeout=300,  # 5 minute timeout
+            on_line=print_blender_line
         )
         
         print(f"[Worker] Blender return code: {result.returncode}")
         
-        if result.stdout:
-            print(f"[Worker] Blender stdout: {result.stdout}")
-        if result.stderr:
-            print(f"[Worker] Blender stderr: {result.stderr}")
-        
         if result.returncode == 0 and os.path.exists(output_path):
             output_size = os.path.getsize(output_path)
             print(f"[Worker] Successfully rendered to: {output_path} (size: {output_size} bytes)")
@@ -553,29 +535,28 @@ async def render_blend_file_fallback(blend_path, output_dir):
         
         print(f"[Worker] Running fallback Blender command: {' '.join(cmd)}")
         
-        # Run Blender
-        result = subprocess.run(
+        # Run Blender, streaming its output as it renders
+        result = await run_blender(
             cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            timeout=300,  # 5 minute timeout
+            on_line=print_blender_line
         )
         
         print(f"[Worker] Fallback Blender return code: {result.returncode}")
         
-        if result.stdout:
-            print(f"[Worker] Fallback Blender stdout: {result.stdout}")
-        if result.stderr:
-            print(f"[Worker] Fallback Blender stderr: {result.stderr}")
-        
         if result.returncode == 0 and os.path.exists(output_path):
             output_size = os.path.getsize(output_path)
             print(f"[Worker] Fallback render successful: {output_path} (size: {output_size} bytes)")
             return output_path
         else:
             print(f"[Worker] Fallback render also failed")
+            print(f"[Worker] stdout: {result.stdout[-500:]}")
+            print(f"[Worker] stderr: {result.stderr[-500:]}")
             return None
             
+    except subprocess.TimeoutExpired:
+        print(f"[Worker] Fallback Blender render timed out after 5 minutes")
+        return None
     except Exception as e:
         print(f"[Worker] Error during fallback rendering: {e}")
         return None
@@ -650,6 +631,10 @@ async def upload_render_result(ipfs, render_path):
 
 async def check_worker_registration(contract, worker_address):
     """Check if worker is registered and verified"""
+    cached = view_cache.get("get_worker_status", (worker_address,))
+    if cached is not MISSING:
+        return cached
+
     try:
         print(f"[Worker] Checking registration status for worker: {hex(worker_address)}")
         
@@ -671,13 +656,15 @@ async def check_worker_registration(contract, worker_address):
         
         print(f"[Worker] Status - Verified: {verified}, Reputation: {reputation}, Completed: {jobs_completed}, Failed: {jobs_failed}")
         
-        return {
+        status = {
             "verified": verified,
             "reputation": reputation,
             "jobs_completed": jobs_completed,
             "jobs_failed": jobs_failed,
             "registered": reputation > 0  # If reputation > 0, worker is registered
         }
+        view_cache.set("get_worker_status", (worker_address,), status)
+        return status
     except Exception as e:
         print(f"[Worker] Error checking worker registration: {e}")
         return {
@@ -730,12 +717,17 @@ async def register_worker_if_needed(contract, worker_address):
 
 async def check_job_eligibility(contract, worker_address, job_id):
     """Check if worker is eligible for a specific job"""
+    cached = view_cache.get("is_worker_eligible", (worker_address, job_id))
+    if cached is not MISSING:
+        return cached
+
     try:
         print(f"[Worker] Checking eligibility for job {job_id}")
         
         # Check worker eligibility
         eligibility_response = await contract.functions["is_worker_eligible"].call(worker_address, job_id)
         eligible = eligibility_response.eligible if hasattr(eligibility_response, 'eligible') else eligibility_response
+        view_cache.set("is_worker_eligible", (worker_address, job_id), bool(eligible))
         
         if not eligible:
             print(f"[Worker] Worker not eligible for job {job_id}")
@@ -760,8 +752,12 @@ async def check_job_eligibility(contract, worker_address, job_id):
         print(f"[Worker] Error checking job eligibility: {e}")
         return False
 
-async def check_for_jobs(contract, worker_address, max_job_id=5):
-    """Check for available jobs by iterating through job IDs with authorization checks"""
+async def check_for_jobs(contract, worker_address, max_job_id=5, scanner=None):
+    """Check for available jobs with authorization checks.
+
+    With a JobScanner, new and still-open jobs are read in batched requests;
+    otherwise job IDs 1..max_job_id are checked one view call at a time.
+    """
     available_jobs = []
 
     # Read completed jobs to avoid reprocessing
@@ -793,6 +789,32 @@ async def check_for_jobs(contract, worker_address, max_job_id=5):
 
     print(f"[Worker] Worker authorized - Reputation: {worker_status['reputation']}, Completed: {worker_status['jobs_completed']}, Failed: {worker_status['jobs_failed']}")
 
+    if scanner:
+        try:
+            open_jobs = await scanner.scan(skip_job_ids=completed_jobs)
+        except Exception as e:
+            print(f"[Worker] Error scanning for jobs: {e}")
+            return []
+
+        print(f"[Worker] Scanned up to job {scanner.highest_job_id}, {len(open_jobs)} open for this worker")
+        for job in open_jobs:
+            asset_cid = combine_cid_parts(*job["asset_cid_parts"])
+            if asset_cid == "QmCopper.blend":
+                print(f"[Worker] Skipping job {job['job_id']} with asset CID: {asset_cid}")
+                continue
+
+            available_jobs.append({
+                "job_id": job["job_id"],
+                "creator": hex(job["creator"]),
+                "reward": job["reward"],
+                "asset_cid": asset_cid,
+                "min_reputation": job["min_reputation"],
+            })
+            print(f"[Worker] Found available job {job['job_id']} with reward {job['reward']}, asset CID: {asset_cid}, min reputation: {job['min_reputation']}")
+            break  # Stop after finding the first available job
+
+        return available_jobs
+
     for job_id in range(1, max_job_id + 1):
         # Skip already completed jobs
         if job_id in completed_jobs:
@@ -1009,6 +1031,16 @@ class IPFSClient:
                 print(f"[Worker] IPFS Gateway download also failed: {e2}")
                 raise Exception(f"All download methods failed. API: {e}, Gateway: {e2}")
     
+    def stream_blend(self, cid, target):
+        """Download a CID from the node's API and extract the tar stream as it arrives"""
+        response = requests.post(f"{self.http_url}/api/v0/get", params={"arg": cid}, stream=True, timeout=30)
+        try:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return extract_stream(response.raw, target, cid)
+        finally:
+            response.close()
+    
     def add(self, file_path):
         """Upload file to IPFS"""
         if self.client:
@@ -1023,6 +1055,7 @@ class IPFSClient:
                 return {"Hash": result["Hash"]}
 
 async def main():
+    global render_pool
     print("[Worker] Starting Blender rendering worker...")
     print(f"[Worker] Blender path: {BLENDER_PATH}")
     
@@ -1034,7 +1067,7 @@ async def main():
     
     # Check if Blender is available
     try:
-        result = subprocess.run([BLENDER_PATH, "--version"], capture_output=True, text=True, timeout=10)
+        result = await run_blender([BLENDER_PATH, "--version"], timeout=10)
         if result.returncode == 0:
             version_line = result.stdout.split('\n')[0] if result.stdout else "Unknown version"
             print(f"[Worker] Blender found: {version_line}")
@@ -1048,6 +1081,15 @@ async def main():
         print("[Worker] No job registry address provided. Exiting.")
         return
     
+    if USE_RENDER_SERVER:
+        pool = RenderServerPool(BLENDER_PATH, size=1, max_jobs_per_server=RENDER_SERVER_MAX_JOBS)
+        try:
+            await pool.start()
+            render_pool = pool
+        except RenderServerError as e:
+            print(f"[Worker] Warning: {e}, rendering with one Blender process per job")
+            await pool.close()
+    
     try:
         # Initialize clients with better error handling
         print("[Worker] Initializing StarkNet client...")
@@ -1081,11 +1123,16 @@ async def main():
         except Exception as e:
             print(f"[Worker] Warning: Contract test failed: {e}")
         
+        scanner = None
+        if JOB_DISCOVERY_MODE == "batch":
+            scanner = JobScanner(STARKNET_RPC, JOB_REGISTRY_ADDRESS, worker_address, max_batch_size=JOB_DISCOVERY_BATCH_SIZE)
+            print("[Worker] Discovering jobs with batched view calls")
+        
         while True:
             try:
                 # Check for available jobs
                 print("[Worker] Polling for rendering jobs...")
-                jobs = await check_for_jobs(contract, worker_address)
+                jobs = await check_for_jobs(contract, worker_address, scanner=scanner)
                 
                 if jobs:
                     # Process the first available job
@@ -1104,6 +1151,9 @@ async def main():
                         
                         if success:
                             print(f"[Worker] Completed render job {job_id}")
+                            # Our reputation and the job's assignment change once this lands
+                            view_cache.invalidate("get_worker_status", worker_address)
+                            view_cache.invalidate("is_worker_eligible", worker_address, None)
                             # Notify frontend about completion
                             await notify_frontend(job_id, result_cid)
                         else:
@@ -1136,6 +1186,9 @@ async def main():
         import traceback
         print(f"[Worker] Full traceback:")
         traceback.print_exc()
+    finally:
+        if render_pool:
+            await render_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
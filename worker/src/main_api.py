@@ -9,9 +9,6 @@ import asyncio
 import subprocess
 import tempfile
 import json
-import shutil
-import tarfile
-import zipfile
 import requests
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -19,6 +16,14 @@ import time
 from datetime import datetime
 from dotenv import load_dotenv
 
+from blender_process import run_blender, print_blender_line
+from render_pool import RenderServerPool, RenderServerError
+from asset_cache import AssetCache
+from ipfs_downloader import ChunkedDownloader
+from archive_stream import extract_stream, extract_file
+from split_frame import BORDER_PADDING_PX, border_python_expr, chunk_border, stitch_tiles
+from job_stream import JobStream
+
 # Load environment variables
 load_dotenv()
 
@@ -38,8 +43,27 @@ WORKER_ADDRESS = os.getenv("WORKER_ADDRESS", "0x1234567890abcdef1234567890abcdef
 WORKER_PRIVATE_KEY = os.getenv("WORKER_PRIVATE_KEY", "")  # For signing authentication challenges
 IPFS_API = os.getenv("IPFS_API", "/ip4/127.0.0.1/tcp/5001")
 IPFS_GATEWAY = os.getenv("IPFS_GATEWAY", "http://127.0.0.1:8080/ipfs")
+# Extra gateways to download from in parallel (comma-separated, tried alongside IPFS_GATEWAY)
+IPFS_GATEWAYS = [IPFS_GATEWAY] + [g.strip() for g in os.getenv("IPFS_GATEWAYS", "").split(",") if g.strip() and g.strip() != IPFS_GATEWAY]
+IPFS_DOWNLOAD_CHUNK_MB = int(os.getenv("IPFS_DOWNLOAD_CHUNK_MB", "8"))  # Size of each range request
+IPFS_DOWNLOAD_BUFFER_KB = int(os.getenv("IPFS_DOWNLOAD_BUFFER_KB", "1024"))  # Socket read buffer
+IPFS_DOWNLOAD_PARALLEL = int(os.getenv("IPFS_DOWNLOAD_PARALLEL", "4"))  # Range requests in flight
+IPFS_DOWNLOAD_TIMEOUT = int(os.getenv("IPFS_DOWNLOAD_TIMEOUT", "60"))  # Per-request timeout (seconds)
+IPFS_STREAM_EXTRACT = os.getenv("IPFS_STREAM_EXTRACT", "true").lower() in ("true", "1", "yes")  # Extract while downloading, sequentially and verifying raw-codec CIDs only
+IPFS_VERIFY_CID = os.getenv("IPFS_VERIFY_CID", "true").lower() in ("true", "1", "yes")
 BLENDER_PATH = os.getenv("BLENDER_PATH", "blender")
 POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "10"))  # seconds
+USE_JOB_STREAM = os.getenv("USE_JOB_STREAM", "true").lower() in ("true", "1", "yes")  # Get new jobs pushed instead of polling
+JOB_STREAM_RECLAIM_INTERVAL = int(os.getenv("JOB_STREAM_RECLAIM_INTERVAL", "60"))  # Safety claim interval while subscribed
+JOB_STREAM_READ_TIMEOUT = int(os.getenv("JOB_STREAM_READ_TIMEOUT", "45"))  # Reconnect if the stream is silent this long
+LONG_POLL_WAIT = min(60, int(os.getenv("LONG_POLL_WAIT", "30")))  # Server-side wait on /jobs/available without the stream (0 = plain polling)
+MAX_CONCURRENT_JOBS = max(1, int(os.getenv("MAX_CONCURRENT_JOBS", "2")))  # Job slots in the pipeline
+MAX_CONCURRENT_RENDERS = max(1, int(os.getenv("MAX_CONCURRENT_RENDERS", "1")))  # Blender processes at once
+USE_RENDER_SERVER = os.getenv("USE_RENDER_SERVER", "true").lower() in ("true", "1", "yes")  # Keep Blender warm between jobs
+RENDER_SERVER_MAX_JOBS = int(os.getenv("RENDER_SERVER_MAX_JOBS", "20"))  # Recycle a render server after N jobs
+RENDER_SERVER_MAX_RSS_MB = float(os.getenv("RENDER_SERVER_MAX_RSS_MB", "0")) or None  # ...or when its memory exceeds this
+USE_ASSET_CACHE = os.getenv("USE_ASSET_CACHE", "true").lower() in ("true", "1", "yes")  # Reuse assets across jobs by CID
+ASSET_CACHE_MAX_GB = float(os.getenv("ASSET_CACHE_MAX_GB", "20"))
 USE_PERSISTENT_TEMP = os.getenv("USE_PERSISTENT_TEMP", "true").lower() in ("true", "1", "yes")  # Use ./temp or system temp
 
 # Ensure temp directory exists
@@ -49,6 +73,14 @@ TEMP_DIR.mkdir(exist_ok=True)
 # Track completed jobs to avoid reprocessing
 COMPLETED_JOBS_FILE = TEMP_DIR / "completed_jobs.json"
 
+ASSET_CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR", str(TEMP_DIR / "asset_cache")))
+
+# Warm Blender processes, started in main() when USE_RENDER_SERVER is enabled
+render_pool: Optional[RenderServerPool] = None
+
+# CID-keyed cache of downloaded assets, created in main() when USE_ASSET_CACHE is enabled
+asset_cache: Optional[AssetCache] = None
+
 
 class WorkerAuthenticator:
     """Handles worker authentication with the backend API"""
@@ -156,6 +188,17 @@ class IPFSClient:
                 self.http_url = "http://127.0.0.1:5001"
         else:
             self.http_url = api_endpoint
+        
+        # Parallel, resumable range downloads across the configured gateways
+        self.downloader = ChunkedDownloader(
+            IPFS_GATEWAYS,
+            chunk_size=IPFS_DOWNLOAD_CHUNK_MB * 1024 * 1024,
+            buffer_size=IPFS_DOWNLOAD_BUFFER_KB * 1024,
+            max_parallel=IPFS_DOWNLOAD_PARALLEL,
+            timeout=IPFS_DOWNLOAD_TIMEOUT,
+            ipfs_api_url=self.http_url,
+            verify=IPFS_VERIFY_CID
+        )
     
     def get(self, cid: str, target: str) -> Dict[str, str]:
         """Download file from IPFS"""
@@ -165,20 +208,11 @@ class IPFSClient:
             except Exception as e:
                 print(f"[Worker] ipfshttpclient.get failed: {e}, trying fallback methods")
         
-        # Try gateway first (returns raw file, not tar-wrapped)
+        # Try gateways first (returns raw file, not tar-wrapped)
         try:
-            print(f"[Worker] Downloading CID: {cid} via IPFS Gateway")
-            gateway_url = f"{IPFS_GATEWAY}/{cid}"
-            response = requests.get(gateway_url, stream=True, timeout=60)
-            response.raise_for_status()
-            
+            print(f"[Worker] Downloading CID: {cid} via IPFS Gateway(s)")
             file_path = os.path.join(target, cid)
-            total_size = 0
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        total_size += len(chunk)
+            total_size = self.downloader.download(cid, file_path)
             
             print(f"[Worker] Downloaded via gateway to: {file_path} ({total_size} bytes)")
             return {"Hash": cid}
@@ -193,14 +227,14 @@ class IPFSClient:
                     f"{self.http_url}/api/v0/get",
                     params={"arg": cid},
                     stream=True,
-                    timeout=60
+                    timeout=IPFS_DOWNLOAD_TIMEOUT
                 )
                 response.raise_for_status()
                 
                 file_path = os.path.join(target, cid)
                 total_size = 0
                 with open(file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
+                    for chunk in response.iter_content(chunk_size=IPFS_DOWNLOAD_BUFFER_KB * 1024):
                         if chunk:
                             f.write(chunk)
                             total_size += len(chunk)
@@ -212,6 +246,44 @@ class IPFSClient:
                 print(f"[Worker] IPFS API download also failed: {api_error}")
                 raise Exception(f"All download methods failed. Gateway: {gateway_error}, API: {api_error}")
     
+    def stream_blend(self, cid: str, target: str) -> Optional[str]:
+        """Download a CID from the gateways and extract it as it arrives.
+
+        The stream fails over between gateways like get() does, but reads
+        sequentially, and only raw-codec CIDs are verified. Returns the .blend
+        path, or None if the content has no .blend file.
+        """
+        with self.downloader.stream(cid) as stream:
+            blend_path = extract_stream(stream, target, cid)
+            if stream.finish():
+                print(f"[Worker] Verified stream against CID {cid}")
+            elif IPFS_VERIFY_CID:
+                print(f"[Worker] Warning: could not verify streamed {cid}; set IPFS_STREAM_EXTRACT=false to verify it after download")
+        return blend_path
+    
+    def fetch_file(self, cid: str, dest_path: str) -> None:
+        """Download a single file as raw bytes (never tar-wrapped)"""
+        try:
+            self.downloader.download(cid, dest_path)
+            return
+        except Exception as gateway_error:
+            print(f"[Worker] IPFS Gateway download failed: {gateway_error}, trying IPFS API")
+        
+        response = requests.post(
+            f"{self.http_url}/api/v0/cat",
+            params={"arg": cid},
+            stream=True,
+            timeout=IPFS_DOWNLOAD_TIMEOUT
+        )
+        try:
+            response.raise_for_status()
+            with open(dest_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=IPFS_DOWNLOAD_BUFFER_KB * 1024):
+                    if chunk:
+                        f.write(chunk)
+        finally:
+            response.close()
+    
     def add(self, file_path: str) -> Dict[str, str]:
         """Upload file to IPFS"""
         if self.client:
@@ -224,9 +296,59 @@ class IPFSClient:
                 response.raise_for_status()
                 result = response.json()
                 return {"Hash": result["Hash"]}
+    
+    def add_directory(self, dir_path: str) -> Dict[str, str]:
+        """Upload every file in a directory (e.g. the frames of a chunk) as one IPFS directory"""
+        if self.client:
+            results = self.client.add(dir_path, recursive=True)
+            # The directory itself is listed last
+            return {"Hash": results[-1]["Hash"]}
+        
+        # HTTP API fallback: wrap the files in a directory node
+        names = sorted(os.listdir(dir_path))
+        handles = [open(os.path.join(dir_path, name), 'rb') for name in names]
+        try:
+            files = [('file', (name, handle)) for name, handle in zip(names, handles)]
+            response = requests.post(
+                f"{self.http_url}/api/v0/add",
+                params={"wrap-with-directory": "true"},
+                files=files
+            )
+            response.raise_for_status()
+        finally:
+            for handle in handles:
+                handle.close()
+        
+        # One JSON object per added file, wrapping directory last
+        entries = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        return {"Hash": entries[-1]["Hash"]}
 
 
 async def download_blend_file(ipfs: IPFSClient, asset_cid: str, temp_dir: str) -> Optional[str]:
+    """Get the .blend file for a CID, from the asset cache or by downloading it"""
+    if not asset_cache:
+        return await fetch_blend_file(ipfs, asset_cid, temp_dir)
+    
+    # Jobs sharing a CID wait for the first download instead of repeating it
+    async with asset_cache.cid_lock(asset_cid):
+        cached_path = await asyncio.to_thread(asset_cache.checkout, asset_cid, temp_dir)
+        if cached_path:
+            print(f"[Worker] Asset cache hit for CID {asset_cid}: {cached_path}")
+            return cached_path
+        
+        blend_path = await fetch_blend_file(ipfs, asset_cid, temp_dir)
+        if blend_path:
+            # Don't keep the raw archive once it has been extracted
+            raw_download = os.path.join(temp_dir, asset_cid)
+            skip = {raw_download} if raw_download != blend_path else set()
+            try:
+                await asyncio.to_thread(asset_cache.store, asset_cid, temp_dir, blend_path, skip)
+            except Exception as e:
+                print(f"[Worker] Warning: Could not cache asset {asset_cid}: {e}")
+        return blend_path
+
+
+async def fetch_blend_file(ipfs: IPFSClient, asset_cid: str, temp_dir: str) -> Optional[str]:
     """Download and extract .blend file from IPFS"""
     try:
         # Validate CID format
@@ -242,8 +364,20 @@ async def download_blend_file(ipfs: IPFSClient, asset_cid: str, temp_dir: str) -
             print(f"[Worker] Please upload the file to IPFS and use the returned CID")
             return None
         
+        # Stream the asset from the gateways straight into the job directory
+        if IPFS_STREAM_EXTRACT:
+            try:
+                print(f"[Worker] Streaming asset CID: {asset_cid}")
+                blend_path = await asyncio.to_thread(ipfs.stream_blend, asset_cid, temp_dir)
+                if blend_path:
+                    print(f"[Worker] Found blend file: {blend_path}")
+                    return blend_path
+                print(f"[Worker] No .blend file in streamed content, retrying as a download")
+            except Exception as e:
+                print(f"[Worker] Streaming download failed: {e}, falling back to regular download")
+        
         print(f"[Worker] Downloading asset CID: {asset_cid}")
-        ipfs.get(asset_cid, temp_dir)
+        await asyncio.to_thread(ipfs.get, asset_cid, temp_dir)
         
         # The file is now in temp_dir with name = asset_cid
         downloaded_file = os.path.join(temp_dir, asset_cid)
@@ -252,64 +386,23 @@ async def download_blend_file(ipfs: IPFSClient, asset_cid: str, temp_dir: str) -
             print(f"[Worker] Error: Downloaded file not found at {downloaded_file}")
             return None
         
-        # Get file size to verify download
-        file_size = os.path.getsize(downloaded_file)
-        print(f"[Worker] Downloaded file size: {file_size} bytes")
-        
-        # Try to extract if it's an archive
-        extracted = False
-        
-        # Check if it's a tar archive
-        try:
-            if tarfile.is_tarfile(downloaded_file):
-                print(f"[Worker] Detected tar archive, extracting...")
-                try:
-                    with tarfile.open(downloaded_file, 'r:*') as tar:
-                        # List contents before extracting
-                        members = tar.getmembers()
-                        print(f"[Worker] Tar archive contains {len(members)} file(s)")
-                        
-                        # Extract all files
-                        tar.extractall(temp_dir)
-                        extracted = True
-                        print(f"[Worker] Successfully extracted tar archive")
-                except tarfile.ReadError as e:
-                    print(f"[Worker] Tar extraction failed: {e}")
-                    print(f"[Worker] File may be corrupted or not a complete tar archive")
-                    # Try to treat as raw file instead
-                    extracted = False
-        except Exception as e:
-            print(f"[Worker] Error checking tar file: {e}")
+        if os.path.isdir(downloaded_file):
+            # ipfshttpclient saves directory CIDs as a directory tree
+            blend_files = list(Path(downloaded_file).rglob("*.blend"))
+            blend_path = str(blend_files[0]) if blend_files else None
+        else:
+            # Get file size to verify download
+            file_size = os.path.getsize(downloaded_file)
+            print(f"[Worker] Downloaded file size: {file_size} bytes")
+            
+            # Sniff the format once and extract in a single pass
+            blend_path = await asyncio.to_thread(extract_file, downloaded_file, temp_dir)
         
-        # Check if it's a zip archive
-        if not extracted:
-            try:
-                if zipfile.is_zipfile(downloaded_file):
-                    print(f"[Worker] Detected zip archive, extracting...")
-                    with zipfile.ZipFile(downloaded_file, 'r') as zip_ref:
-                        zip_ref.extractall(temp_dir)
-                    extracted = True
-                    print(f"[Worker] Successfully extracted zip archive")
-            except Exception as e:
-                print(f"[Worker] Zip extraction failed: {e}")
-        
-        # If not an archive or extraction failed, treat as raw file
-        if not extracted:
-            print(f"[Worker] Treating as raw .blend file (not an archive)")
-            if not downloaded_file.endswith('.blend'):
-                blend_path = downloaded_file + '.blend'
-                shutil.move(downloaded_file, blend_path)
-                downloaded_file = blend_path
-                print(f"[Worker] Renamed to: {blend_path}")
-        
-        # Find the .blend file
-        blend_files = list(Path(temp_dir).rglob("*.blend"))
-        if not blend_files:
+        if not blend_path:
             print(f"[Worker] No .blend file found in downloaded content")
             print(f"[Worker] Files in temp dir: {list(Path(temp_dir).iterdir())}")
             return None
         
-        blend_path = str(blend_files[0])
         print(f"[Worker] Found blend file: {blend_path}")
         return blend_path
         
@@ -340,10 +433,8 @@ async def validate_blend_file(blend_path: str) -> bool:
         print(f"[Worker] Validating blend file: {blend_path}")
         
         # Try to open the file with Blender in background mode
-        result = subprocess.run(
+        result = await run_blender(
             [BLENDER_PATH, "-b", blend_path, "--python-expr", "import bpy; print('VALIDATION_SUCCESS')"],
-            capture_output=True,
-            text=True,
             timeout=30
         )
         
@@ -356,39 +447,57 @@ async def validate_blend_file(blend_path: str) -> bool:
             print(f"[Worker] stderr: {result.stderr}")
             return False
             
+    except subprocess.TimeoutExpired:
+        print(f"[Worker] Blend file validation timed out (30s)")
+        return False
     except Exception as e:
         print(f"[Worker] Error validating blend file: {e}")
         return False
 
 
-async def render_blend_file(blend_path: str, output_dir: str) -> Optional[str]:
-    """Render a .blend file using Blender"""
+async def render_blend_file(
+    blend_path: str,
+    output_dir: str,
+    frame_start: int = 1,
+    frame_end: int = 1,
+    border: Optional[Dict[str, float]] = None
+) -> Optional[str]:
+    """Render a .blend file using Blender
+
+    A single frame renders to one PNG; with ``border`` only that region of it
+    is rendered (split-frame jobs). A frame range is rendered by
+    render_frame_range and returns the directory holding the frames.
+    """
+    if frame_end > frame_start:
+        return await render_frame_range(blend_path, output_dir, frame_start, frame_end)
+    
     try:
         output_path = os.path.join(output_dir, "render.png")
         print(f"[Worker] Rendering blend file to: {output_path}")
         
         # Render using Blender's EEVEE engine for faster rendering
-        render_cmd = [
-            BLENDER_PATH,
-            "-b", blend_path,
+        render_cmd = [BLENDER_PATH, "-b", blend_path]
+        if border:
+            # Runs after the file loads, before -f starts the render
+            render_cmd += ["--python-expr", border_python_expr(border)]
+        render_cmd += [
             "-E", "BLENDER_EEVEE",
             "-o", output_path,
-            "-f", "1",  # Render frame 1
-            "-F", "PNG"
+            "-F", "PNG",
+            "-f", str(frame_start)
         ]
         
         print(f"[Worker] Executing: {' '.join(render_cmd)}")
-        result = subprocess.run(
+        result = await run_blender(
             render_cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            timeout=300,  # 5 minute timeout
+            on_line=print_blender_line
         )
         
         # Blender adds frame number to output in format: filename####.ext
         # So render.png becomes render.png0001.png
-        actual_output_with_ext = output_path + "0001.png"  # render.png0001.png
-        actual_output_no_ext = output_path.replace(".png", "0001.png")  # render0001.png
+        actual_output_with_ext = output_path + f"{frame_start:04d}.png"  # render.png0001.png
+        actual_output_no_ext = output_path.replace(".png", f"{frame_start:04d}.png")  # render0001.png
         
         # Check all possible output locations
         if os.path.exists(actual_output_with_ext):
@@ -420,11 +529,117 @@ async def render_blend_file(blend_path: str, output_dir: str) -> Optional[str]:
         return None
 
 
+async def render_frame_range(blend_path: str, output_dir: str, frame_start: int, frame_end: int) -> Optional[str]:
+    """Render a frame range in a single Blender run and return the frames directory"""
+    frames_dir = os.path.join(output_dir, "frames")
+    os.makedirs(frames_dir, exist_ok=True)
+    frame_count = frame_end - frame_start + 1
+    timeout = 300 * frame_count  # 5 minutes per frame
+    
+    try:
+        print(f"[Worker] Rendering frames {frame_start}-{frame_end} to: {frames_dir}")
+        
+        # Output, format and range must come before -a, which starts the render
+        render_cmd = [
+            BLENDER_PATH,
+            "-b", blend_path,
+            "-E", "BLENDER_EEVEE",
+            "-o", os.path.join(frames_dir, "frame_####"),
+            "-F", "PNG",
+            "-s", str(frame_start),
+            "-e", str(frame_end),
+            "-a"
+        ]
+        
+        print(f"[Worker] Executing: {' '.join(render_cmd)}")
+        result = await run_blender(render_cmd, timeout=timeout, on_line=print_blender_line)
+        
+        missing = [
+            frame for frame in range(frame_start, frame_end + 1)
+            if not os.path.exists(os.path.join(frames_dir, f"frame_{frame:04d}.png"))
+        ]
+        if missing:
+            print(f"[Worker] Render failed - {len(missing)}/{frame_count} frames missing (first: {missing[0]})")
+            print(f"[Worker] stdout: {result.stdout[-500:]}")
+            print(f"[Worker] stderr: {result.stderr[-500:]}")
+            return None
+        
+        print(f"[Worker] Render successful: {frame_count} frames in {frames_dir}")
+        return frames_dir
+        
+    except subprocess.TimeoutExpired:
+        print(f"[Worker] Render timeout exceeded ({timeout}s)")
+        return None
+    except Exception as e:
+        print(f"[Worker] Error rendering frames {frame_start}-{frame_end}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+async def render_in_server(
+    blend_path: str,
+    output_dir: str,
+    frame_start: int = 1,
+    frame_end: int = 1,
+    border: Optional[Dict[str, float]] = None
+) -> Optional[str]:
+    """Validate and render a .blend inside a warm render server.
+
+    Opening the file in the server doubles as validation, so a job costs no
+    Blender startup at all. Raises RenderServerError if the server itself
+    failed, so the caller can fall back to launching Blender directly.
+    """
+    frame_count = frame_end - frame_start + 1
+    timeout = 300 * frame_count  # 5 minutes per frame
+    if frame_count > 1:
+        frames_dir = os.path.join(output_dir, "frames")
+        os.makedirs(frames_dir, exist_ok=True)
+        output_path = os.path.join(frames_dir, "frame_####")
+    else:
+        output_path = os.path.join(output_dir, "render.png")
+    print(f"[Worker] Rendering {blend_path} (frames {frame_start}-{frame_end}) in warm render server")
+    
+    settings = {
+        "engine": "BLENDER_EEVEE",
+        "frame_start": frame_start,
+        "frame_end": frame_end,
+        "file_format": "PNG"
+    }
+    if border:
+        settings["border"] = border
+        settings["border_padding_px"] = BORDER_PADDING_PX
+    
+    try:
+        response = await render_pool.render(blend_path, output_path, settings=settings, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"[Worker] Render timeout exceeded ({timeout}s)")
+        return None
+    
+    if response.get("ok"):
+        if frame_count > 1:
+            print(f"[Worker] Render successful: {frame_count} frames in {frames_dir}")
+            return frames_dir
+        print(f"[Worker] Render successful: {response['output_path']}")
+        return response["output_path"]
+    
+    if response.get("stage") == "validate":
+        print(f"[Worker] Blend file validation failed: {response.get('error')}")
+    else:
+        print(f"[Worker] Render failed: {response.get('error')}")
+        if response.get("traceback"):
+            print(f"[Worker] {response['traceback']}")
+    return None
+
+
 async def upload_render_result(ipfs: IPFSClient, render_path: str) -> Optional[str]:
     """Upload rendered image to IPFS"""
     try:
         print(f"[Worker] Uploading render result to IPFS: {render_path}")
-        result = ipfs.add(render_path)
+        if os.path.isdir(render_path):
+            result = await asyncio.to_thread(ipfs.add_directory, render_path)
+        else:
+            result = await asyncio.to_thread(ipfs.add, render_path)
         cid = result["Hash"]
         print(f"[Worker] Upload successful. CID: {cid}")
         return cid
@@ -472,99 +687,138 @@ def save_completed_job2(job_id: str):
         print(f"[Worker] Error saving completed jobs: {e}")
 
 
-async def poll_available_jobs(auth: WorkerAuthenticator) -> List[Dict[str, Any]]:
-    """Poll the backend API for available jobs"""
+async def claim_jobs(auth: WorkerAuthenticator, limit: int) -> List[Dict[str, Any]]:
+    """Atomically claim up to ``limit`` eligible chunks from the backend.
+
+    The backend picks and assigns chunks in one statement, so there is no
+    separate poll-then-claim round trip and no lost race with other workers.
+    Each claimed chunk carries its job's asset CID.
+    """
     try:
         await auth.ensure_authenticated()
         
-        # Get available jobs from API
-        response = requests.get(
-            f"{auth.backend_url}/jobs/available",
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{auth.backend_url}/jobs/claim",
             headers=auth.get_headers(),
-            params={"status": "pending"}
+            json={"worker_address": auth.worker_address, "limit": limit}
         )
         response.raise_for_status()
         
-        jobs = response.json()
-        
-        # Filter out completed jobs
-        completed = load_completed_jobs()
-        available_jobs = [job for job in jobs if job["id"] not in completed]
+        chunks = response.json()
+        if chunks:
+            print(f"[Worker] Claimed {len(chunks)} chunk(s)")
         
-        if available_jobs:
-            print(f"[Worker] Found {len(available_jobs)} available jobs")
-        
-        return available_jobs
+        return chunks
         
     except Exception as e:
-        print(f"[Worker] Error polling jobs: {e}")
+        print(f"[Worker] Error claiming jobs: {e}")
         return []
 
 
-async def claim_job(auth: WorkerAuthenticator, job_id: str) -> bool:
-    """Claim a job by assigning it to this worker"""
+async def wait_for_available_jobs(auth: WorkerAuthenticator, wait: int) -> bool:
+    """Long-poll the backend until an eligible job opens or ``wait`` seconds pass.
+
+    Returns True if there is work to claim.
+    """
+    started = time.monotonic()
     try:
         await auth.ensure_authenticated()
         
-        response = requests.post(
-            f"{auth.backend_url}/jobs/{job_id}/assign",
+        response = await asyncio.to_thread(
+            requests.get,
+            f"{auth.backend_url}/jobs/available",
             headers=auth.get_headers(),
-            json={"worker_address": auth.worker_address}
+            params={"worker_address": auth.worker_address, "limit": 1, "wait": wait},
+            timeout=wait + 10
         )
         response.raise_for_status()
-        
-        print(f"[Worker] Successfully claimed job {job_id}")
-        return True
-        
+        found = bool(response.json())
     except Exception as e:
-        print(f"[Worker] Error claiming job {job_id}: {e}")
-        return False
+        print(f"[Worker] Error waiting for jobs: {e}")
+        found = False
+    
+    # An instant answer right after an empty claim means the backend lists
+    # work we can't take (or is failing); don't spin on it
+    if time.monotonic() - started < 1:
+        await asyncio.sleep(POLL_INTERVAL)
+    return found
+
 
+async def get_job_chunks(auth: WorkerAuthenticator, job_id: str) -> List[Dict[str, Any]]:
+    """Fetch every chunk of a job, with its status and result CID"""
+    await auth.ensure_authenticated()
+    
+    response = await asyncio.to_thread(
+        requests.get,
+        f"{auth.backend_url}/jobs/{job_id}/chunks",
+        headers=auth.get_headers()
+    )
+    response.raise_for_status()
+    return response.json()
 
-async def submit_job_completion(auth: WorkerAuthenticator, job_id: str, result_cid: str) -> bool:
-    """Submit completed job result to the backend using /jobs/{job_id}/complete endpoint"""
+
+async def submit_chunk_completion(
+    auth: WorkerAuthenticator,
+    job_id: str,
+    chunk: Dict[str, Any],
+    result_cid: str
+) -> bool:
+    """Submit the result of a frame chunk using /jobs/{job_id}/chunks/{chunk_index}/complete"""
     try:
         await auth.ensure_authenticated()
         
-        # Prepare payload according to JobCompletion schema
-        # Split CID if it's too long (StarkNet contract limitation)
-        result_cid_part1 = result_cid[:31] if len(result_cid) > 31 else result_cid
-        result_cid_part2 = result_cid[31:] if len(result_cid) > 31 else None
-        
         payload = {
-            "result_cid_part1": result_cid_part1,
-            "result_cid_part2": result_cid_part2,
+            "result_cid": result_cid,
             "quality_score": 100,  # Default quality score - could be enhanced with actual quality checks
             "worker_address": auth.worker_address
         }
         
-        print(f"[Worker] Submitting job completion to /jobs/{job_id}/complete")
+        chunk_index = chunk["chunk_index"]
+        print(f"[Worker] Submitting chunk completion to /jobs/{job_id}/chunks/{chunk_index}/complete")
         print(f"[Worker] Result CID: {result_cid}")
         
-        response = requests.post(
-            f"{auth.backend_url}/jobs/{job_id}/complete",
+        response = await asyncio.to_thread(
+            requests.post,
+            f"{auth.backend_url}/jobs/{job_id}/chunks/{chunk_index}/complete",
             headers=auth.get_headers(),
             json=payload
         )
         response.raise_for_status()
         
-        print(f"[Worker] Successfully submitted result for job {job_id}")
-        save_completed_job(job_id)
+        print(f"[Worker] Successfully submitted result for job {job_id} frames {chunk['frame_start']}-{chunk['frame_end']}")
+        save_completed_job(chunk["id"])
         return True
         
     except Exception as e:
-        print(f"[Worker] Error submitting job completion: {e}")
+        print(f"[Worker] Error submitting chunk completion: {e}")
         if hasattr(e, 'response') and hasattr(e.response, 'text'):
             print(f"[Worker] Response: {e.response.text}")
         return False
 
 
-async def process_render_job(ipfs: IPFSClient, job_id: str, asset_cid: str) -> Optional[str]:
-    """Process a complete rendering job: download .blend, render, upload result"""
+async def process_render_job(
+    ipfs: IPFSClient,
+    job_id: str,
+    asset_cid: str,
+    render_slots: Optional[asyncio.Semaphore] = None,
+    frame_start: int = 1,
+    frame_end: int = 1,
+    border: Optional[Dict[str, float]] = None,
+    chunk_index: int = 0
+) -> Optional[str]:
+    """Process a complete rendering job: download .blend, render, upload result
+
+    When ``render_slots`` is given, only the Blender stages hold a slot, so other
+    jobs can download or upload while this one renders. A frame range is
+    rendered in one Blender run and uploaded as a directory of frames; a
+    ``border`` renders one region of a split-frame job.
+    """
     # Use persistent temp directory or create temporary one based on config
     if USE_PERSISTENT_TEMP:
-        # Use persistent temp directory for debugging
-        job_temp_dir = TEMP_DIR / f"job_{job_id}"
+        # Use persistent temp directory for debugging; one per chunk, since
+        # several chunks of a job can run here at once
+        job_temp_dir = TEMP_DIR / f"job_{job_id}_chunk_{chunk_index}"
         job_temp_dir.mkdir(exist_ok=True)
         temp_dir = str(job_temp_dir)
         cleanup_temp = False
@@ -581,16 +835,32 @@ async def process_render_job(ipfs: IPFSClient, job_id: str, asset_cid: str) -> O
             print(f"[Worker] Failed to download blend file for job {job_id}")
             return None
         
-        # Validate the blend file before attempting to render
-        if not await validate_blend_file(blend_path):
-            print(f"[Worker] Blend file validation failed for job {job_id}")
-            return None
+        if render_slots is None:
+            render_slots = asyncio.Semaphore(1)
         
-        # Render the .blend file
-        render_path = await render_blend_file(blend_path, temp_dir)
-        if not render_path:
-            print(f"[Worker] Failed to render blend file for job {job_id}")
-            return None
+        async with render_slots:
+            render_path = None
+            used_server = False
+            
+            if render_pool:
+                try:
+                    render_path = await render_in_server(blend_path, temp_dir, frame_start, frame_end, border)
+                    used_server = True
+                except RenderServerError as e:
+                    print(f"[Worker] Render server unavailable ({e}), launching Blender directly")
+            
+            if not used_server:
+                # Validate the blend file before attempting to render
+                if not await validate_blend_file(blend_path):
+                    print(f"[Worker] Blend file validation failed for job {job_id}")
+                    return None
+                
+                # Render the .blend file
+                render_path = await render_blend_file(blend_path, temp_dir, frame_start, frame_end, border)
+            
+            if not render_path:
+                print(f"[Worker] Failed to render blend file for job {job_id}")
+                return None
         
         # Upload rendered result to IPFS
         result_cid = await upload_render_result(ipfs, render_path)
@@ -601,6 +871,9 @@ async def process_render_job(ipfs: IPFSClient, job_id: str, asset_cid: str) -> O
         print(f"[Worker] Job {job_id} rendering complete. Result CID: {result_cid}")
         return result_cid
         
+    except asyncio.CancelledError:
+        print(f"[Worker] Render job {job_id} cancelled")
+        raise
     except Exception as e:
         print(f"[Worker] Error processing render job {job_id}: {e}")
         import traceback
@@ -615,23 +888,196 @@ async def process_render_job(ipfs: IPFSClient, job_id: str, asset_cid: str) -> O
                 print(f"[Worker] Warning: Could not cleanup temp directory: {e}")
 
 
+async def stitch_job_tiles(auth: WorkerAuthenticator, ipfs: IPFSClient, job_id: str) -> Optional[str]:
+    """Assemble a split-frame job from its rendered regions and upload the frame.
+
+    Runs once the backend has handed out the job's stitch chunk, i.e. after
+    every region has a result CID.
+    """
+    temp_dir_obj = tempfile.TemporaryDirectory()
+    temp_dir = temp_dir_obj.name
+    
+    try:
+        chunks = await get_job_chunks(auth, job_id)
+        regions = [c for c in chunks if c.get("kind", "render") == "render"]
+        missing = [c["chunk_index"] for c in regions if not c.get("result_cid")]
+        if missing:
+            print(f"[Worker] Job {job_id} regions {missing} have no result yet, cannot stitch")
+            return None
+        
+        tiles = []
+        for region in regions:
+            tile_path = os.path.join(temp_dir, f"region_{region['chunk_index']}.png")
+            print(f"[Worker] Fetching region {region['chunk_index']} of job {job_id}: {region['result_cid']}")
+            await asyncio.to_thread(ipfs.fetch_file, region["result_cid"], tile_path)
+            tiles.append((tile_path, chunk_border(region)))
+        
+        output_path = os.path.join(temp_dir, "render.png")
+        await asyncio.to_thread(stitch_tiles, tiles, output_path)
+        print(f"[Worker] Stitched {len(tiles)} regions of job {job_id}")
+        
+        return await upload_render_result(ipfs, output_path)
+        
+    except asyncio.CancelledError:
+        print(f"[Worker] Stitching job {job_id} cancelled")
+        raise
+    except Exception as e:
+        print(f"[Worker] Error stitching job {job_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+    finally:
+        try:
+            temp_dir_obj.cleanup()
+        except Exception as e:
+            print(f"[Worker] Warning: Could not cleanup temp directory: {e}")
+
+
+async def run_job(
+    auth: WorkerAuthenticator,
+    ipfs: IPFSClient,
+    job_id: str,
+    chunk: Dict[str, Any],
+    asset_cid: str,
+    render_slots: asyncio.Semaphore
+) -> bool:
+    """Render (or stitch) a claimed chunk and submit its result. Runs as one pipeline slot."""
+    if chunk.get("kind") == "stitch":
+        frames = "stitch"
+        result_cid = await stitch_job_tiles(auth, ipfs, job_id)
+    else:
+        border = chunk_border(chunk) if chunk.get("border_min_x") is not None else None
+        frames = f"frames {chunk['frame_start']}-{chunk['frame_end']}"
+        if border:
+            frames += f" region {chunk['chunk_index']}"
+        result_cid = await process_render_job(
+            ipfs, job_id, asset_cid, render_slots,
+            frame_start=chunk["frame_start"],
+            frame_end=chunk["frame_end"],
+            border=border,
+            chunk_index=chunk["chunk_index"]
+        )
+    
+    if not result_cid:
+        print(f"[Worker] ✗ Failed to process job {job_id} {frames}")
+        return False
+    
+    # Submit the result
+    success = await submit_chunk_completion(auth, job_id, chunk, result_cid)
+    
+    if success:
+        print(f"[Worker] ✓ Successfully completed job {job_id} {frames}")
+    else:
+        print(f"[Worker] ✗ Failed to submit result for job {job_id} {frames}")
+    return success
+
+
+def get_job_asset_cid(job: Dict[str, Any]) -> str:
+    """Read the asset CID from a job payload, trying the known field names"""
+    return (
+        job.get("full_asset_cid") or 
+        job.get("asset_cid") or 
+        job.get("assetCid", "")
+    )
+
+
+async def fill_job_slots(
+    auth: WorkerAuthenticator,
+    ipfs: IPFSClient,
+    active_jobs: Dict[str, asyncio.Task],
+    render_slots: asyncio.Semaphore
+) -> int:
+    """Claim chunks until every free pipeline slot is busy.
+
+    Returns the number of chunks started.
+    """
+    free_slots = MAX_CONCURRENT_JOBS - len(active_jobs)
+    if free_slots <= 0:
+        return 0
+    
+    print(f"\n[Worker] [{datetime.now().strftime('%H:%M:%S')}] Claiming jobs ({len(active_jobs)}/{MAX_CONCURRENT_JOBS} slots busy)...")
+    chunks = await claim_jobs(auth, free_slots)
+    
+    for chunk in chunks:
+        job_id = chunk["job_id"]
+        asset_cid = get_job_asset_cid(chunk)
+        print(f"[Worker] Claimed job {job_id} frames {chunk['frame_start']}-{chunk['frame_end']} ({chunk.get('kind', 'render')}) - Asset CID: {asset_cid}")
+        
+        if not asset_cid and chunk.get("kind") != "stitch":
+            print(f"[Worker] No asset CID found for job {job_id}, chunk will fail")
+        
+        active_jobs[chunk["id"]] = asyncio.create_task(
+            run_job(auth, ipfs, job_id, chunk, asset_cid, render_slots),
+            name=f"job-{job_id}-chunk-{chunk['chunk_index']}"
+        )
+    
+    if not chunks:
+        print(f"[Worker] No available jobs")
+    
+    return len(chunks)
+
+
+async def wait_for_work(
+    auth: WorkerAuthenticator,
+    active_jobs: Dict[str, asyncio.Task],
+    job_stream: Optional[JobStream]
+) -> None:
+    """Sleep until a slot frees up, new work opens, or the poll interval passes.
+
+    While the job stream is connected, new jobs arrive as pushes and the
+    interval is only a safety net. Without it the worker long-polls
+    /jobs/available, or polls if LONG_POLL_WAIT is 0.
+    """
+    waiters = list(active_jobs.values())
+    wake = None
+    timeout = POLL_INTERVAL
+    if len(active_jobs) < MAX_CONCURRENT_JOBS:
+        if job_stream and job_stream.connected:
+            wake = asyncio.create_task(job_stream.wait_for_work())
+            timeout = JOB_STREAM_RECLAIM_INTERVAL
+        elif LONG_POLL_WAIT > 0:
+            wake = asyncio.create_task(wait_for_available_jobs(auth, LONG_POLL_WAIT))
+            timeout = LONG_POLL_WAIT + POLL_INTERVAL
+        if wake:
+            waiters.append(wake)
+    
+    try:
+        if waiters:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(timeout)
+    finally:
+        if wake and not wake.done():
+            wake.cancel()
+
+
+def reap_finished_jobs(active_jobs: Dict[str, asyncio.Task]) -> None:
+    """Drop finished jobs from the pipeline and report unexpected errors"""
+    for chunk_id, task in list(active_jobs.items()):
+        if not task.done():
+            continue
+        del active_jobs[chunk_id]
+        if task.cancelled():
+            continue
+        error = task.exception()
+        if error:
+            print(f"[Worker] {task.get_name()} failed with unexpected error: {error}")
+
+
 async def main():
     """Main worker loop"""
+    global render_pool, asset_cache
     print("[Worker] Starting FluxFrame Worker (API-based)")
     print(f"[Worker] Backend API: {BACKEND_API_URL}")
     print(f"[Worker] Worker Address: {WORKER_ADDRESS}")
     print(f"[Worker] Blender path: {BLENDER_PATH}")
     print(f"[Worker] IPFS API: {IPFS_API}")
     print(f"[Worker] Temp directory: {'./temp (persistent)' if USE_PERSISTENT_TEMP else 'system temp (auto-cleanup)'}")
+    print(f"[Worker] Job slots: {MAX_CONCURRENT_JOBS}, render slots: {MAX_CONCURRENT_RENDERS}")
     
     # Check if Blender is available
     try:
-        result = subprocess.run(
-            [BLENDER_PATH, "--version"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        result = await run_blender([BLENDER_PATH, "--version"], timeout=10)
         if result.returncode == 0:
             version_line = result.stdout.split('\n')[0] if result.stdout else "Unknown version"
             print(f"[Worker] Blender found: {version_line}")
@@ -651,64 +1097,88 @@ async def main():
         print("[Worker] Failed to authenticate with backend. Exiting.")
         return
     
-    print(f"[Worker] Starting job polling loop (interval: {POLL_INTERVAL}s)")
+    if USE_ASSET_CACHE:
+        try:
+            asset_cache = AssetCache(str(ASSET_CACHE_DIR), int(ASSET_CACHE_MAX_GB * 1024**3))
+        except OSError as e:
+            print(f"[Worker] Warning: Asset cache disabled: {e}")
+    
+    # Start warm Blender render servers, one per render slot
+    if USE_RENDER_SERVER:
+        pool = RenderServerPool(
+            BLENDER_PATH,
+            size=MAX_CONCURRENT_RENDERS,
+            max_jobs_per_server=RENDER_SERVER_MAX_JOBS,
+            max_rss_mb=RENDER_SERVER_MAX_RSS_MB
+        )
+        try:
+            await pool.start()
+            render_pool = pool
+        except RenderServerError as e:
+            print(f"[Worker] Warning: {e}")
+            print("[Worker] Falling back to one Blender process per render")
+            await pool.close()
+    
+    # Subscribe to pushed job notifications; polling covers any gaps
+    job_stream: Optional[JobStream] = None
+    job_stream_task: Optional[asyncio.Task] = None
+    if USE_JOB_STREAM:
+        async def stream_headers() -> Dict[str, str]:
+            await auth.ensure_authenticated()
+            return auth.get_headers()
+        
+        job_stream = JobStream(
+            f"{BACKEND_API_URL}/jobs/stream",
+            WORKER_ADDRESS,
+            stream_headers,
+            read_timeout=JOB_STREAM_READ_TIMEOUT
+        )
+        job_stream_task = asyncio.create_task(job_stream.run(), name="job-stream")
+    
+    fallback = f"long poll {LONG_POLL_WAIT}s" if LONG_POLL_WAIT > 0 else f"poll every {POLL_INTERVAL}s"
+    if USE_JOB_STREAM:
+        print(f"[Worker] Starting job loop (push, safety claim every {JOB_STREAM_RECLAIM_INTERVAL}s, {fallback} when disconnected)")
+    else:
+        print(f"[Worker] Starting job loop ({fallback})")
+    
+    # Frame chunks currently in the pipeline, keyed by chunk ID
+    active_jobs: Dict[str, asyncio.Task] = {}
+    render_slots = asyncio.Semaphore(MAX_CONCURRENT_RENDERS)
     
     # Main polling loop
-    while True:
-        try:
-            # Poll for available jobs
-            print(f"\n[Worker] [{datetime.now().strftime('%H:%M:%S')}] Polling for jobs...")
-            jobs = await poll_available_jobs(auth)
-            
-            if jobs:
-                # Process the first available job
-                job = jobs[0]
-                job_id = job["id"]
-                # Try different field names for asset CID
-                asset_cid = (
-                    job.get("full_asset_cid") or 
-                    job.get("asset_cid") or 
-                    job.get("assetCid", "")
-                )
-                
-                print(f"[Worker] Found job {job_id} - Asset CID: {asset_cid}")
-                
-                if not asset_cid:
-                    print(f"[Worker] No asset CID found for job {job_id}, skipping")
-                    continue
+    try:
+        while True:
+            try:
+                reap_finished_jobs(active_jobs)
+                # Pushes that arrive while we claim trigger another round
+                if job_stream:
+                    job_stream.work_available.clear()
+                started = await fill_job_slots(auth, ipfs, active_jobs, render_slots)
                 
-                # Claim the job
-                if not await claim_job(auth, job_id):
-                    print(f"[Worker] Failed to claim job {job_id}, trying next job")
+                # Claim again right away if we filled slots and still have room,
+                # otherwise wait for a slot, a push or the poll interval
+                if started and len(active_jobs) < MAX_CONCURRENT_JOBS:
                     continue
                 
-                # Process the rendering job
-                result_cid = await process_render_job(ipfs, job_id, asset_cid)
+                await wait_for_work(auth, active_jobs, job_stream)
                 
-                if result_cid:
-                    # Submit the result
-                    success = await submit_job_completion(auth, job_id, result_cid)
-                    
-                    if success:
-                        print(f"[Worker] ✓ Successfully completed job {job_id}")
-                    else:
-                        print(f"[Worker] ✗ Failed to submit result for job {job_id}")
-                else:
-                    print(f"[Worker] ✗ Failed to process job {job_id}")
-            else:
-                print(f"[Worker] No available jobs")
-            
-            # Wait before next polling cycle
-            await asyncio.sleep(POLL_INTERVAL)
-            
-        except KeyboardInterrupt:
-            print("\n[Worker] Shutting down...")
-            break
-        except Exception as e:
-            print(f"[Worker] Error in main loop: {e}")
-            import traceback
-            traceback.print_exc()
-            await asyncio.sleep(POLL_INTERVAL)
+            except Exception as e:
+                print(f"[Worker] Error in main loop: {e}")
+                import traceback
+                traceback.print_exc()
+                await asyncio.sleep(POLL_INTERVAL)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\n[Worker] Shutting down...")
+    finally:
+        if job_stream_task:
+            job_stream_task.cancel()
+            await asyncio.gather(job_stream_task, return_exceptions=True)
+        for task in active_jobs.values():
+            task.cancel()
+        if active_jobs:
+            await asyncio.gather(*active_jobs.values(), return_exceptions=True)
+        if render_pool:
+            await render_pool.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,297 @@
+"""
+Pool of long-lived Blender processes for the workers.
+
+Each RenderServer runs render_server_bpy.py inside a warm Blender interpreter
+and talks to it over stdin/stdout (one JSON line per request/response). The
+RenderServerPool hands servers out to jobs and recycles a server after it has
+served a number of jobs or when its resident memory grows past a limit.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from blender_process import STREAM_LIMIT, print_blender_line
+
+SERVER_SCRIPT = str(Path(__file__).parent / "render_server_bpy.py")
+RESPONSE_MARKER = "@@FLUXFRAME_RENDER_SERVER@@"
+
+
+class RenderServerError(Exception):
+    """The render server crashed or broke the protocol (not a problem with the .blend)"""
+
+
+def read_process_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process in MiB, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class RenderServer:
+    """A single warm Blender process driven over a pipe protocol"""
+
+    def __init__(self, blender_path: str, server_id: int):
+        self.blender_path = blender_path
+        self.server_id = server_id
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.jobs_served = 0
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ready: Optional[asyncio.Future] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    def rss_mb(self) -> Optional[float]:
+        if not self.is_alive:
+            return None
+        return read_process_rss_mb(self.process.pid)
+
+    async def start(self, timeout: float = 60) -> None:
+        """Launch Blender and wait until the server script reports ready"""
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self.process = await asyncio.create_subprocess_exec(
+            self.blender_path, "-b", "--python", SERVER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=STREAM_LIMIT
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+
+        try:
+            ready = await asyncio.wait_for(self._ready, timeout=timeout)
+        except (asyncio.TimeoutError, RenderServerError) as e:
+            await self.kill()
+            raise RenderServerError(f"Render server {self.server_id} failed to start: {e}")
+
+        print(f"[Worker] Render server {self.server_id} ready (pid {self.process.pid}, Blender {ready.get('version')})")
+
+    async def _read_loop(self) -> None:
+        """Route protocol responses to waiting requests and echo Blender's log"""
+        try:
+            async for raw in self.process.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                marker_at = line.find(RESPONSE_MARKER)
+                if marker_at < 0:
+                    print_blender_line(line)
+                    continue
+
+                if marker_at > 0:
+                    print_blender_line(line[:marker_at])
+
+                try:
+                    response = json.loads(line[marker_at + len(RESPONSE_MARKER):])
+                except ValueError:
+                    print(f"[Worker] Render server {self.server_id} sent a malformed response")
+                    continue
+
+                if response.get("op") == "ready":
+                    if not self._ready.done():
+                        self._ready.set_result(response)
+                    continue
+
+                future = self._pending.pop(response.get("id"), None)
+                if future and not future.done():
+                    future.set_result(response)
+        finally:
+            # Blender exited; fail everything still waiting on it
+            error = RenderServerError(f"Render server {self.server_id} exited")
+            if self._ready and not self._ready.done():
+                self._ready.set_exception(error)
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one request and wait for its response.
+
+        Raises ``subprocess.TimeoutExpired`` (after killing Blender) on timeout and
+        ``RenderServerError`` if the process dies mid-request.
+        """
+        async with self._lock:
+            if not self.is_alive:
+                raise RenderServerError(f"Render server {self.server_id} is not running")
+
+            request_id = next(self._request_ids)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+
+            try:
+                self.process.stdin.write((json.dumps({**payload, "id": request_id}) + "\n").encode("utf-8"))
+                await self.process.stdin.drain()
+                return await asyncio.wait_for(future, timeout=timeout)
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise RenderServerError(f"Render server {self.server_id} pipe closed: {e}")
+            except asyncio.TimeoutError:
+                await self.kill()
+                raise subprocess.TimeoutExpired(payload.get("op", "request"), timeout)
+            except asyncio.CancelledError:
+                # Blender may still be rendering the cancelled job; don't reuse it
+                await self.kill()
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+
+    async def kill(self) -> None:
+        if self.is_alive:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                print(f"[Worker] Warning: render server {self.server_id} did not exit after kill")
+        if self._reader is not None:
+            self._reader.cancel()
+
+    async def stop(self) -> None:
+        """Ask Blender to exit cleanly, killing it if it does not"""
+        if self.is_alive:
+            try:
+                await self.request({"op": "shutdown"}, timeout=10)
+            except Exception:
+                pass
+        await self.kill()
+
+
+class RenderServerPool:
+    """Hands warm Blender render servers to jobs and recycles them"""
+
+    def __init__(
+        self,
+        blender_path: str,
+        size: int = 1,
+        max_jobs_per_server: int = 20,
+        max_rss_mb: Optional[float] = None,
+        startup_timeout: float = 60
+    ):
+        self.blender_path = blender_path
+        self.size = size
+        self.max_jobs_per_server = max_jobs_per_server
+        self.max_rss_mb = max_rss_mb
+        self.startup_timeout = startup_timeout
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._server_ids = itertools.count(1)
+        self._replacements: set = set()
+        self._closed = False
+
+    async def start(self) -> None:
+        """Start every server up front so the first jobs find them warm"""
+        servers = [self._new_server() for _ in range(self.size)]
+        results = await asyncio.gather(
+            *(server.start(self.startup_timeout) for server in servers),
+            return_exceptions=True
+        )
+        failures = [r for r in results if isinstance(r, Exception)]
+        if len(failures) == len(servers):
+            raise RenderServerError(f"No render server could be started: {failures[0]}")
+
+        for server, result in zip(servers, results):
+            if isinstance(result, Exception):
+                print(f"[Worker] {result}")
+                # Try again lazily on first use
+            self._idle.put_nowait(server)
+
+    def _new_server(self) -> RenderServer:
+        return RenderServer(self.blender_path, next(self._server_ids))
+
+    def _needs_recycle(self, server: RenderServer) -> Optional[str]:
+        if not server.is_alive:
+            return "process exited"
+        if server.jobs_served >= self.max_jobs_per_server:
+            return f"served {server.jobs_served} jobs"
+        if self.max_rss_mb:
+            rss = server.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                return f"memory {rss:.0f} MiB > {self.max_rss_mb:.0f} MiB"
+        return None
+
+    async def _replace(self, server: RenderServer, reason: str) -> None:
+        """Retire a server and put a freshly started one back in the pool.
+
+        A server always goes back, even if this fails; render() restarts a
+        dead one on its next use, so the slot is never lost.
+        """
+        print(f"[Worker] Recycling render server {server.server_id} ({reason})")
+        replacement = self._new_server()
+        try:
+            await server.stop()
+            await replacement.start(self.startup_timeout)
+        except Exception as e:
+            print(f"[Worker] Could not replace render server {server.server_id}: {e}")
+        finally:
+            if self._closed:
+                await replacement.kill()
+            else:
+                self._idle.put_nowait(replacement)
+
+    def _release(self, server: RenderServer) -> None:
+        reason = self._needs_recycle(server)
+        if reason is None:
+            self._idle.put_nowait(server)
+            return
+        # Start the replacement in the background so the caller isn't delayed
+        task = asyncio.create_task(self._replace(server, reason))
+        self._replacements.add(task)
+        task.add_done_callback(self._replacements.discard)
+
+    async def render(
+        self,
+        blend_path: str,
+        output_path: str,
+        settings: Optional[Dict[str, Any]] = None,
+        timeout: float = 300
+    ) -> Dict[str, Any]:
+        """Open, validate and render a .blend in a warm server.
+
+        Returns the server's response: ``{"ok": bool, "stage": "validate" | "render",
+        "output_path": ..., "error": ...}``. Raises ``RenderServerError`` when the
+        server itself failed, so the caller can fall back to a cold Blender run.
+        """
+        if self._closed:
+            raise RenderServerError("Render server pool is closed")
+
+        server = await self._idle.get()
+        try:
+            if not server.is_alive:
+                await server.start(self.startup_timeout)
+
+            response = await server.request(
+                {
+                    "op": "render",
+                    "blend_path": os.path.abspath(blend_path),
+                    "output_path": os.path.abspath(output_path),
+                    "settings": settings or {}
+                },
+                timeout=timeout
+            )
+            server.jobs_served += 1
+            return response
+        finally:
+            self._release(server)
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._replacements):
+            task.cancel()
+        while not self._idle.empty():
+            server = self._idle.get_nowait()
+            await server.stop()
@@ -0,0 +1,150 @@
+"""
+FluxFrame render server - runs INSIDE Blender.
+
+Started by render_pool.py as:
+
+    blender -b --python render_server_bpy.py
+
+Reads one JSON request per line from stdin and answers with one JSON line on
+stdout, prefixed with RESPONSE_MARKER so it can be told apart from Blender's
+own log output. Keeps the interpreter warm between jobs so each .blend is
+opened, validated and rendered without paying Blender's startup cost again.
+
+Requests:
+    {"id": 1, "op": "ping"}
+    {"id": 2, "op": "render", "blend_path": "...", "output_path": "...",
+     "settings": {"engine": "BLENDER_EEVEE", "frame_start": 1, "frame_end": 1}}
+    {"id": 3, "op": "shutdown"}
+
+A frame range renders as an animation; output_path is then a pattern such as
+".../frame_####" and the response lists every frame written. A "border"
+setting ({"min_x", "max_x", "min_y", "max_y"}) renders one region of a
+split-frame job.
+"""
+
+import json
+import os
+import sys
+import traceback
+
+import bpy
+
+RESPONSE_MARKER = "@@FLUXFRAME_RENDER_SERVER@@"
+
+
+def send(response):
+    sys.stdout.write(RESPONSE_MARKER + json.dumps(response) + "\n")
+    sys.stdout.flush()
+
+
+def apply_settings(scene, settings):
+    """Apply the render settings a job asks for to the loaded scene"""
+    render = scene.render
+
+    if settings.get("engine"):
+        render.engine = settings["engine"]
+    if settings.get("resolution_x"):
+        render.resolution_x = int(settings["resolution_x"])
+    if settings.get("resolution_y"):
+        render.resolution_y = int(settings["resolution_y"])
+    if settings.get("resolution_percentage"):
+        render.resolution_percentage = int(settings["resolution_percentage"])
+
+    render.image_settings.file_format = settings.get("file_format", "PNG")
+
+    border = settings.get("border")
+    if border:
+        # Split-frame region: render only the border, at full frame size, with
+        # a few pixels of overlap so the stitched edges have no gaps
+        scale = render.resolution_percentage / 100
+        padding = settings.get("border_padding_px", 0)
+        pad_x = padding / (render.resolution_x * scale)
+        pad_y = padding / (render.resolution_y * scale)
+        render.use_border = True
+        render.use_crop_to_border = False
+        render.border_min_x = max(0.0, border["min_x"] - pad_x)
+        render.border_max_x = min(1.0, border["max_x"] + pad_x)
+        render.border_min_y = max(0.0, border["min_y"] - pad_y)
+        render.border_max_y = min(1.0, border["max_y"] + pad_y)
+
+    frame_start = int(settings.get("frame_start", settings.get("frame", 1)))
+    frame_end = int(settings.get("frame_end", frame_start))
+    scene.frame_start = frame_start
+    scene.frame_end = frame_end
+    scene.frame_set(frame_start)
+    return frame_start, frame_end
+
+
+def handle_render(request):
+    blend_path = request["blend_path"]
+    output_path = request["output_path"]
+    settings = request.get("settings") or {}
+
+    # Opening the file is the validation step
+    try:
+        bpy.ops.wm.open_mainfile(filepath=blend_path, load_ui=False)
+    except Exception as e:
+        return {"ok": False, "stage": "validate", "error": str(e)}
+
+    try:
+        scene = bpy.context.scene
+        frame_start, frame_end = apply_settings(scene, settings)
+        scene.render.filepath = output_path
+        if frame_end > frame_start:
+            # The whole range in one call, like blender -s/-e/-a
+            bpy.ops.render.render(animation=True)
+            output_paths = [scene.render.frame_path(frame=frame) for frame in range(frame_start, frame_end + 1)]
+        else:
+            bpy.ops.render.render(write_still=True)
+            output_paths = [output_path]
+    except Exception as e:
+        return {
+            "ok": False,
+            "stage": "render",
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }
+    finally:
+        # Drop the scene so the next job starts from a clean, small heap
+        try:
+            bpy.ops.wm.read_homefile(use_empty=True)
+        except Exception:
+            pass
+
+    missing = [path for path in output_paths if not os.path.exists(path)]
+    if missing:
+        return {"ok": False, "stage": "render", "error": f"Output not written: {missing[0]}"}
+
+    return {"ok": True, "stage": "render", "output_path": output_path, "output_paths": output_paths}
+
+
+def main():
+    send({"id": None, "ok": True, "op": "ready", "version": bpy.app.version_string})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            send({"id": None, "ok": False, "error": f"Invalid request: {e}"})
+            continue
+
+        op = request.get("op")
+        if op == "ping":
+            response = {"ok": True}
+        elif op == "render":
+            response = handle_render(request)
+        elif op == "shutdown":
+            send({"id": request.get("id"), "ok": True})
+            break
+        else:
+            response = {"ok": False, "error": f"Unknown op: {op}"}
+
+        response["id"] = request.get("id")
+        send(response)
+
+
+main()
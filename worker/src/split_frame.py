@@ -0,0 +1,86 @@
+"""
+Region rendering and stitching for split-frame jobs.
+
+A high-resolution still is divided by the backend into border regions that
+different workers render. Each region is rendered with Blender's render
+border and without cropping, so every tile image has the full frame size
+with only its region filled in. Regions are rendered with a few pixels of overlap; the
+stitcher pastes each tile's exact (non-overlapping) box, so rounding at the
+region edges never leaves a gap.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image
+
+# Extra pixels rendered on every side of a region
+BORDER_PADDING_PX = 2
+
+
+def chunk_border(chunk: Dict[str, Any]) -> Dict[str, float]:
+    """Read a chunk's border region from the backend's chunk payload"""
+    return {
+        "min_x": chunk["border_min_x"],
+        "max_x": chunk["border_max_x"],
+        "min_y": chunk["border_min_y"],
+        "max_y": chunk["border_max_y"]
+    }
+
+
+def border_python_expr(border: Dict[str, float]) -> str:
+    """Python for ``blender --python-expr`` that limits the render to a region.
+
+    Must run after the .blend is loaded and before the render starts.
+    """
+    return "\n".join([
+        "import bpy",
+        "render = bpy.context.scene.render",
+        "scale = render.resolution_percentage / 100",
+        f"pad_x = {BORDER_PADDING_PX} / (render.resolution_x * scale)",
+        f"pad_y = {BORDER_PADDING_PX} / (render.resolution_y * scale)",
+        "render.use_border = True",
+        "render.use_crop_to_border = False",
+        f"render.border_min_x = max(0.0, {border['min_x']} - pad_x)",
+        f"render.border_max_x = min(1.0, {border['max_x']} + pad_x)",
+        f"render.border_min_y = max(0.0, {border['min_y']} - pad_y)",
+        f"render.border_max_y = min(1.0, {border['max_y']} + pad_y)",
+    ])
+
+
+def region_box(border: Dict[str, float], width: int, height: int) -> Tuple[int, int, int, int]:
+    """Pixel box (left, top, right, bottom) of a border region.
+
+    Blender measures borders from the bottom left; images are addressed from
+    the top left.
+    """
+    return (
+        round(border["min_x"] * width),
+        height - round(border["max_y"] * height),
+        round(border["max_x"] * width),
+        height - round(border["min_y"] * height)
+    )
+
+
+def stitch_tiles(tiles: List[Tuple[str, Dict[str, float]]], output_path: str) -> str:
+    """Assemble tile renders into the final frame.
+
+    ``tiles`` is a list of (image path, border) pairs covering the frame.
+    Tiles are loaded one at a time so only the canvas and one tile are in
+    memory.
+    """
+    canvas = None
+    for tile_path, border in tiles:
+        with Image.open(tile_path) as tile:
+            if canvas is None:
+                canvas = Image.new(tile.mode, tile.size)
+            elif tile.size != canvas.size:
+                raise ValueError(f"Tile {tile_path} is {tile.size}, expected {canvas.size}")
+
+            box = region_box(border, *canvas.size)
+            canvas.paste(tile.crop(box), box[:2])
+
+    if canvas is None:
+        raise ValueError("No tiles to stitch")
+
+    canvas.save(output_path, format="PNG")
+    return output_path
@@ -0,0 +1,55 @@
+"""
+TTL cache for contract view results in the legacy worker.
+
+check_for_jobs asks for the worker's status, and sequential discovery asks
+for its eligibility per job, on every poll. Both only change when something
+happens on chain, so results are kept for a short TTL (bounded by LRU) and
+dropped early when the worker itself does something that changes them,
+such as submitting a result or registering.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+# Returned by get() on a miss
+MISSING = object()
+
+
+class ViewCache:
+    """Entries keyed by (view name, args), expiring after ``ttl`` seconds"""
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, Tuple], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, view: str, args: Tuple) -> Any:
+        key = (view, args)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            return MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, view: str, args: Tuple, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        key = (view, args)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, view: str, *pattern: Optional[Hashable]) -> None:
+        """Drop entries of ``view`` whose args match ``pattern``; None matches any value"""
+        stale = [
+            key for key in self._entries
+            if key[0] == view and all(
+                expected is None or (index < len(key[1]) and key[1][index] == expected)
+                for index, expected in enumerate(pattern)
+            )
+        ]
+        for key in stale:
+            del self._entries[key]